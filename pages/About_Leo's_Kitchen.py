@@ -1,6 +1,5 @@
 import streamlit as st
 
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
 st.title("About Leo's Kitchen")
 st.write("Leo’s Kitchen was founded because we saw a gap in the market for food journal websites that let you collaborate with others to build your own “for you page” of recipes. We wanted to make something that was useful for all diets and meal plan goals. At Leo’s Kitchen you can post recipes you’ve created, save others for later, and customize a feed that is just for your interests! Our founders Alexis Amlin, Vivek Arun, Tam Le and Nevaeh Hillyard are proud to present out product to you and cannot wait for all out future advancements to come!")
-st.image("https://revolutionuc.com/general/prize-categories/best-use-ar.png")
\ No newline at end of file
+st.image("https://revolutionuc.com/general/prize-categories/best-use-ar.png")
@@ -0,0 +1,463 @@
+# pages/Home.py
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+from utils.meals import DETAIL_COLUMNS, catalog_exists, catalog_version, filter_meals, load_meal, sort_meals, \
+    to_feed_meal, get_sample_meals
+from utils.ingredients import split_ingredient_query, sync_ingredient_index
+from utils.search import MIN_QUERY_CHARS, get_prefix_index, prefix_search, query_words
+from utils.feed import get_feed_store, watch_feed_updates
+from utils.nutrient_index import get_nutrient_index, filter_nutrient_ranges, nutrient_range_filters
+from utils.interactions import record_interaction
+from utils.recommendations import get_recommender
+from utils.trending import get_trending_engine
+from utils.ratings import get_rating_store
+from utils.recipe_cards import CARD_FORMATS, meal_card
+from utils.profiling import fragment, timer
+from utils.events import track
+
+# --- SEARCH AND FILTER SECTION ---
+with st.container():
+    col1, col2, col3 = st.columns([3, 1, 1])
+
+    with col1:
+        search_query = st.text_input("Search for recipes or ingredients:", key="home_search",
+                                     placeholder="e.g., chicken, protein bowl, breakfast...").strip()
+        # One letter matches most of the catalog: wait for more before searching (see utils/search.py)
+        if len(search_query) < MIN_QUERY_CHARS:
+            if search_query:
+                st.caption(f"Enter at least {MIN_QUERY_CHARS} letters to search.")
+            search_query = ""
+
+    with col2:
+        category = st.selectbox("Category", ["All", "Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"])
+
+    with col3:
+        sort_options = ["Newest", "Most Popular", "Top Rated", "Highest Protein", "Lowest Calories"]
+        # Logged-in users get their personal ranking (see utils/recommendations.py) first
+        sort_by = st.selectbox("Sort by", ["For You"] + sort_options if st.session_state.authenticated
+                               else sort_options)
+
+    with st.expander("🎯 Nutrition targets"):
+        nutrient_ranges = nutrient_range_filters(key="home_nutrients")
+
+# --- WELCOME BANNER ---
+FEATURED_PICKS = [
+    {"meal_id": None, "name": "Protein Pancakes", "rating": 4.8, "reviews": 124, "user": "@FitFoodie",
+     "protein": 32, "carbs": 45, "fat": 12, "calories": 420,
+     "image": "https://th.bing.com/th/id/R.94d8183231643e76b89b5d57b93db74f?rik=N9XvJrMEvlF9VQ&pid=ImgRaw&r=0"},
+    {"meal_id": None, "name": "Mediterranean Bowl", "rating": 4.7, "reviews": 98, "user": "@HealthyEats",
+     "protein": 28, "carbs": 52, "fat": 15, "calories": 460,
+     "image": "https://media1.popsugar-assets.com/files/thumbor/REfalCwtqSNtZ0waqnYlMOT00vE/fit-in/1024x1024/filter"
+              "s:format_auto-!!-:strip_icc-!!-/2018/02/21/636/n/44100376/2b69acf293c6667e_Mediterranean-Buddha-Bowl-"
+              "Culinary-Hill-LR-01-660x990/i/Mediterranean-Bowl.jpg"},
+    {"meal_id": None, "name": "Chocolate Protein Smoothie", "rating": 4.9, "reviews": 156, "user": "@SmoothieKing",
+     "protein": 24, "carbs": 30, "fat": 8, "calories": 290,
+     "image": "https://eatthegains.com/wp-content/uploads/2021/08/Chocolate-Protein-Smoothie-6.jpg"},
+]
+
+
+# Catalog meals show their ratings from utils/ratings.py (kept in memory); sample and pick cards carry their own
+def rating_label(meal):
+    if meal.get("meal_id") is not None:
+        average, count = get_rating_store().summary(meal["meal_id"])
+    else:
+        average, count = meal["rating"], meal["reviews"]
+    return f"⭐ {average:.1f} ({count} ratings)" if count else "☆ No ratings yet"
+
+
+# Opening a featured meal shows it in the detail view below, once the feed is loaded
+def view_featured_meal(meal_id):
+    if meal_id is not None:
+        track("view", meal_id)
+        st.session_state.featured_meal_id = meal_id
+
+if not search_query and category == "All" and not nutrient_ranges:
+    # Show personalized welcome if user is logged in
+    if st.session_state.authenticated:
+        st.header(f"Welcome back to Leo's Kitchen, {st.session_state.username}! 🐱🍽️")
+        st.write("Here are some recommendations based on your preferences.")
+    else:
+        st.header("Welcome to Leo's Kitchen! 🐱🍽️")
+        st.write("Share your meals, track macros, and discover new recipes from the community.")
+        # Call-to-action for non-logged in users
+        cta_col1, cta_col2 = st.columns(2)
+        with cta_col1:
+            st.info("👋 **New here?** Create an account to save recipes and track your nutrition goals!")
+        with cta_col2:
+            st.button("Sign Up Now", on_click=lambda: st.switch_page("pages/Login.py"))
+
+    # Featured meals carousel: the catalog meals with the most engagement this week (see utils/trending.py),
+    # topped up with our picks while there isn't enough activity yet
+    st.subheader("Featured Meals This Week")
+    featured_cols = st.columns(3)
+
+    featured = []
+    if catalog_exists():
+        feed_store = get_feed_store()
+        feed_store.refresh()
+        featured = [feed_store.cards[meal_id] for meal_id in get_trending_engine().featured_ids()
+                    if meal_id in feed_store.cards][:3]
+    featured += FEATURED_PICKS[:3 - len(featured)]
+
+    for n, (featured_col, meal) in enumerate(zip(featured_cols, featured), 1):
+        with featured_col:
+            image_path = meal["image"]
+            st.image(image_path if isinstance(image_path, str) and (image_path.startswith("http")
+                                                                    or os.path.exists(image_path))
+                     else "https://api.placeholder.com/640/480", use_container_width=True)
+            st.markdown(f"#### {meal['name']}")
+            st.markdown(f"{rating_label(meal)} • By {meal['user'] or '@Guest'}")
+            st.markdown(f"**Macros:** {meal['protein']}g protein • {meal['carbs']}g carbs • {meal['fat']}g fat • "
+                        f"{meal['calories']} calories")
+            st.button("View Recipe", key=f"featured{n}", on_click=view_featured_meal, args=(meal.get("meal_id"),))
+
+# --- SEARCH RESULTS OR MAIN FEED ---
+st.divider()
+
+
+# "Most Popular": the meals trending now (see utils/trending.py) first, then the rest in their given order
+def trending_first(meal_ids):
+    trending = np.array(get_trending_engine().trending_ids(), dtype=meal_ids.dtype)
+    trending = trending[np.isin(trending, meal_ids)]
+    return np.concatenate([trending, meal_ids[~np.isin(meal_ids, trending)]])
+
+
+# Function to get real meals from CSV plus fallback to sample data
+def get_meals(search_query="", category="All", sort_by="Newest", nutrient_ranges=(), n_samples=12):
+    real_meals = []
+
+    # First, try to load real meals from CSV
+    try:
+        if catalog_exists():
+            feed_store = get_feed_store()
+            with timer("Home", "load"):
+                # One copy of the catalog shared by all sessions, reloaded only when it changes. The version
+                # is read first: if the catalog changes in between, the index is keyed by the older version and
+                # rebuilt on the next run, rather than the old frame being cached under the new version.
+                nutrient_version = catalog_version()
+                feed_store.refresh()
+                meals_df = feed_store.meals_df
+            st.session_state.feed_version = feed_store.version
+
+            user = st.session_state.get("username", "@User") if st.session_state.get("authenticated",
+                                                                                      False) else "@Guest"
+            if not search_query and not nutrient_ranges:
+                with timer("Home", "sort"):
+                    # Plain category feeds are shared snapshots, already filtered, sorted and built
+                    order = None
+                    if sort_by == "For You":
+                        # The newest-first feed, with the user's best matches moved to the top
+                        order = get_recommender(meals_df, feed_store.version).rank(
+                            st.session_state.user_id, feed_store.order(category, "Newest"), key=category)
+                    elif sort_by == "Most Popular":
+                        order = trending_first(feed_store.order(category, "Newest"))
+                    elif sort_by == "Top Rated":
+                        order = get_rating_store().rank(feed_store.order(category, "Newest"))
+                    if order is None:
+                        cards = feed_store.feed(category, "Newest" if sort_by == "For You" else sort_by)
+                    else:
+                        cards = [feed_store.cards[meal_id] for meal_id in order]
+
+                with timer("Home", "build"):
+                    real_meals = [card if card["user"] is not None else {**card, "user": user} for card in cards]
+            else:
+                with timer("Home", "filter"):
+                    # Ingredient matches come from the parsed ingredient index rather than scanning the text
+                    ingredient_index = sync_ingredient_index(meals_df)
+                    # Nutrition ranges first: they're index range scans and narrow the text search
+                    meals_df = filter_nutrient_ranges(meals_df, nutrient_ranges,
+                                                      index=get_nutrient_index(meals_df, nutrient_version)
+                                                      if nutrient_ranges else None)
+                    if search_query:
+                        # Prefix search, refined from this session's last search where it can be
+                        matches, st.session_state.search_state = prefix_search(
+                            get_prefix_index(feed_store.meals_df), search_query,
+                            st.session_state.get("search_state"))
+                        terms = split_ingredient_query(search_query)
+                        if len(terms) > 1:
+                            # "chicken and rice" can be a list of ingredients (meals with all of them) as much
+                            # as a meal's name ("Steak and Sweet Potato"): both count
+                            matches = matches | ingredient_index.meals_with_all(terms)
+                        meals_df = filter_meals(meals_df[meals_df.index.isin(matches)], category=category)
+                    else:
+                        meals_df = filter_meals(meals_df, category=category)
+
+                with timer("Home", "sort"):
+                    order = None
+                    if sort_by == "For You":
+                        order = get_recommender(feed_store.meals_df, feed_store.version).rank(
+                            st.session_state.user_id, sort_meals(meals_df, "Newest").index)
+                    elif sort_by == "Most Popular":
+                        order = trending_first(sort_meals(meals_df, "Newest").index.to_numpy())
+                    elif sort_by == "Top Rated":
+                        order = get_rating_store().rank(sort_meals(meals_df, "Newest").index)
+                    meals_df = sort_meals(meals_df, "Newest" if sort_by == "For You" else sort_by) if order is None \
+                        else meals_df.loc[order]
+
+                with timer("Home", "build"):
+                    # Create a simplified version of each meal for the feed
+                    real_meals = [to_feed_meal(meal_dict, user, meal_id=meal_id)
+                                  for meal_id, meal_dict in zip(meals_df.index, meals_df.to_dict("records"))]
+    except Exception as e:
+        st.error(f"Error loading meals: {e}")
+        # Continue to sample data if there's an error
+
+    # If we don't have enough real meals, add sample ones
+    if len(real_meals) < n_samples:
+        sample_meals = get_sample_meals(n=n_samples - len(real_meals),
+                                        search_query=search_query,
+                                        category=category,
+                                        sort_by=sort_by,
+                                        ranges=nutrient_ranges)
+        return real_meals + sample_meals
+
+    return real_meals
+
+
+# A "did you mean" suggestion replaces the search box text
+def use_suggestion(suggestion):
+    st.session_state.home_search = suggestion
+
+
+# Display search results or feed
+meals = get_meals(search_query=search_query, category=category, sort_by=sort_by, nutrient_ranges=nutrient_ranges)
+
+# A featured meal was opened: show it if it's in this feed
+featured_meal_id = st.session_state.pop("featured_meal_id", None)
+if featured_meal_id is not None:
+    st.session_state.selected_meal_index = next(
+        (i for i, meal in enumerate(meals) if meal.get("meal_id") == featured_meal_id), None)
+
+if search_query:
+    st.subheader(f"Results for: {search_query}")
+    if not meals:
+        st.write("No meals found matching your search. Try a different keyword.")
+    # Nothing in the catalog matched: offer the query with its misspelled words corrected
+    search_state = st.session_state.get("search_state")
+    if search_state and search_state["suggestions"] and search_state["words"] == query_words(search_query):
+        suggestion_cols = st.columns(len(search_state["suggestions"]) + 1)
+        suggestion_cols[0].write("Did you mean:")
+        for n, (suggestion_col, suggestion) in enumerate(zip(suggestion_cols[1:], search_state["suggestions"])):
+            suggestion_col.button(suggestion, key=f"suggestion_{n}", on_click=use_suggestion, args=(suggestion,))
+elif category != "All":
+    st.subheader(f"{category} Meals")
+elif nutrient_ranges:
+    st.subheader("Meals Matching Your Nutrition Targets")
+    if not meals:
+        st.write("No meals found within these targets. Try widening a range.")
+elif sort_by == "For You":
+    st.subheader("Recommended For You")
+else:
+    st.subheader("Trending Meals")
+
+
+# Function to handle meal detail view
+def view_meal_details(meal_index, meal_id=None):
+    st.session_state.selected_meal_index = meal_index
+    if meal_id is not None:
+        track("view", meal_id)
+
+
+def close_meal_details():
+    st.session_state.selected_meal_index = None
+
+
+# Saves feed the user's "For You" ranking, so they're stored right away rather than through the event log
+def save_meal(meal):
+    if meal.get("meal_id") is not None:
+        record_interaction(st.session_state.user_id, meal["meal_id"], "save")
+    st.toast(f"Saved {meal['name']}")
+
+
+# Ratings of 4+ stars count as likes (for trending and "For You")
+def rate_meal(meal_id):
+    stars = st.session_state.get(f"rate_{meal_id}")
+    if stars is None:
+        return
+    previous = get_rating_store().rate(st.session_state.user_id, meal_id, stars + 1)
+    if stars + 1 >= 4 and (previous or 0) < 4:
+        record_interaction(st.session_state.user_id, meal_id, "like")
+    st.toast(f"Rated {stars + 1} ⭐")
+
+
+# Initialize session state for meal viewing
+if 'selected_meal_index' not in st.session_state:
+    st.session_state.selected_meal_index = None
+
+
+# A card's save button reruns on its own: saving doesn't change anything else on the page
+@fragment("Home", "save")
+def save_button(i, meal):
+    # Different button text based on auth status
+    if st.session_state.authenticated:
+        st.button("Save", key=f"save_{i}", on_click=save_meal, args=(meal,))
+    else:
+        if st.button("Login to Save", key=f"login_save_{i}"):
+            st.switch_page("pages/Login.py")
+
+
+# Function to safely check if path exists
+def safe_path_exists(path):
+    # Check if path is a valid type for os.path.exists
+    if isinstance(path, (str, bytes, os.PathLike)) or isinstance(path, int):
+        return os.path.exists(path)
+    return False
+
+
+# The feed reruns on its own: opening a meal, going back to the feed, printing or rating a meal redraws
+# just this part of the page, without redoing the search, filters, loading and sorting above
+@fragment("Home", "feed")
+def feed_panel(meals):
+    # Display meal detail view if selected
+    if st.session_state.selected_meal_index is not None and st.session_state.selected_meal_index < len(meals):
+        meal = meals[st.session_state.selected_meal_index]
+        if meal.get("meal_id") is not None:
+            # Feeds only carry the card columns; the ingredients and instructions are read for this meal only
+            with timer("Home", "detail"):
+                meal = {**meal, **(load_meal(meal["meal_id"], DETAIL_COLUMNS) or {})}
+
+        # Back button
+        st.button("← Back to Feed", on_click=close_meal_details)
+
+        # Meal detail view
+        st.header(meal["name"])
+
+        detail_col1, detail_col2 = st.columns([1, 2])
+
+        with detail_col1:
+            # Handle image display - Using safe_path_exists to prevent type errors
+            image_path = meal.get("image")
+            if isinstance(image_path, (str, bytes, os.PathLike)) and safe_path_exists(image_path):
+                st.image(image_path, use_container_width=True)
+            else:
+                st.image("https://api.placeholder.com/640/480", use_container_width=True)
+
+            # User info and stats
+            st.markdown(f"**Posted by:** {meal['user']}")
+            st.markdown(rating_label(meal))
+            if meal.get("meal_id") is not None and st.session_state.authenticated:
+                your_rating = get_rating_store().user_rating(st.session_state.user_id, meal["meal_id"])
+                st.caption(f"Your rating: {your_rating} ⭐" if your_rating else "Rate this meal:")
+                st.feedback("stars", key=f"rate_{meal['meal_id']}", on_change=rate_meal, args=(meal["meal_id"],))
+
+            # Nutrition card
+            st.markdown("### Nutrition Information")
+            st.markdown(f"**Protein:** {meal['protein']}g")
+            st.markdown(f"**Carbs:** {meal['carbs']}g")
+            st.markdown(f"**Fat:** {meal['fat']}g")
+            st.markdown(f"**Calories:** {meal['calories']}")
+
+            # Additional nutrition if available
+            if meal.get("is_user_submitted", False) and "original_data" in meal:
+                orig = meal["original_data"]
+                with st.expander("Additional Nutrition Info"):
+                    add_col1, add_col2 = st.columns(2)
+                    with add_col1:
+                        st.markdown(f"**Fiber:** {orig.get('fiber', 0)}g")
+                        st.markdown(f"**Sugar:** {orig.get('sugar', 0)}g")
+                        st.markdown(f"**Saturated Fat:** {orig.get('saturated_fat', 0)}g")
+                    with add_col2:
+                        st.markdown(f"**Sodium:** {orig.get('sodium', 0)}mg")
+                        st.markdown(f"**Cholesterol:** {orig.get('cholesterol', 0)}mg")
+                        st.markdown(f"**Trans Fat:** {orig.get('trans_fat', 0)}g")
+
+        with detail_col2:
+            # Description
+            if meal.get("description"):
+                st.markdown("### Description")
+                st.markdown(meal["description"])
+
+            # Ingredients
+            st.markdown("### Ingredients")
+            if meal.get("ingredients"):
+                ingredients_list = meal["ingredients"].split('\n')
+                for ingredient in ingredients_list:
+                    if ingredient.strip():
+                        st.markdown(f"- {ingredient}")
+            else:
+                st.markdown("*Ingredients not available*")
+
+            # Instructions
+            st.markdown("### Instructions")
+            if meal.get("instructions"):
+                instructions_list = meal["instructions"].split('\n')
+                for i, instruction in enumerate(instructions_list, 1):
+                    if instruction.strip():
+                        st.markdown(f"{i}. {instruction}")
+            else:
+                st.markdown("*Instructions not available*")
+
+            # Recipe URL if available
+            if meal.get("recipe_url"):
+                st.markdown(f"[View Original Recipe]({meal['recipe_url']})")
+
+            # Action buttons; print and share make a recipe card (see utils/recipe_cards.py), community meals only
+            action_col1, action_col2, action_col3 = st.columns(3)
+            no_card = meal.get("meal_id") is None
+            with action_col1:
+                st.button("Save Recipe")
+            with action_col2:
+                if st.button("Print Recipe", disabled=no_card):
+                    st.session_state.recipe_card = (meal["meal_id"], "pdf")
+            with action_col3:
+                if st.button("Share Recipe", disabled=no_card):
+                    st.session_state.recipe_card = (meal["meal_id"], "png")
+
+            recipe_card = st.session_state.get("recipe_card")
+            if recipe_card and recipe_card[0] == meal.get("meal_id"):
+                card_meal_id, card_format = recipe_card
+                with timer("Home", "card"):
+                    card = meal_card(card_meal_id, card_format)
+                if card is not None:
+                    if card_format == "png":
+                        st.image(card, use_container_width=True)
+                    st.download_button(f"⬇️ Download recipe card ({card_format.upper()})", card,
+                                       file_name=f"recipe_card_{card_meal_id}.{card_format}",
+                                       mime=CARD_FORMATS[card_format])
+    else:
+        # Pinterest-style masonry grid layout
+        cols = st.columns(3)
+        for i, meal in enumerate(meals):
+            with cols[i % 3]:
+                # Handle image display - Using safe_path_exists to prevent type errors
+                image_path = meal.get("image")
+                if isinstance(image_path, (str, bytes, os.PathLike)) and safe_path_exists(image_path):
+                    st.image(image_path, use_container_width=True)
+                else:
+                    st.image("https://api.placeholder.com/640/480", use_container_width=True)
+
+                st.markdown(f"#### {meal['name']}")
+                st.markdown(f"{rating_label(meal)} • {meal['user']}")
+
+                # Macro information in a clean format
+                macros_col1, macros_col2 = st.columns(2)
+                with macros_col1:
+                    st.markdown(f"**Protein:** {meal['protein']}g")
+                    st.markdown(f"**Carbs:** {meal['carbs']}g")
+                with macros_col2:
+                    st.markdown(f"**Fat:** {meal['fat']}g")
+                    st.markdown(f"**Calories:** {meal['calories']}")
+
+                # Action buttons
+                button_col1, button_col2 = st.columns(2)
+                with button_col1:
+                    st.button("View Recipe", key=f"recipe_{i}", on_click=view_meal_details,
+                              args=(i, meal.get("meal_id")))
+                with button_col2:
+                    save_button(i, meal)
+
+                # Add some spacing between cards
+                st.markdown("<br>", unsafe_allow_html=True)
+
+        # Pick up meals shared while this feed is open
+        watch_feed_updates(st.session_state.get("feed_version", 0))
+
+
+with timer("Home", "render"):
+    feed_panel(meals)
+
+# --- FOOTER ---
+st.divider()
+st.markdown("© 2025 Leo's Food App | [Terms of Service](/) | [Privacy Policy](/)")
@@ -1,21 +1,16 @@
 import streamlit as st
-from openai import OpenAI
+from utils.profiling import timer
+from utils.session_budget import HISTORY_LIMITS
 
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
 st.title("Ask Leo!")
 st.write("He knows how to make the best food!")
 
-client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
-# --- SIDEBAR NAVIGATION ---
-# st.sidebar.title("Navigation")
-# st.sidebar.page_link("Home.py", label="🏠 Home")
-# st.sidebar.page_link("pages/About_Leo.py", label="ℹ️ About Leo")
-# st.sidebar.page_link("pages/My_Recipe.py", label="📊 My Recipes")
-# st.sidebar.page_link("pages/Leo_Chat_Bot.py", label="🤖 Chat Bot")
-# st.sidebar.page_link("pages/Share_Your_Meal.py", label="📝 Share Your Meal")
-# st.sidebar.page_link("pages/My_Profile.py", label="👤 My Profile")
-# st.sidebar.page_link("pages/Authentication.py", label="🔑 Login/Register")
+# The OpenAI client (and the openai package) is only loaded once someone actually sends a message
+@st.cache_resource
+def get_client():
+    from openai import OpenAI
+    return OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
 
 
 # Chat History
@@ -32,11 +27,11 @@ if prompt:
         st.markdown(prompt)
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    with st.chat_message("assistant"):
-        stream = client.chat.completions.create(
+    with st.chat_message("assistant"), timer("Chat Bot", "completion"):
+        stream = get_client().chat.completions.create(
             model="gpt-4o",
-            messages=st.session_state.messages,
+            messages=st.session_state.messages[-HISTORY_LIMITS["messages"]:],
             stream=True
         )
         response = st.write_stream(stream)
-    st.session_state.messages.append({"role": "assistant", "content": response})
\ No newline at end of file
+    st.session_state.messages.append({"role": "assistant", "content": response})
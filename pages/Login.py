@@ -1,45 +1,11 @@
 # pages/Login.py
 import streamlit as st
-import pandas as pd
 import hashlib
 import sqlite3
 import re
 from datetime import datetime
-
-# Page configuration
-st.set_page_config(page_title="Login/Register - Leo's Food App", page_icon="🐱", layout="wide")
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
-# --- SIDEBAR NAVIGATION ---
-# st.sidebar.title("Navigation")
-# st.sidebar.page_link("Home.py", label="🏠 Home", icon="🏠")
-# st.sidebar.page_link("pages/About_Leo's_Kitchen.py", label="ℹ️ About Me")
-# st.sidebar.page_link("pages/My_Recipe.py", label="📊 My Recipes")
-# st.sidebar.page_link("pages/Leo_Chat_Bot.py", label="🤖 Chat Bot")
-# st.sidebar.page_link("pages/Share_Your_Meal.py", label="📝 Share Your Meal")
-# st.sidebar.page_link("pages/Login.py", label="👤 Login/Register")
-
-# Database initialization function
-def init_db():
-    conn = sqlite3.connect('food_app.db', check_same_thread=False)
-    c = conn.cursor()
-    
-    # Create users table if it doesn't exist
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        full_name TEXT,
-        bio TEXT,
-        profile_pic TEXT,
-        date_joined TEXT,
-        is_premium BOOLEAN DEFAULT 0
-    )
-    ''')
-    
-    conn.commit()
-    return conn
+from utils.db import get_db_connection, init_user_table
+from utils.sidebar import logout
 
 # Hash password function
 def hash_password(password):
@@ -50,23 +16,9 @@ def is_valid_email(email):
     pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
     return re.match(pattern, email) is not None
 
-# Initialize database connection
-conn = init_db()
-
-# Initialize session state variables if they don't exist
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = False
-if 'username' not in st.session_state:
-    st.session_state.username = ""
-if 'user_id' not in st.session_state:
-    st.session_state.user_id = None
-
-# Logout function
-def logout():
-    st.session_state.authenticated = False
-    st.session_state.username = ""
-    st.session_state.user_id = None
-    st.rerun()
+# Initialize database connection (the users table is only created on the process's first run)
+conn = get_db_connection()
+init_user_table(conn)
 
 # Main content
 if st.session_state.authenticated:
@@ -218,4 +170,4 @@ st.markdown("""
 - **Share your own meals** with the community
 - **Track your nutrition goals** with personalized dashboards
 - **Connect with other food enthusiasts** and share tips
-""")
\ No newline at end of file
+""")
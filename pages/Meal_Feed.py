@@ -1,40 +1,129 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
-
-# Page configuration
-st.set_page_config(page_title="Community Meals - Leo's Food App", page_icon="🐱", layout="wide")
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
-# --- SIDEBAR NAVIGATION ---
-# st.sidebar.title("Navigation")
-# st.sidebar.page_link("Home.py", label="🏠 Home", icon="🏠")
-# st.sidebar.page_link("pages/About_Leo's_Kitchen.py", label="ℹ️ About Me")
-# st.sidebar.page_link("pages/My_Recipe.py", label="📊 My Recipes")
-# st.sidebar.page_link("pages/Leo_Chat_Bot.py", label="🤖 Chat Bot")
-# st.sidebar.page_link("pages/Share_Your_Meal.py", label="📝 Share Your Meal")
-# st.sidebar.page_link("pages/Meal_Feed.py", label="🍽️ Community Meals")
+from utils.meals import DETAIL_COLUMNS, catalog_version, load_meal
+from utils.feed import get_feed_store, watch_feed_updates
+from utils.nutrient_index import get_nutrient_index, filter_nutrient_ranges, nutrient_range_filters
+from utils.profiling import fragment, timer
+from utils.events import track
 
 # --- MEAL FEED ---
 st.title("Community Meals 🍽️")
 st.write("Check out meals shared by the community!")
 
+
+# Open meals are kept as meal ids; the details are loaded for a meal when it's drawn
+def toggle_meal(meal_id):
+    # Clicking an open meal's button again closes it
+    open_meals = st.session_state.setdefault("open_meal_ids", set())
+    if meal_id in open_meals:
+        open_meals.discard(meal_id)
+    else:
+        open_meals.add(meal_id)
+        # Views count towards trending (see utils/trending.py); they're written in the background
+        track("view", meal_id)
+
+
+# Each meal is drawn by its own fragment, so opening or closing one reruns just that meal
+@fragment("Meal Feed", "meal")
+def meal_row(index, meal):
+    is_open = index in st.session_state.get("open_meal_ids", ())
+    with st.container():
+        st.markdown("---")
+        col1, col2 = st.columns([1, 2])
+
+        with col1:
+            # Display image if available
+            # Fix: Check if image_path exists and is a valid string path
+            if "image_path" in meal and meal["image_path"] and isinstance(meal["image_path"],
+                                                                          str) and os.path.exists(
+                    meal["image_path"]):
+                try:
+                    st.image(meal["image_path"], use_container_width=True)
+                except:
+                    st.image("https://via.placeholder.com/400x300?text=No+Image", use_container_width=True)
+            else:
+                st.image("https://via.placeholder.com/400x300?text=No+Image", use_container_width=True)
+
+        with col2:
+            st.markdown(f"### {meal['meal_name']}")
+            st.markdown(f"**Category:** {meal['meal_category']}")
+
+            # Display tags if available
+            if not pd.isna(meal.get('meal_tags', '')):
+                tags = [tag.strip() for tag in meal['meal_tags'].split(',')]
+                st.markdown(" ".join([f"*{tag}*" for tag in tags]))
+
+            st.markdown(f"**Description:** {meal['meal_description']}")
+
+            # Nutrition section
+            st.markdown("#### Nutrition Facts")
+            st.markdown(
+                f"**Protein:** {meal['protein']}g | **Carbs:** {meal['carbs']}g | **Fat:** {meal['fat']}g | **Calories:** {meal['calories']}")
+
+            # Recipe link if available
+            if not pd.isna(meal.get('recipe_url', '')) and meal['recipe_url']:
+                st.markdown(f"[View Full Recipe]({meal['recipe_url']})")
+
+            # View details button
+            st.button("Hide Details" if is_open else "View Details",
+                      key=f"view_{index}", on_click=toggle_meal, args=(int(index),))
+
+        # If meal is open, show details
+        if is_open:
+            with st.expander("Meal Details", expanded=True):
+                # The feed only holds the card columns; read the long text for this meal now
+                with timer("Meal Feed", "detail"):
+                    details = load_meal(index, DETAIL_COLUMNS) or {}
+
+                # Ingredients
+                st.subheader("Ingredients")
+                ingredients_list = (details.get('ingredients') or "").split('\n')
+                for ingredient in ingredients_list:
+                    st.markdown(f"- {ingredient}")
+
+                # Instructions
+                st.subheader("Instructions")
+                instructions_list = (details.get('instructions') or "").split('\n')
+                for i, instruction in enumerate(instructions_list, 1):
+                    st.markdown(f"{i}. {instruction}")
+
+                # Additional nutrition info if available
+                st.subheader("Detailed Nutrition")
+                nutrition_col1, nutrition_col2 = st.columns(2)
+
+                with nutrition_col1:
+                    st.markdown(f"**Fiber:** {meal.get('fiber', 0)}g")
+                    st.markdown(f"**Sugar:** {meal.get('sugar', 0)}g")
+                    st.markdown(f"**Saturated Fat:** {meal.get('saturated_fat', 0)}g")
+
+                with nutrition_col2:
+                    st.markdown(f"**Sodium:** {meal.get('sodium', 0)}mg")
+                    st.markdown(f"**Cholesterol:** {meal.get('cholesterol', 0)}mg")
+                    st.markdown(f"**Trans Fat:** {meal.get('trans_fat', 0)}g")
+
+
+# Sessions from before selection by id held a whole row here
+st.session_state.pop("selected_meal", None)
+
 # Filter options
 st.sidebar.header("Filter Meals")
 try:
-    # Load meals data
-    meals_df = pd.read_csv("data/meals.csv")
+    # Load meals data (one copy shared by all sessions, reloaded only when the catalog changes)
+    feed_store = get_feed_store()
+    with timer("Meal Feed", "load"):
+        feed_store.refresh()
+        meals_df = feed_store.meals_df
+    st.session_state.feed_version = feed_store.version
 
     if not meals_df.empty:
         # Get unique categories for filter
         categories = ["All"] + list(meals_df["meal_category"].unique())
         selected_category = st.sidebar.selectbox("Category", categories)
 
-        # Filter by category
-        if selected_category != "All":
-            filtered_meals = meals_df[meals_df["meal_category"] == selected_category]
-        else:
-            filtered_meals = meals_df
+        # Nutrition ranges
+        with st.sidebar.expander("🎯 Nutrition targets"):
+            nutrient_ranges = nutrient_range_filters(key="feed_nutrients", columns_per_row=1)
 
         # Sort options
         sort_option = st.sidebar.selectbox(
@@ -42,91 +131,35 @@ try:
             ["Newest First", "Oldest First", "Highest Protein", "Lowest Calories"]
         )
 
-        if sort_option == "Newest First":
-            filtered_meals = filtered_meals.sort_values("datetime", ascending=False)
-        elif sort_option == "Oldest First":
-            filtered_meals = filtered_meals.sort_values("datetime", ascending=True)
-        elif sort_option == "Highest Protein":
-            filtered_meals = filtered_meals.sort_values("protein", ascending=False)
-        elif sort_option == "Lowest Calories":
-            filtered_meals = filtered_meals.sort_values("calories", ascending=True)
+        # The category feed in sorted order is a shared snapshot. The frame is taken again with it, so the
+        # two match even if a meal has been added since the load above. The catalog version for the nutrient
+        # index is read before that frame, so an older frame is never cached under a newer version.
+        nutrient_version = catalog_version()
+        meals_df, feed_order, st.session_state.feed_version = feed_store.view(selected_category, sort_option)
+
+        # Filter by nutrition ranges
+        with timer("Meal Feed", "filter"):
+            in_range = filter_nutrient_ranges(meals_df, nutrient_ranges,
+                                              index=get_nutrient_index(meals_df, nutrient_version)).index \
+                if nutrient_ranges else None
+
+        with timer("Meal Feed", "sort"):
+            # The ranges only drop meals from the feed
+            filtered_meals = meals_df.loc[feed_order]
+            if in_range is not None:
+                filtered_meals = filtered_meals[filtered_meals.index.isin(in_range)]
 
         # Display meals
         if not filtered_meals.empty:
-            for index, meal in filtered_meals.iterrows():
-                with st.container():
-                    st.markdown("---")
-                    col1, col2 = st.columns([1, 2])
-
-                    with col1:
-                        # Display image if available
-                        # Fix: Check if image_path exists and is a valid string path
-                        if "image_path" in meal and meal["image_path"] and isinstance(meal["image_path"],
-                                                                                      str) and os.path.exists(
-                                meal["image_path"]):
-                            try:
-                                st.image(meal["image_path"], use_container_width=True)
-                            except:
-                                st.image("https://via.placeholder.com/400x300?text=No+Image", use_container_width=True)
-                        else:
-                            st.image("https://via.placeholder.com/400x300?text=No+Image", use_container_width=True)
-
-                    with col2:
-                        st.markdown(f"### {meal['meal_name']}")
-                        st.markdown(f"**Category:** {meal['meal_category']}")
-
-                        # Display tags if available
-                        if not pd.isna(meal.get('meal_tags', '')):
-                            tags = [tag.strip() for tag in meal['meal_tags'].split(',')]
-                            st.markdown(" ".join([f"*{tag}*" for tag in tags]))
-
-                        st.markdown(f"**Description:** {meal['meal_description']}")
-
-                        # Nutrition section
-                        st.markdown("#### Nutrition Facts")
-                        st.markdown(
-                            f"**Protein:** {meal['protein']}g | **Carbs:** {meal['carbs']}g | **Fat:** {meal['fat']}g | **Calories:** {meal['calories']}")
-
-                        # Recipe link if available
-                        if not pd.isna(meal.get('recipe_url', '')) and meal['recipe_url']:
-                            st.markdown(f"[View Full Recipe]({meal['recipe_url']})")
-
-                        # View details button
-                        if st.button(f"View Details", key=f"view_{index}"):
-                            st.session_state.selected_meal = meal
-
-                    # If meal is selected, show details
-                    if 'selected_meal' in st.session_state and st.session_state.selected_meal is not None and st.session_state.selected_meal.equals(
-                            meal):
-                        with st.expander("Meal Details", expanded=True):
-                            # Ingredients
-                            st.subheader("Ingredients")
-                            ingredients_list = meal['ingredients'].split('\n')
-                            for ingredient in ingredients_list:
-                                st.markdown(f"- {ingredient}")
-
-                            # Instructions
-                            st.subheader("Instructions")
-                            instructions_list = meal['instructions'].split('\n')
-                            for i, instruction in enumerate(instructions_list, 1):
-                                st.markdown(f"{i}. {instruction}")
-
-                            # Additional nutrition info if available
-                            st.subheader("Detailed Nutrition")
-                            nutrition_col1, nutrition_col2 = st.columns(2)
-
-                            with nutrition_col1:
-                                st.markdown(f"**Fiber:** {meal.get('fiber', 0)}g")
-                                st.markdown(f"**Sugar:** {meal.get('sugar', 0)}g")
-                                st.markdown(f"**Saturated Fat:** {meal.get('saturated_fat', 0)}g")
-
-                            with nutrition_col2:
-                                st.markdown(f"**Sodium:** {meal.get('sodium', 0)}mg")
-                                st.markdown(f"**Cholesterol:** {meal.get('cholesterol', 0)}mg")
-                                st.markdown(f"**Trans Fat:** {meal.get('trans_fat', 0)}g")
+            with timer("Meal Feed", "render"):
+                for index, meal in zip(filtered_meals.index, filtered_meals.to_dict("records")):
+                    meal_row(index, meal)
+
+            # Pick up meals shared while this feed is open
+            watch_feed_updates(st.session_state.feed_version)
         else:
             st.info("No meals match your filter criteria.")
     else:
         st.info("No meals have been shared yet. Be the first to share your meal!")
 except FileNotFoundError:
-    st.info("No meals have been shared yet. Be the first to share your meal!")
\ No newline at end of file
+    st.info("No meals have been shared yet. Be the first to share your meal!")
@@ -1,15 +1,12 @@
+import os
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import sqlite3
-import os
-from utils.sidebar import create_sidebar_navigation
-
-# Page configuration
-st.set_page_config(page_title="My Profile - Leo's Food App", page_icon="🐱", layout="wide")
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
-# Create sidebar navigation
-# sidebar = create_sidebar_navigation("pages/My_Profile.py")
+from utils.meals import catalog_exists, catalog_version, load_meal_rows, load_meals
+from utils.meal_planner import DEFAULT_SLOTS, DEFAULT_TARGETS, PLAN_NUTRIENTS, get_meal_planner
+from utils.profiling import fragment, timer
+from utils.comments import get_comment_counts
+from utils.export import EXPORTS, remove_export, write_export
+from utils.interactions import get_user_meal_ids
 
 # Initialize session state for meals if not exists
 if 'user_meals' not in st.session_state:
@@ -26,31 +23,205 @@ if 'user_meals' not in st.session_state:
         ]
 
 
-# Initialize database connection (for a real app)
-def get_db_connection():
-    conn = sqlite3.connect('food_app.db', check_same_thread=False)
-    return conn
-
-
-# Function to delete a meal
-def delete_meal(meal_id):
+# Function to delete a meal (by its position in the list: example entries and catalog ids can share numbers)
+def delete_meal(position):
     # In a real app, you would delete from your database
     st.session_state.user_meals = [
-        meal for meal in st.session_state.user_meals
-        if meal['id'] != meal_id
+        meal for i, meal in enumerate(st.session_state.user_meals)
+        if i != position
     ]
     return True
 
 
-# Initialize user session state variables if not already set
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = True  # For testing purposes
+# Shared meals are kept in session state as catalog meal ids; load what the list shows in one read.
+# Entries line up with user_meals (None for an id no longer in the catalog).
+def recipe_entries(user_meals):
+    meal_ids = [meal for meal in user_meals if not isinstance(meal, dict)]
+    rows = load_meal_rows(meal_ids, columns=["meal_name", "datetime", "image_path"]) if meal_ids else None
+    comment_counts = get_comment_counts(meal_ids) if meal_ids else {}
+    entries = []
+    for meal in user_meals:
+        if isinstance(meal, dict):
+            entries.append(meal)
+        elif meal not in rows.index:
+            entries.append(None)
+        else:
+            row = rows.loc[meal]
+            image_path = row["image_path"]
+            entries.append({
+                "id": int(meal),
+                "name": row["meal_name"],
+                "date_posted": pd.to_datetime(row["datetime"]).strftime("%b %d, %Y"),
+                "likes": 0,
+                "comments": comment_counts.get(int(meal), 0),
+                "image": image_path if isinstance(image_path, str) and os.path.exists(image_path)
+                else "https://api.placeholder.com/300/200"
+            })
+    return entries
+
+
+# The panels below rerun on their own (see fragment in utils/profiling.py): using their buttons and forms
+# redraws just the panel, not the whole profile
+def delete_recipe(position, name):
+    if delete_meal(position):
+        st.toast(f"Deleted {name} successfully!")
+
+
+@fragment("My Profile", "recipes")
+def shared_recipes():
+    # Use session state for user recipes first
+    user_recipes = st.session_state.user_meals if 'user_meals' in st.session_state else []
+
+    # If user_recipes is empty, try the catalog (keeping just the meal ids in session state)
+    if not user_recipes:
+        try:
+            if catalog_exists():
+                with timer("My Profile", "load"):
+                    user_recipes = load_meals(columns=["meal_name"]).index.tolist()
+                st.session_state.user_meals = user_recipes
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            # If still empty, show default examples
+            if not user_recipes:
+                user_recipes = [
+                    {"id": 1, "name": "Protein Pancakes", "date_posted": "Feb 28, 2025", "likes": 24, "comments": 3,
+                     "image": "https://api.placeholder.com/300/200"},
+                    {"id": 2, "name": "Chicken Avocado Wrap", "date_posted": "Feb 20, 2025", "likes": 18,
+                     "comments": 2,
+                     "image": "https://api.placeholder.com/300/200"},
+                    {"id": 3, "name": "Greek Yogurt Bowl", "date_posted": "Feb 15, 2025", "likes": 32,
+                     "comments": 5,
+                     "image": "https://api.placeholder.com/300/200"}
+                ]
+                st.session_state.user_meals = user_recipes
+
+    if not user_recipes:
+        st.info("You haven't shared any recipes yet. Create your first one!")
+    else:
+        with timer("My Profile", "load"):
+            recipes = recipe_entries(user_recipes)
+        for i, recipe in enumerate(recipes):
+            if recipe is None:
+                continue
+            col1, col2 = st.columns([1, 3])
+
+            with col1:
+                st.image(recipe["image"], use_container_width=True)
+
+            with col2:
+                st.subheader(recipe["name"])
+                st.write(f"Posted on: {recipe['date_posted']}")
+                st.write(f"❤️ {recipe['likes']} likes • 💬 {recipe['comments']} comments")
+
+                action_col1, action_col2, action_col3 = st.columns(3)
+                with action_col1:
+                    st.button("View Recipe", key=f"view_{i}")
+                with action_col2:
+                    st.button("Edit", key=f"edit_{i}")
+                with action_col3:
+                    st.button("Delete", key=f"delete_{i}", on_click=delete_recipe, args=(i, recipe["name"]))
+
+            st.divider()
+
+
+# Once downloaded, the export file isn't needed any more
+def finish_export():
+    export_file = st.session_state.pop("export_file", None)
+    if export_file:
+        remove_export(export_file)
+
+
+# Exports cover every meal the user has shared (from the interaction log, not this session's list). They're
+# written to a private file in chunks and handed to the session's download button.
+@fragment("My Profile", "export")
+def export_panel():
+    with st.expander("📦 Export my recipes and nutrition"):
+        export_kind = st.selectbox("What to export", list(EXPORTS))
+        meal_ids = get_user_meal_ids(st.session_state.user_id)
+        if st.button("Prepare export", disabled=not meal_ids):
+            with st.spinner("Preparing your export..."), timer("My Profile", "export"):
+                st.session_state.export_file = write_export(export_kind, meal_ids)
+        if not meal_ids:
+            st.caption("Share a meal to have something to export.")
+        export_file = st.session_state.get("export_file")
+        if export_file and os.path.exists(export_file["path"]):
+            with open(export_file["path"], "rb") as f:
+                st.download_button(f"⬇️ Download {export_file['file_name']} ({export_file['size'] / 1024:,.1f} KB)",
+                                   f, file_name=export_file["file_name"], on_click=finish_export)
+
+
+@fragment("My Profile", "saved recipe")
+def saved_recipe_card(i, recipe):
+    st.image(recipe["image"], use_container_width=True)
+    st.subheader(recipe["name"])
+    st.write(f"By {recipe['author']} • Saved on {recipe['date_saved']}")
+
+    view_col, unsave_col = st.columns(2)
+    with view_col:
+        st.button("View Recipe", key=f"saved_view_{i}")
+    with unsave_col:
+        st.button("Unsave", key=f"saved_unsave_{i}")
+
+    st.write("")  # Add some spacing
+
+
+@fragment("My Profile", "planner")
+def meal_planner():
+    st.subheader("Daily Meal Planner")
+    st.write("Set your daily targets and we'll put together meals from the community that add up to them.")
+
+    with st.form("meal_plan_form"):
+        target_cols = st.columns(4)
+        targets = {}
+        for col, nutrient in zip(target_cols, PLAN_NUTRIENTS):
+            with col:
+                label = "Calories" if nutrient == "calories" else f"{nutrient.title()} (g)"
+                targets[nutrient] = st.number_input(label, min_value=0, value=DEFAULT_TARGETS[nutrient],
+                                                    step=5, key=f"plan_target_{nutrient}")
+
+        slot_col1, slot_col2 = st.columns([3, 1])
+        with slot_col1:
+            meal_slots = st.multiselect("Meals", ["Breakfast", "Lunch", "Dinner", "Desserts"],
+                                        default=DEFAULT_SLOTS)
+        with slot_col2:
+            snacks = st.number_input("Snacks", min_value=0, max_value=3, value=0)
+
+        plan_submitted = st.form_submit_button("Plan My Day")
+
+    if plan_submitted:
+        slots = meal_slots + ["Snacks"] * snacks
+        if not slots:
+            st.warning("Pick at least one meal to plan.")
+        else:
+            try:
+                with timer("My Profile", "plan"):
+                    plans = get_meal_planner(catalog_version()).plan(targets=targets, slots=slots)
+                # Only ids and totals are kept; names come from the planner when the plans are drawn
+                st.session_state.meal_plans = {"slots": slots, "targets": targets, "plans": plans}
+            except ValueError as e:
+                st.warning(f"{e}. Try different meals, or share some recipes in those categories!")
+
+    meal_plans = st.session_state.get("meal_plans")
+    if meal_plans:
+        planner = get_meal_planner(catalog_version())
+        if not meal_plans["plans"]:
+            st.info("We couldn't build a plan from the current recipes.")
+        for i, plan in enumerate(meal_plans["plans"], 1):
+            st.markdown(f"#### Option {i}")
+            total_cols = st.columns(4)
+            for col, nutrient in zip(total_cols, PLAN_NUTRIENTS):
+                total = plan["totals"][nutrient]
+                unit = "" if nutrient == "calories" else "g"
+                col.metric(nutrient.title(), f"{round(total)}{unit}",
+                           f"{round(total - meal_plans['targets'][nutrient])}{unit} vs target",
+                           delta_color="off")
+            try:
+                st.dataframe(planner.describe(plan, meal_plans["slots"]), hide_index=True,
+                             use_container_width=True)
+            except KeyError:
+                st.info("The catalog changed since this plan was made. Plan again to refresh it.")
 
-# Add required user information for Share_Your_Meal.py
-if st.session_state.authenticated and 'user_id' not in st.session_state:
-    st.session_state.user_id = "test_user_123"  # Mock user ID
-    st.session_state.username = "fitness_user"  # Set username
 
+# The session's auth state is set up by the app shell (utils/sidebar.py)
 if not st.session_state.authenticated:
     st.warning("Please log in to view your profile")
     st.button("Go to Login Page", on_click=lambda: st.switch_page("pages/Login.py"))
@@ -91,7 +262,7 @@ else:
         st.button("Edit Profile")
 
     # --- TABS FOR DIFFERENT SECTIONS ---
-    tab1, tab2, tab3 = st.tabs(["My Stats", "My Recipes", "Saved Recipes"])
+    tab1, tab2, tab3, tab4 = st.tabs(["My Stats", "My Recipes", "Saved Recipes", "Meal Planner"])
 
     with tab1:
         # Keep existing stats code...
@@ -107,11 +278,12 @@ else:
             'Calories': [round(1800 + i * 10) for i in range(len(dates))]
         })
 
-        # Nutrition trend chart
+        # Nutrition trend chart (st.tabs runs every tab on every rerun, so this uses Streamlit's own chart
+        # rather than loading plotly for each profile view)
         st.subheader("Your Macro Trends")
-        fig = px.line(nutrition_data, x='Date', y=['Protein', 'Carbs', 'Fat'],
-                      title='Daily Macro Nutrients (Last 30 Days)')
-        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Daily Macro Nutrients (Last 30 Days)")
+        with timer("My Profile", "chart"):
+            st.line_chart(nutrition_data, x='Date', y=['Protein', 'Carbs', 'Fat'], use_container_width=True)
 
         # Weekly summary stats
         st.subheader("Weekly Summary")
@@ -134,76 +306,14 @@ else:
     with tab2:
         st.subheader("My Shared Recipes")
 
-        # Use session state for user recipes first
-        user_recipes = st.session_state.user_meals if 'user_meals' in st.session_state else []
-
-        # If user_recipes is empty, try loading from CSV
-        if not user_recipes:
-            try:
-                if os.path.exists("data/meals.csv"):
-                    meals_df = pd.read_csv("data/meals.csv")
-                    # Convert DataFrame to the format expected by the UI
-                    for i, row in meals_df.iterrows():
-                        meal = {
-                            "id": i + 1,
-                            "name": row["meal_name"],
-                            "date_posted": pd.to_datetime(row["datetime"]).strftime("%b %d, %Y"),
-                            "likes": 0,
-                            "comments": 0,
-                            "image": row.get("image_path", "https://api.placeholder.com/300/200")
-                        }
-                        user_recipes.append(meal)
-
-                    # Update session state
-                    st.session_state.user_meals = user_recipes
-            except (FileNotFoundError, pd.errors.EmptyDataError):
-                # If still empty, show default examples
-                if not user_recipes:
-                    user_recipes = [
-                        {"id": 1, "name": "Protein Pancakes", "date_posted": "Feb 28, 2025", "likes": 24, "comments": 3,
-                         "image": "https://api.placeholder.com/300/200"},
-                        {"id": 2, "name": "Chicken Avocado Wrap", "date_posted": "Feb 20, 2025", "likes": 18,
-                         "comments": 2,
-                         "image": "https://api.placeholder.com/300/200"},
-                        {"id": 3, "name": "Greek Yogurt Bowl", "date_posted": "Feb 15, 2025", "likes": 32,
-                         "comments": 5,
-                         "image": "https://api.placeholder.com/300/200"}
-                    ]
-                    st.session_state.user_meals = user_recipes
-
-        if not user_recipes:
-            st.info("You haven't shared any recipes yet. Create your first one!")
-        else:
-            for i, recipe in enumerate(user_recipes):
-                col1, col2 = st.columns([1, 3])
-
-                with col1:
-                    st.image(recipe["image"], use_container_width=True)
-
-                with col2:
-                    st.subheader(recipe["name"])
-                    st.write(f"Posted on: {recipe['date_posted']}")
-                    st.write(f"❤️ {recipe['likes']} likes • 💬 {recipe['comments']} comments")
-
-                    action_col1, action_col2, action_col3 = st.columns(3)
-                    with action_col1:
-                        st.button("View Recipe", key=f"view_{i}")
-                    with action_col2:
-                        st.button("Edit", key=f"edit_{i}")
-                    with action_col3:
-                        # Update delete button to use query parameters
-                        if st.button("Delete", key=f"delete_{i}"):
-                            meal_id = recipe['id']
-                            if delete_meal(meal_id):
-                                st.success(f"Deleted {recipe['name']} successfully!")
-                                st.rerun()  # Refresh the page to show updated list
-
-                st.divider()
+        shared_recipes()
 
         # Button to create new recipe with proper navigation
         if st.button("Create New Recipe"):
             st.switch_page("pages/Share_Your_Meal.py")
 
+        export_panel()
+
     with tab3:
         # Keep existing saved recipes code...
         st.subheader("Recipes You've Saved")
@@ -224,14 +334,7 @@ else:
 
         for i, recipe in enumerate(saved_recipes):
             with saved_grid_cols[i % 2]:
-                st.image(recipe["image"], use_container_width=True)
-                st.subheader(recipe["name"])
-                st.write(f"By {recipe['author']} • Saved on {recipe['date_saved']}")
-
-                view_col, unsave_col = st.columns(2)
-                with view_col:
-                    st.button("View Recipe", key=f"saved_view_{i}")
-                with unsave_col:
-                    st.button("Unsave", key=f"saved_unsave_{i}")
+                saved_recipe_card(i, recipe)
 
-                st.write("")  # Add some spacing
\ No newline at end of file
+    with tab4:
+        meal_planner()
@@ -1,15 +1,11 @@
 # pages/recipe_detail.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
-from utils.sidebar import create_sidebar_navigation
-
-# Page configuration
-st.set_page_config(page_title="Recipe Details - Leo's Food App", page_icon="🐱", layout="wide")
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
-# Create sidebar navigation
-# sidebar = create_sidebar_navigation("pages/recipe_detail.py")
+from utils.profiling import timer
+from utils.events import track
+from utils.recipe_cards import CARD_FORMATS, get_card_cache
+from utils.comments import MAX_COMMENT_LENGTH, add_comment, format_age, get_comment_counts, get_comments
 
 # Get recipe ID from query parameters (would be implemented in a real app)
 # For demo purposes, let's create a sample recipe
@@ -63,6 +59,12 @@ recipe = {
     ]
 }
 
+# Print and share make a recipe card (see utils/recipe_cards.py)
+def show_card(card_format, target):
+    st.session_state.recipe_card_format = card_format
+    track("click", target=target)
+
+
 # --- RECIPE DETAIL PAGE ---
 
 # Top section: Image and basic info
@@ -71,16 +73,29 @@ col_img, col_info = st.columns([3, 2], gap="large")
 with col_img:
     st.image(recipe["image"], use_container_width=True)
     
-    # Action buttons
+    # Action buttons (clicks go to the event log, see utils/events.py)
     btn_col1, btn_col2, btn_col3, btn_col4 = st.columns(4)
     with btn_col1:
-        st.button("❤️ Like", key="like_btn")
+        st.button("❤️ Like", key="like_btn", on_click=track, args=("click",), kwargs={"target": "like"})
     with btn_col2:
-        st.button("🔖 Save", key="save_btn")
+        st.button("🔖 Save", key="save_btn", on_click=track, args=("click",), kwargs={"target": "save"})
     with btn_col3:
-        st.button("📤 Share", key="share_btn")
+        st.button("📤 Share", key="share_btn", on_click=show_card, args=("png", "share"))
     with btn_col4:
-        st.button("🖨️ Print", key="print_btn")
+        st.button("🖨️ Print", key="print_btn", on_click=show_card, args=("pdf", "print"))
+
+    card_format = st.session_state.get("recipe_card_format")
+    if card_format:
+        # The demo photo is a web address; cards only use local photos
+        card = get_card_cache().get(f"demo-{recipe['id']}", {
+            "name": recipe["name"], "category": recipe["category"], "image": None,
+            "protein": recipe["protein"], "carbs": recipe["carbs"], "fat": recipe["fat"],
+            "calories": recipe["calories"], "ingredients": recipe["ingredients"],
+            "instructions": recipe["instructions"]}, card_format)
+        if card_format == "png":
+            st.image(card, use_container_width=True)
+        st.download_button(f"⬇️ Download recipe card ({card_format.upper()})", card,
+                           file_name=f"recipe_card_{recipe['id']}.{card_format}", mime=CARD_FORMATS[card_format])
 
 with col_info:
     st.title(recipe["name"])
@@ -126,18 +141,22 @@ nutrition_data = pd.DataFrame({
     'Calories': [recipe['protein'] * 4, recipe['carbs'] * 4, recipe['fat'] * 9]
 })
 
-chart_col1, chart_col2 = st.columns(2)
-with chart_col1:
-    fig = px.pie(nutrition_data, values='Grams', names='Nutrient', 
-                 title='Macronutrient Distribution (grams)',
-                 color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-    st.plotly_chart(fig, use_container_width=True)
+# The pie charts are drawn on request: plotly is heavy, and it's only imported once they're switched on
+if st.toggle("Show nutrition charts", key="show_nutrition_charts"):
+    import plotly.express as px
 
-with chart_col2:
-    fig = px.pie(nutrition_data, values='Calories', names='Nutrient', 
-                 title='Calorie Distribution',
-                 color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-    st.plotly_chart(fig, use_container_width=True)
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1, timer("Recipe Detail", "chart"):
+        fig = px.pie(nutrition_data, values='Grams', names='Nutrient',
+                     title='Macronutrient Distribution (grams)',
+                     color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
+        st.plotly_chart(fig, use_container_width=True)
+
+    with chart_col2, timer("Recipe Detail", "chart"):
+        fig = px.pie(nutrition_data, values='Calories', names='Nutrient',
+                     title='Calorie Distribution',
+                     color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
+        st.plotly_chart(fig, use_container_width=True)
 
 # Ingredients and Instructions
 ingredients_col, instructions_col = st.columns(2)
@@ -152,19 +171,45 @@ with instructions_col:
     for i, step in enumerate(recipe["instructions"]):
         st.markdown(f"{i+1}. {step}")
 
-# Comments section
-st.subheader("Comments")
-with st.form("comment_form"):
-    comment_text = st.text_area("Leave a comment", placeholder="Share your thoughts or ask a question...")
+# Comments section (newest first, a page at a time)
+# The demo recipe isn't a catalog meal: its thread has its own key (see utils/comments.py), like its card
+meal_id = f"demo-{recipe['id']}"
+comments_header = st.empty()
+# Cursors of the pages shown so far ("Show more comments" adds one)
+if st.session_state.get("comment_meal_id") != meal_id:
+    st.session_state.comment_meal_id = meal_id
+    st.session_state.comment_cursors = [None]
+
+with st.form("comment_form", clear_on_submit=True):
+    comment_text = st.text_area("Leave a comment", placeholder="Share your thoughts or ask a question...",
+                                max_chars=MAX_COMMENT_LENGTH)
     submit_comment = st.form_submit_button("Post Comment")
 
 if submit_comment and comment_text:
-    st.success("Comment posted successfully!")
-
-# Sample comments
-st.markdown("**@FitnessFoodie** • 2 days ago  \nMade this yesterday and loved it! I added a tablespoon of cocoa powder for a chocolate version. Delicious!")
-
-st.markdown("**@ProteinQueen** • 5 days ago  \nThis has become my go-to breakfast! So convenient and keeps me full until lunch.")
+    try:
+        add_comment(meal_id, comment_text, user_id=st.session_state.get("user_id"),
+                    username=st.session_state.get("username") or None)
+        # Start again from the newest page so the new comment shows
+        st.session_state.comment_cursors = [None]
+        st.success("Comment posted successfully!")
+    except ValueError as e:
+        st.error(str(e))
+
+comment_count = get_comment_counts([meal_id])[meal_id]
+comments_header.subheader(f"Comments ({comment_count})")
+next_cursor = None
+with timer("Recipe Detail", "comments"):
+    for cursor in st.session_state.comment_cursors:
+        comments, next_cursor = get_comments(meal_id, before=cursor)
+        for comment in comments:
+            st.markdown(f"**@{comment['username'] or 'Guest'}** • {format_age(comment['created_at'])}  \n"
+                        f"{comment['body']}")
+
+if comment_count == 0:
+    st.caption("No comments yet. Be the first to comment!")
+if next_cursor is not None:
+    st.button("Show more comments", key="more_comments",
+              on_click=lambda cursor: st.session_state.comment_cursors.append(cursor), args=(next_cursor,))
 
 # Similar recipes
 st.subheader("You might also like")
@@ -174,4 +219,5 @@ for i, similar in enumerate(recipe["similar_recipes"]):
     with similar_cols[i]:
         st.image(similar["image"], use_container_width=True)
         st.markdown(f"**{similar['name']}**")
-        st.button("View Recipe", key=f"similar_{i}")
\ No newline at end of file
+        st.button("View Recipe", key=f"similar_{i}", on_click=track, args=("click",),
+                  kwargs={"target": "similar_recipe", "recipe_id": similar["id"]})
@@ -2,19 +2,27 @@
 import streamlit as st
 import pandas as pd
 import os
-from PIL import Image
-import io
-
-# Page configuration
-st.set_page_config(page_title="Share Your Meal - Leo's Food App", page_icon="🐱", layout="wide")
-st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
-# --- SIDEBAR NAVIGATION ---
-# st.sidebar.title("Navigation")
-# st.sidebar.page_link("Home.py", label="🏠 Home", icon="🏠")
-# st.sidebar.page_link("pages/About_Leo's_Kitchen.py", label="ℹ️ About Me")
-# st.sidebar.page_link("pages/My_Recipe.py", label="📊 My Recipes")
-# st.sidebar.page_link("pages/Leo_Chat_Bot.py", label="🤖 Chat Bot")
-# st.sidebar.page_link("pages/Share_Your_Meal.py", label="📝 Share Your Meal")
+from utils.meals import append_meal
+from utils.ingredients import save_meal_ingredients
+from utils.feed import notify_meal_added
+from utils.interactions import record_interaction
+from utils.nutrition import estimate_nutrition
+from utils.images import process_upload
+from utils.profiling import timer
+
+# Check and shrink an upload once (see utils/images.py); the result is kept until a different file is uploaded
+def processed_upload(uploaded_file):
+    upload = st.session_state.get("meal_image")
+    if upload is None or upload["file_id"] != uploaded_file.file_id:
+        try:
+            with timer("Share Your Meal", "image"):
+                upload = process_upload(uploaded_file.getvalue())
+        except ValueError as error:
+            upload = {"error": str(error)}
+        upload["file_id"] = uploaded_file.file_id
+        st.session_state.meal_image = upload
+    return upload
+
 
 # --- SHARE MEAL FORM ---
 st.title("Share Your Meal 📝")
@@ -37,9 +45,13 @@ with st.form("meal_form"):
     st.subheader("Meal Image")
     uploaded_image = st.file_uploader("Upload an image of your meal", type=["jpg", "jpeg", "png"])
     
-    # Show a preview if image is uploaded
+    # Show a preview if image is uploaded (a small copy, not the upload itself)
     if uploaded_image is not None:
-        st.image(uploaded_image, caption="Image Preview", use_column_width=True)
+        upload = processed_upload(uploaded_image)
+        if "error" in upload:
+            st.error(upload["error"])
+        else:
+            st.image(upload["preview"], caption="Image Preview", use_column_width=True)
     
     # Nutrition information
     st.subheader("Nutrition Information")
@@ -78,17 +90,65 @@ with st.form("meal_form"):
     st.subheader("Ingredients")
     ingredients = st.text_area("List your ingredients (one per line)", height=150, 
                                placeholder="1 cup oats\n2 scoops protein powder\n1 tbsp peanut butter")
+
+    servings_col, estimate_col = st.columns([1, 3])
+    with servings_col:
+        servings = st.number_input("Servings", min_value=1, value=1)
+    with estimate_col:
+        use_estimate = st.checkbox("Use nutrition estimated from ingredients",
+                                   help="Replaces the numbers above with an estimate per serving, "
+                                        "calculated from the ingredient list")
     
     st.subheader("Instructions")
     instructions = st.text_area("Recipe instructions", height=150,
                                 placeholder="1. Mix oats and protein powder\n2. Add water and microwave for 2 minutes\n3. Top with peanut butter")
     
-    # Submit button
-    submitted = st.form_submit_button("Share Your Meal")
+    # Submit buttons (inputs in a form only reach the script when a button is pressed,
+    # so the estimate has its own button rather than updating while typing)
+    submit_col1, submit_col2 = st.columns([1, 4])
+    with submit_col1:
+        submitted = st.form_submit_button("Share Your Meal")
+    with submit_col2:
+        estimate_clicked = st.form_submit_button("Estimate Nutrition")
+
+
+def show_nutrition_estimate(estimate):
+    totals = estimate["totals"]
+    st.subheader("Estimated Nutrition (per serving)")
+    est_col1, est_col2, est_col3, est_col4 = st.columns(4)
+    est_col1.metric("Protein", f"{totals['protein']}g")
+    est_col2.metric("Carbs", f"{totals['carbs']}g")
+    est_col3.metric("Fat", f"{totals['fat']}g")
+    est_col4.metric("Calories", f"{totals['calories']}")
+    st.caption(f"Fiber {totals['fiber']}g • Sugar {totals['sugar']}g • Sodium {totals['sodium']}mg • "
+               f"Cholesterol {totals['cholesterol']}mg • Saturated Fat {totals['saturated_fat']}g • "
+               f"Trans Fat {totals['trans_fat']}g")
+    with st.expander("How this was estimated"):
+        for line, food, grams in estimate["matched"]:
+            st.markdown(f"- {line} → *{food}*, {grams}g")
+    if estimate["unmatched"]:
+        st.warning("Not included (no match in our food table): " + ", ".join(estimate["unmatched"]))
+
+
+if estimate_clicked:
+    with timer("Share Your Meal", "estimate"):
+        show_nutrition_estimate(estimate_nutrition(ingredients, servings=servings))
+
+if submitted and uploaded_image is not None and "error" in processed_upload(uploaded_image):
+    st.error("Please choose a different image (or remove it) and share again.")
+    submitted = False
 
 if submitted:
     # Calculate actual calories from macros
     calculated_calories = protein * 4 + carbs * 4 + fat * 9
+
+    # Swap in the estimate from the ingredient list if asked to
+    if use_estimate and ingredients:
+        estimated = estimate_nutrition(ingredients, servings=servings)["totals"]
+        protein, carbs, fat, calories = (round(estimated[key]) for key in ("protein", "carbs", "fat", "calories"))
+        fiber, sugar, sodium = round(estimated["fiber"]), round(estimated["sugar"]), round(estimated["sodium"])
+        cholesterol, saturated_fat = round(estimated["cholesterol"]), round(estimated["saturated_fat"])
+        trans_fat = round(estimated["trans_fat"])
     
     # Create a dictionary with meal data
     meal_data = {
@@ -122,50 +182,31 @@ if submitted:
         image_filename = f"meal_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.jpg"
         image_path = os.path.join("images", image_filename)
         
-        # Save the image
-        image = Image.open(uploaded_image)
-        image.save(image_path)
+        # Save the checked, downsized copy rather than the upload
+        with open(image_path, "wb") as f:
+            f.write(processed_upload(uploaded_image)["image"])
         
         # Add image path to meal data
         meal_data["image_path"] = image_path
     
-    # Load existing meals or create new dataframe
-    try:
-        # Create data directory if it doesn't exist
-        os.makedirs("data", exist_ok=True)
-        
-        if os.path.exists("data/meals.csv"):
-            meals_df = pd.read_csv("data/meals.csv")
-        else:
-            meals_df = pd.DataFrame()
-    except (FileNotFoundError, pd.errors.EmptyDataError):
-        meals_df = pd.DataFrame()
-    
-    # Append new meal
-    new_meal_df = pd.DataFrame([meal_data])
-    meals_df = pd.concat([meals_df, new_meal_df], ignore_index=True)
-    
-    # Save to CSV
-    meals_df.to_csv("data/meals.csv", index=False)
+    # Append the new meal to the catalog
+    with timer("Share Your Meal", "save"):
+        meal_id = append_meal(meal_data)
+        # Insert it into the shared feeds, so open Home and Meal Feed pages show it without reloading
+        notify_meal_added(meal_id, meal_data)
+
+    # Sharing a meal tells the recommender what this user likes
+    if st.session_state.get("authenticated") and st.session_state.get("user_id") is not None:
+        record_interaction(st.session_state.user_id, meal_id, "share")
 
-    # After saving to CSV in Share_Your_Meal.py, modify the code after the success message
+    # Parse the ingredient list once, now, so searches can use the ingredient index
+    with timer("Share Your Meal", "parse_ingredients"):
+        save_meal_ingredients(meal_id, ingredients)
 
-    # Add to session state for My_Profile.py to use
+    # Add to session state for My_Profile.py to use (just the id; the profile loads the rest from the catalog)
     if 'user_meals' not in st.session_state:
         st.session_state.user_meals = []
-
-    # Create a meal entry in the format expected by My_Profile.py
-    new_meal_entry = {
-        "id": len(st.session_state.user_meals) + 1 if 'user_meals' in st.session_state else 1,
-        "name": meal_name,
-        "date_posted": pd.Timestamp.now().strftime("%b %d, %Y"),
-        "likes": 0,
-        "comments": 0,
-        "image": image_path if image_path else "https://api.placeholder.com/300/200"
-    }
-
-    # Add to session state
-    st.session_state.user_meals.append(new_meal_entry)
+    st.session_state.user_meals.append(meal_id)
 
     # Remove the auto-redirect that's causing the logout
     # Delete or comment out these lines:
@@ -177,23 +218,6 @@ if submitted:
     if st.button("Go to My Profile"):
         st.switch_page("pages/My_Profile.py")
 
-    # After saving to CSV in Share_Your_Meal.py, add this code:
-    if 'user_meals' not in st.session_state:
-        st.session_state.user_meals = []
-
-    # Create a meal entry in the format expected by My_Profile.py
-    new_meal_entry = {
-        "id": len(st.session_state.user_meals) + 1,
-        "name": meal_name,
-        "date_posted": pd.Timestamp.now().strftime("%b %d, %Y"),
-        "likes": 0,
-        "comments": 0,
-        "image": image_path if image_path else "https://api.placeholder.com/300/200"
-    }
-
-    # Add to session state
-    st.session_state.user_meals.append(new_meal_entry)
-
     # Success message
     st.success("Your meal has been shared successfully!")
     
@@ -204,7 +228,7 @@ if submitted:
     
     with preview_col1:
         if uploaded_image is not None:
-            st.image(uploaded_image, use_column_width=True)
+            st.image(processed_upload(uploaded_image)["preview"], use_column_width=True)
         else:
             st.image("https://api.placeholder.com/400/300", use_column_width=True)
     
@@ -225,4 +249,4 @@ if submitted:
     """, unsafe_allow_html=True)
     
     if st.button("Go to Home Page Now"):
-        st.switch_page("Home.py")
+        st.switch_page("pages/Home.py")
@@ -0,0 +1,83 @@
+# scripts/backfill_nutrition.py
+"""
+Fill in missing nutrition for meals already in the catalog, estimated from
+their ingredient lists (batch mode of utils/nutrition.py).
+
+Recipes in the catalog don't record servings, so where a meal has calories
+the whole-recipe estimate is scaled to match them; otherwise the whole recipe
+is treated as one serving.
+
+By default only micronutrients that are 0 or empty are filled; --all also
+fills empty macros. Nothing is written with --dry-run. Recipe cards of the
+meals that changed are re-rendered before the script exits.
+
+    python scripts/backfill_nutrition.py --dry-run
+    python scripts/backfill_nutrition.py --all
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from utils.meals import MEALS_CATALOG, load_meals, save_meals  # noqa: E402
+from utils.nutrition import MICRONUTRIENT_COLUMNS, NUTRIENT_COLUMNS, estimate_many  # noqa: E402
+from utils.recipe_cards import get_card_cache  # noqa: E402
+
+
+def backfill(meals_df, columns):
+    estimates = estimate_many(meals_df["ingredients"])
+
+    recorded = meals_df["calories"].fillna(0).to_numpy(dtype=float)
+    estimated = estimates["calories"].to_numpy()
+    scale = np.where((recorded > 0) & (estimated > 0), recorded / np.maximum(estimated, 1e-9), 1.0)
+    scaled = estimates.mul(scale, axis=0).round(1)
+
+    filled = {}
+    for column in columns:
+        current = meals_df[column].fillna(0) if column in meals_df.columns else 0
+        missing = (current == 0) & (scaled[column] > 0)
+        if missing.any():
+            meals_df[column] = np.where(missing, scaled[column], current)
+            filled[column] = int(missing.sum())
+    return meals_df, filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill meal nutrition from ingredient lists")
+    parser.add_argument("--catalog", default=MEALS_CATALOG, help="Catalog to update (a catalog directory or a .csv)")
+    parser.add_argument("--all", action="store_true", help="Also fill empty protein/carbs/fat/calories")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+
+    meals_df = load_meals(args.catalog)
+    if meals_df.empty:
+        print("No meals to backfill.")
+        return
+
+    columns = NUTRIENT_COLUMNS if args.all else MICRONUTRIENT_COLUMNS
+    meals_df, filled = backfill(meals_df, columns)
+
+    if not filled:
+        print("Nothing to fill.")
+        return
+    for column, count in filled.items():
+        print(f"{column}: {count} meals")
+    if args.dry_run:
+        print("Dry run, nothing written.")
+    else:
+        save_meals(meals_df, args.catalog)
+        print(f"Updated {args.catalog}")
+        # save_meals queued the recipe cards of the changed meals for re-rendering
+        cache = get_card_cache()
+        cache.wait()
+        if cache.counters["background_renders"]:
+            print(f"Re-rendered {cache.counters['background_renders']} recipe cards")
+
+
+if __name__ == "__main__":
+    main()
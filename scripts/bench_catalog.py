@@ -0,0 +1,274 @@
+# scripts/bench_catalog.py
+"""
+Synthetic-catalog benchmark for the feed, search and submission paths.
+
+Generates catalogs with the same schema as data/meals.csv (macros, tags,
+multi-line ingredients/instructions, image paths) and times the shared
+functions in utils/meals.py that Home.py, Meal_Feed.py and Share_Your_Meal.py
+use:
+  - load:        reading the catalog CSV
+  - columnar:    the Parquet catalog: full load, card-column load, one meal's details, append
+  - search:      free-text search for a few typical queries
+  - typing:      a query refined a letter at a time (each one submitted), as a text scan per query and
+                 through the prefix index
+  - category:    category filter
+  - sort:        every sort option
+  - ranges:      nutrition range queries, as a column scan and through the nutrient index
+  - page:        filter + sort + building the first page of feed cards
+  - append:      Share_Your_Meal's write path (meals appended per second)
+
+Results are written as JSON so runs can be compared between versions:
+
+    python scripts/bench_catalog.py --sizes 1000 10000 --out bench/catalog.json
+    python scripts/bench_catalog.py --sizes 1000 10000 --compare bench/catalog.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.meals import (CARD_COLUMNS, DETAIL_COLUMNS, MEAL_CATEGORIES, SORT_OPTIONS, append_meal,  # noqa: E402
+                         filter_meals, load_meal, load_meals, save_meals, sort_meals, to_feed_meal)
+from utils.nutrient_index import NutrientIndex, filter_nutrient_ranges  # noqa: E402
+from utils.search import MIN_QUERY_CHARS, PrefixIndex, prefix_search  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SEARCH_QUERIES = ["chicken", "protein", "rice", "zzz-no-match"]
+TYPED_QUERY = "chicken rice"
+RANGE_QUERIES = {
+    "high_protein_low_cal": (("protein", 30, None), ("calories", None, 400)),
+    "low_sugar_high_fiber": (("sugar", None, 5), ("fiber", 8, None), ("sodium", None, 600)),
+}
+PAGE_SIZE = 12
+
+ADJECTIVES = ["Spicy", "Creamy", "Grilled", "Roasted", "Crispy", "Smoky", "Zesty", "Hearty", "Quick", "Easy",
+              "Baked", "Stuffed", "Honey", "Garlic", "Lemon", "Herbed", "Sticky", "Loaded", "Classic", "Vegan"]
+DISHES = ["Chicken Bowl", "Protein Pancakes", "Salmon with Veggies", "Tofu Curry", "Turkey Meatballs",
+          "Quinoa Salad", "Greek Yogurt Parfait", "Egg White Scramble", "Lentil Soup", "Beef Stir Fry",
+          "Shrimp Tacos", "Overnight Oats", "Stuffed Zucchini", "Banana Bread", "Chickpea Wrap",
+          "Rice and Beans", "Protein Brownies", "Avocado Toast", "Pasta Primavera", "Sweet Potato Hash"]
+TAGS = ["high-protein", "keto", "vegan", "vegetarian", "gluten-free", "low-carb", "meal-prep", "quick",
+        "dairy-free", "budget"]
+INGREDIENTS = ["1 cup rice", "2 chicken breasts", "1 tbsp olive oil", "3 cloves garlic", "1 onion, diced",
+               "200g tofu", "1 can chickpeas", "2 eggs", "1 cup spinach", "1/2 cup greek yogurt",
+               "1 scoop protein powder", "1 banana", "1 tsp salt", "1/2 tsp black pepper", "1 cup rolled oats",
+               "150g salmon fillet", "1 sweet potato", "1 cup broccoli florets", "2 tbsp soy sauce",
+               "1 avocado", "1 cup quinoa", "250g ground turkey", "1 cup almond milk", "1 tbsp honey"]
+STEPS = ["Preheat the oven to 200C.", "Chop all the vegetables.", "Heat the oil in a large pan.",
+         "Cook the protein until golden.", "Stir in the remaining ingredients.", "Simmer for 10 minutes.",
+         "Season to taste.", "Bake for 20 minutes.", "Let it rest for 5 minutes.", "Serve warm."]
+
+
+def _text_pool(rng, parts, size, low, high):
+    # A pool of multi-line blobs to sample rows from: cheap to generate even for 1M rows
+    return np.array(["\n".join(rng.choice(parts, size=rng.integers(low, high), replace=False))
+                     for _ in range(size)], dtype=object)
+
+
+def generate_catalog(n, seed=42):
+    """Generate a synthetic catalog of n meals with the same columns as data/meals.csv."""
+    rng = np.random.default_rng(seed)
+
+    names = (np.array(ADJECTIVES, dtype=object)[rng.integers(0, len(ADJECTIVES), n)] + " " +
+             np.array(DISHES, dtype=object)[rng.integers(0, len(DISHES), n)])
+    tag_pool = np.array([", ".join(rng.choice(TAGS, size=rng.integers(0, 4), replace=False)) for _ in range(256)],
+                        dtype=object)
+    ingredient_pool = _text_pool(rng, INGREDIENTS, 2048, 3, 12)
+    instruction_pool = _text_pool(rng, STEPS, 512, 2, 8)
+
+    protein = rng.integers(0, 60, n)
+    carbs = rng.integers(0, 120, n)
+    fat = rng.integers(0, 45, n)
+    start = pd.Timestamp("2024-01-01").value // 10 ** 9
+    seconds = rng.integers(start, start + 2 * 365 * 24 * 3600, n)
+
+    return pd.DataFrame({
+        "meal_name": names,
+        "meal_category": np.array(MEAL_CATEGORIES, dtype=object)[rng.integers(0, len(MEAL_CATEGORIES), n)],
+        "meal_tags": tag_pool[rng.integers(0, len(tag_pool), n)],
+        "meal_description": "A tasty " + names.astype(str) + " that is easy to make at home.",
+        "recipe_url": "",
+        "protein": protein,
+        "carbs": carbs,
+        "fat": fat,
+        "calories": protein * 4 + carbs * 4 + fat * 9,
+        "fiber": rng.integers(0, 15, n),
+        "sugar": rng.integers(0, 40, n),
+        "sodium": rng.integers(0, 1500, n),
+        "cholesterol": rng.integers(0, 300, n),
+        "saturated_fat": rng.integers(0, 15, n),
+        "trans_fat": np.zeros(n, dtype=int),
+        "ingredients": ingredient_pool[rng.integers(0, len(ingredient_pool), n)],
+        "instructions": instruction_pool[rng.integers(0, len(instruction_pool), n)],
+        "datetime": pd.to_datetime(seconds, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+        "image_path": "images/meal_" + pd.Series(rng.integers(0, 10 ** 6, n)).astype(str).str.zfill(6) + ".jpg",
+    })
+
+
+def _time(func, repeat):
+    func()  # warm-up run, so one-off costs (imports, caches) don't count
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"median_ms": round(statistics.median(timings) * 1000, 3), "min_ms": round(min(timings) * 1000, 3)}
+
+
+def bench_size(n, workdir, repeat, appends):
+    csv_path = os.path.join(workdir, f"meals_{n}.csv")
+    start = time.perf_counter()
+    generate_catalog(n).to_csv(csv_path, index=False)
+    print(f"  generated {n:,} meals in {time.perf_counter() - start:.1f}s", flush=True)
+
+    results = {"load": _time(lambda: load_meals(csv_path), repeat)}
+    meals_df = load_meals(csv_path)
+
+    catalog_path = os.path.join(workdir, f"catalog_{n}")
+    save_meals(meals_df, catalog_path)
+    results["columnar"] = {
+        "load_all": _time(lambda: load_meals(catalog_path), repeat),
+        "load_cards": _time(lambda: load_meals(catalog_path, columns=CARD_COLUMNS), repeat),
+        "load_detail": _time(lambda: load_meal(n // 2, DETAIL_COLUMNS, catalog_path), repeat),
+    }
+
+    results["search"] = {q: _time(lambda q=q: filter_meals(meals_df, search_query=q), repeat) for q in SEARCH_QUERIES}
+
+    def build_prefix_index():
+        index = PrefixIndex()
+        with index.lock:
+            index.add_meals(meals_df)
+        return index
+
+    def type_query(search):
+        state = None
+        for end in range(MIN_QUERY_CHARS, len(TYPED_QUERY) + 1):
+            state = search(TYPED_QUERY[:end], state)
+
+    prefix_index = build_prefix_index()
+    results["typing"] = {
+        "index_build": _time(build_prefix_index, 1),
+        "scan": _time(lambda: type_query(lambda query, state: filter_meals(meals_df, search_query=query)), repeat),
+        # A fresh PrefixIndex each time would only time the trie walk; the shared prefix cache is part of the design
+        "prefix": _time(lambda: type_query(lambda query, state: prefix_search(prefix_index, query, state)[1]), repeat),
+    }
+    results["category"] = {c: _time(lambda c=c: filter_meals(meals_df, category=c), repeat)
+                           for c in ["Breakfast", "Desserts"]}
+    results["sort"] = {s: _time(lambda s=s: sort_meals(meals_df, s), repeat) for s in SORT_OPTIONS}
+
+    nutrient_index = NutrientIndex(meals_df)
+    results["ranges"] = {"index_build": _time(lambda: NutrientIndex(meals_df), repeat)}
+    for name, ranges in RANGE_QUERIES.items():
+        results["ranges"][f"{name}_scan"] = _time(lambda r=ranges: filter_nutrient_ranges(meals_df, r), repeat)
+        results["ranges"][f"{name}_index"] = _time(
+            lambda r=ranges: filter_nutrient_ranges(meals_df, r, index=nutrient_index), repeat)
+
+    def build_page():
+        page_df = sort_meals(filter_meals(meals_df, category="Dinner"), "Highest Protein").head(PAGE_SIZE)
+        return [to_feed_meal(meal) for meal in page_df.to_dict("records")]
+
+    results["page"] = _time(build_page, repeat)
+
+    # Share_Your_Meal write path, on a copy so every size starts from the same catalog
+    append_path = os.path.join(workdir, f"append_{n}.csv")
+    shutil.copyfile(csv_path, append_path)
+    new_meal = generate_catalog(1, seed=n).iloc[0].to_dict()
+    start = time.perf_counter()
+    for _ in range(appends):
+        append_meal(new_meal, append_path)
+    elapsed = time.perf_counter() - start
+    results["append"] = {"meals": appends, "total_ms": round(elapsed * 1000, 3),
+                         "meals_per_sec": round(appends / elapsed, 2)}
+
+    start = time.perf_counter()
+    for _ in range(appends):
+        append_meal(new_meal, catalog_path)
+    elapsed = time.perf_counter() - start
+    results["columnar"]["append"] = {"meals": appends, "total_ms": round(elapsed * 1000, 3),
+                                     "meals_per_sec": round(appends / elapsed, 2)}
+
+    os.remove(csv_path)
+    os.remove(append_path)
+    shutil.rmtree(catalog_path)
+    return results
+
+
+def _flatten(results, prefix=""):
+    # {"sort": {"Newest": {"median_ms": 1}}} -> {"sort/Newest": 1}
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict) and "median_ms" in value:
+            flat[prefix + key] = value["median_ms"]
+        elif isinstance(value, dict) and "meals_per_sec" in value:
+            flat[prefix + key] = 1000 / value["meals_per_sec"]  # ms per meal, so "higher is worse" everywhere
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}/"))
+    return flat
+
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Print timings that got slower than the baseline by more than the threshold. Returns the regression count."""
+    regressions = 0
+    for size, results in current["sizes"].items():
+        if size not in baseline.get("sizes", {}):
+            continue
+        old = _flatten(baseline["sizes"][size])
+        for name, new_ms in _flatten(results).items():
+            if name not in old or old[name] <= 0:
+                continue
+            if new_ms > old[name] * (1 + threshold) and new_ms - old[name] >= min_delta_ms:
+                regressions += 1
+                print(f"REGRESSION {size} {name}: {old[name]:.3f}ms -> {new_ms:.3f}ms")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feed, search and submission paths on synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Catalog sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    parser.add_argument("--appends", type=int, default=5, help="Meals appended when timing the write path")
+    parser.add_argument("--out", help="Write results JSON here (default: bench/catalog-<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this many milliseconds (timer noise)")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            print(f"Benchmarking {n:,} meals...", flush=True)
+            report["sizes"][str(n)] = bench_size(n, workdir, args.repeat, args.appends)
+
+    out = args.out or os.path.join(ROOT, "bench", f"catalog-{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# scripts/bench_startup.py
+"""
+Startup benchmark for the Streamlit page scripts.
+
+Every page is run in a fresh Python process (so nothing is already imported)
+with Streamlit's headless AppTest runner, inside the app shell the way
+Home.py runs it (see page_test in utils/sidebar.py). For each page we report:
+  - first render: the first run of the script, including all of its imports
+  - rerun: the median of the following reruns in the same process
+  - which heavy modules ended up imported by the page (AppTest itself already
+    pulls in a few, e.g. PIL and plotly; those are listed separately)
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --reruns 20 --json bench_output.json
+    python scripts/bench_startup.py --page pages/Meal_Feed.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = [
+    "pages/Home.py",
+    "pages/About_Leo's_Kitchen.py",
+    "pages/Leo_Chat_Bot.py",
+    "pages/Login.py",
+    "pages/Meal_Feed.py",
+    "pages/My_Profile.py",
+    "pages/Recipe_Detail.py",
+    "pages/Share_Your_Meal.py",
+]
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "PIL", "plotly", "openai", "sqlite3"]
+
+
+def measure_page(page, reruns):
+    # Runs inside the child process: nothing but the stdlib is imported yet
+    # Import AppTest first, so what it pulls in by itself is listed as preloaded
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+
+    preloaded = {name for name in HEAVY_MODULES if name in sys.modules}
+
+    from utils.sidebar import page_test
+    at = page_test(page, default_timeout=60)
+    start = time.perf_counter()
+    at.run()
+    first_render = time.perf_counter() - start
+
+    rerun_times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - start)
+
+    return {
+        "page": page,
+        "first_render_ms": round(first_render * 1000, 2),
+        "rerun_p50_ms": round(statistics.median(rerun_times) * 1000, 2) if rerun_times else None,
+        "rerun_max_ms": round(max(rerun_times) * 1000, 2) if rerun_times else None,
+        "heavy_imports": sorted(name for name in HEAVY_MODULES if name in sys.modules and name not in preloaded),
+        "preloaded_by_harness": sorted(preloaded),
+        "exceptions": [str(e.value) for e in at.exception],
+    }
+
+
+def run_in_fresh_process(page, reruns):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", page, "--reruns", str(reruns)]
+    result = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"page": page, "error": result.stderr.strip().splitlines()[-1:] or ["failed"]}
+    # The child prints its result as the last line of stdout
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page first-render and rerun timings")
+    parser.add_argument("--page", action="append", help="Page script to measure (default: all pages)")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns to time after the first render")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        os.chdir(ROOT)
+        sys.path.insert(0, ROOT)
+        print(json.dumps(measure_page(args.child, args.reruns)))
+        return
+
+    results = [run_in_fresh_process(page, args.reruns) for page in (args.page or PAGES)]
+
+    print(f"{'page':<32} {'first (ms)':>11} {'rerun p50':>10} {'rerun max':>10}  heavy imports")
+    for r in results:
+        if "error" in r:
+            print(f"{r['page']:<32} ERROR {r['error'][0]}")
+            continue
+        print(f"{r['page']:<32} {r['first_render_ms']:>11} {r['rerun_p50_ms']!s:>10} {r['rerun_max_ms']!s:>10}  "
+              f"{', '.join(r['heavy_imports']) or '-'}")
+
+    preloaded = sorted({name for r in results for name in r.get("preloaded_by_harness", [])})
+    if preloaded:
+        print(f"(already imported by the AppTest harness: {', '.join(preloaded)})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
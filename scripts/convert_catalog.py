@@ -0,0 +1,39 @@
+# scripts/convert_catalog.py
+"""
+CSV bridge for the columnar meal catalog (data/catalog, see utils/catalog.py).
+
+    python scripts/convert_catalog.py import    # data/meals.csv -> data/catalog
+    python scripts/convert_catalog.py export    # data/catalog -> data/meals.csv
+
+Meal ids are row positions, so both directions keep them. Importing replaces
+the catalog, so export first if it has meals the CSV doesn't.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from utils.meals import MEALS_CATALOG, MEALS_CSV, load_meals, save_meals  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the meal catalog between CSV and Parquet")
+    parser.add_argument("direction", choices=["import", "export"],
+                        help="import: CSV -> catalog, export: catalog -> CSV")
+    parser.add_argument("--csv", default=MEALS_CSV, help="CSV file")
+    parser.add_argument("--catalog", default=MEALS_CATALOG, help="Catalog directory")
+    args = parser.parse_args()
+
+    source, target = (args.csv, args.catalog) if args.direction == "import" else (args.catalog, args.csv)
+    start = time.perf_counter()
+    meals_df = load_meals(source)
+    save_meals(meals_df, target)
+    print(f"Wrote {len(meals_df):,} meals from {source} to {target} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
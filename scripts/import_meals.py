@@ -0,0 +1,197 @@
+# scripts/import_meals.py
+"""
+Bulk import of meals from CSV or JSONL files, for seeding and migrations.
+
+Input files use the catalog's columns (see data/meals.csv); JSONL has one meal
+object per line. Rows are checked before anything is written:
+  - meal_name is required, and meal_category must be one of MEAL_CATEGORIES,
+  - nutrition values must be numbers >= 0 (empty is allowed),
+  - datetime must parse (empty means "now"),
+  - other columns are ignored.
+Invalid rows are reported and skipped (--strict stops at the first file with any).
+
+An image_path pointing to a local file (relative paths are looked up in
+--images, else next to the input file) goes through the same checks and
+downsizing as uploads (utils/images.py), in parallel worker processes, and
+is saved under images/. URLs are kept as they are; missing or rejected images
+are dropped from the row, with a warning.
+
+Valid rows are appended --batch-size at a time, each batch as one write of the
+catalog (new parts and one manifest update). At the end the ingredient index
+is built for all new meals in a single transaction; the app's in-memory
+nutrient index and feed snapshots are rebuilt once, on their next refresh.
+
+    python scripts/import_meals.py new_meals.csv more_meals.jsonl --images photos/
+    python scripts/import_meals.py seed.csv --dry-run
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from utils.images import process_upload  # noqa: E402
+from utils.ingredients import sync_ingredient_index  # noqa: E402
+from utils.meals import (MEAL_CATEGORIES, MEAL_COLUMNS, MEALS_CATALOG, NUMERIC_COLUMNS, TEXT_COLUMNS,  # noqa: E402
+                         append_meals, load_meals)
+
+IMAGES_DIR = "images"
+BATCH_SIZE = 50_000
+MAX_REPORTED_ERRORS = 20
+
+
+def read_meals(path, batch_size):
+    """Yield the meals in a CSV or JSONL file, batch_size rows at a time, as text."""
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        reader = pd.read_json(path, lines=True, chunksize=batch_size, dtype=False)
+    else:
+        reader = pd.read_csv(path, chunksize=batch_size, dtype=str, keep_default_na=False)
+    with reader:
+        yield from reader
+
+
+def validate_meals(meals_df):
+    """
+    Check and normalise a batch of meals.
+
+    Returns:
+    (valid meals with MEAL_COLUMNS, list of (row position, reason) for the rows that were dropped)
+    """
+    meals_df = meals_df.reset_index(drop=True).reindex(columns=MEAL_COLUMNS)
+    problems = pd.Series("", index=meals_df.index)
+
+    def flag(mask, reason):
+        problems[mask & (problems == "")] = reason
+
+    for column in TEXT_COLUMNS:
+        text = meals_df[column].astype("string").str.strip()
+        meals_df[column] = text.mask(text == "")
+    flag(meals_df["meal_name"].isna(), "missing meal_name")
+    flag(~meals_df["meal_category"].isin(MEAL_CATEGORIES), "unknown meal_category")
+
+    for column in NUMERIC_COLUMNS:
+        raw = meals_df[column]
+        values = pd.to_numeric(raw, errors="coerce")
+        given = raw.notna() & (raw.astype("string").str.strip() != "")
+        flag(given & values.isna(), f"{column} is not a number")
+        flag(values < 0, f"{column} is negative")
+        meals_df[column] = values
+
+    stamps = pd.to_datetime(meals_df["datetime"], errors="coerce", format="mixed")
+    flag(meals_df["datetime"].notna() & stamps.isna(), "unreadable datetime")
+    now = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+    meals_df["datetime"] = stamps.dt.strftime("%Y-%m-%d %H:%M:%S").fillna(now)
+
+    invalid = problems != ""
+    return meals_df[~invalid].reset_index(drop=True), list(problems[invalid].items())
+
+
+def _import_image(source):
+    # Runs in a worker process: check and shrink one image, save it under images/ (named by content)
+    try:
+        with open(source, "rb") as f:
+            data = f.read()
+        upload = process_upload(data)
+    except OSError as error:
+        return None, f"{source}: {error.strerror or error}"
+    except ValueError as error:
+        return None, f"{source}: {error}"
+    image_path = os.path.join(IMAGES_DIR, f"meal_{hashlib.sha1(data).hexdigest()[:16]}.jpg")
+    if not os.path.exists(image_path):
+        tmp_path = f"{image_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(upload["image"])
+        os.replace(tmp_path, image_path)
+    return image_path, None
+
+
+def import_images(meals_df, search_dirs, pool):
+    """Process the batch's local images in parallel; returns the messages for the ones that were dropped."""
+    paths = meals_df["image_path"]
+    local = paths.notna() & ~paths.astype("string").str.contains("://", regex=False, na=False)
+    sources = {}
+    for position, image_path in paths[local].items():
+        candidates = [image_path] if os.path.isabs(image_path) else [os.path.join(d, image_path) for d in search_dirs]
+        sources[position] = next((c for c in candidates if os.path.isfile(c)), candidates[-1])
+
+    errors = []
+    results = pool.map(_import_image, sources.values(), chunksize=16) if sources else []
+    for position, (image_path, error) in zip(sources, results):
+        meals_df.at[position, "image_path"] = image_path if image_path else pd.NA
+        if error:
+            errors.append(error)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import meals from CSV or JSONL files into the catalog")
+    parser.add_argument("files", nargs="+", help="CSV or JSONL files of meals")
+    parser.add_argument("--catalog", default=MEALS_CATALOG, help="Catalog to append to (a catalog directory or a .csv)")
+    parser.add_argument("--images", help="Directory to look up relative image paths in")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Image processing processes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Meals per catalog write")
+    parser.add_argument("--strict", action="store_true", help="Stop on the first file with invalid rows")
+    parser.add_argument("--dry-run", action="store_true", help="Only validate; nothing is written")
+    args = parser.parse_args()
+
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    start = time.perf_counter()
+    imported = skipped = image_errors = 0
+    first_id = None
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for name in args.files:
+            path = os.path.join(CWD, name)
+            search_dirs = [os.path.join(CWD, args.images)] if args.images else []
+            search_dirs.append(os.path.dirname(path))
+
+            for offset, batch in enumerate(read_meals(path, args.batch_size)):
+                meals_df, problems = validate_meals(batch)
+                for position, reason in problems[:MAX_REPORTED_ERRORS]:
+                    print(f"{name}: row {offset * args.batch_size + position + 1}: {reason}")
+                if len(problems) > MAX_REPORTED_ERRORS:
+                    print(f"{name}: ... and {len(problems) - MAX_REPORTED_ERRORS} more invalid rows")
+                skipped += len(problems)
+                if problems and args.strict:
+                    sys.exit(f"{name} has invalid rows; nothing more imported (--strict)")
+                if args.dry_run or meals_df.empty:
+                    imported += len(meals_df)
+                    continue
+
+                errors = import_images(meals_df, search_dirs, pool)
+                for error in errors[:MAX_REPORTED_ERRORS]:
+                    print(f"{name}: image dropped: {error}")
+                image_errors += len(errors)
+
+                batch_first_id = append_meals(meals_df, args.catalog)
+                first_id = batch_first_id if first_id is None else first_id
+                imported += len(meals_df)
+
+    elapsed = time.perf_counter() - start
+    verb = "Validated" if args.dry_run else "Imported"
+    print(f"{verb} {imported:,} meals ({skipped:,} invalid rows skipped, {image_errors:,} images dropped) "
+          f"in {elapsed:.1f}s, {imported / max(elapsed, 1e-9) * 60:,.0f} meals/min")
+    if first_id is None:
+        return
+
+    # Build the ingredient index for the new meals in one pass (otherwise the first page view would).
+    # The index lives in the app database, so it only covers the app's catalog.
+    if args.catalog != MEALS_CATALOG:
+        print(f"Ingredient index not updated ({args.catalog} isn't the app catalog)")
+        return
+    index_start = time.perf_counter()
+    sync_ingredient_index(load_meals(args.catalog, columns=["meal_name"]))
+    print(f"Indexed ingredients of meals {first_id:,}-{first_id + imported - 1:,} "
+          f"in {time.perf_counter() - index_start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# scripts/load_test.py
+"""
+Headless load test: N concurrent simulated users driving the app through
+Streamlit's AppTest runner.
+
+Each simulated user runs in its own process (AppTest keeps global state, so
+several sessions can't share one interpreter) with one AppTest session per
+page, and loops through a scenario:
+  register/login -> Home -> search -> filter/sort -> view a recipe
+  -> Community Meals (filter + details) -> share a meal
+
+While they run, a probe thread keeps trying to take a write lock on the
+SQLite database to measure lock contention.
+
+By default everything runs against a throwaway copy of the app's files
+(pages, utils, data, images and food_app.db), so the real catalog and user
+table are not touched. Use --in-place to run against the working tree.
+
+    python scripts/load_test.py --users 8 --duration 60
+    python scripts/load_test.py --users 4 --iterations 3 --json bench/load.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILES = ["Home.py", "pages", "utils", "data", "images", "food_app.db", ".streamlit"]
+
+SEARCH_QUERIES = ["chicken", "protein", "rice", "oats", "salad"]
+CATEGORIES = ["All", "Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"]
+SORTS = ["Newest", "Most Popular", "Top Rated", "Highest Protein", "Lowest Calories"]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+
+    def record(self, step, seconds, error=None):
+        self.latencies[step].append(seconds)
+        if error:
+            self.errors[step] += 1
+            self.error_samples.setdefault(step, error)
+
+    def merge(self, other):
+        for step, values in other["latencies"].items():
+            self.latencies[step].extend(values)
+        for step, count in other["errors"].items():
+            self.errors[step] += count
+        for step, error in other["error_samples"].items():
+            self.error_samples.setdefault(step, error)
+
+    def to_dict(self):
+        return {"latencies": dict(self.latencies), "errors": dict(self.errors), "error_samples": self.error_samples}
+
+
+def _percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+
+    def pct(p):
+        return round(values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] * 1000, 2)
+
+    return {"count": len(values), "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99), "max_ms": pct(100)}
+
+
+def _find_button(at, label):
+    for button in at.button:
+        if button.label == label:
+            return button
+    return None
+
+
+class SimulatedUser:
+    def __init__(self, user_no, stats, rng):
+        from utils.sidebar import page_test
+
+        self.page_test = page_test
+        self.user_no = user_no
+        self.stats = stats
+        self.rng = rng
+        self.session = {"authenticated": False, "username": "", "user_id": None}
+
+    def _page(self, path):
+        at = self.page_test(path, default_timeout=120)
+        for key, value in self.session.items():
+            at.session_state[key] = value
+        return at
+
+    def _step(self, name, action):
+        # One rerun of one page; anything the script raised counts as an error for that step
+        start = time.perf_counter()
+        error = None
+        try:
+            at = action()
+            if at is not None and at.exception:
+                error = str(at.exception[0].value)
+        except Exception as e:  # the driver itself must keep going
+            error = f"{type(e).__name__}: {e}"
+        self.stats.record(name, time.perf_counter() - start, error)
+
+    def login(self, iteration):
+        def action():
+            at = self._page("pages/Login.py")
+            at.session_state["authenticated"] = False
+            at.run()
+            # Register tab inputs come after the two login inputs
+            username = f"loadtest_{self.user_no}_{iteration}_{self.rng.randrange(10 ** 9)}"
+            inputs = at.text_input
+            inputs[2].input(username)
+            inputs[3].input(f"{username}@example.com")
+            inputs[4].input("password123")
+            inputs[5].input("password123")
+            at.checkbox[1].check()
+            _find_button(at, "Register").click()
+            at.run()
+            if at.session_state["authenticated"]:
+                self.session = {"authenticated": True, "username": at.session_state["username"],
+                                "user_id": at.session_state["user_id"]}
+            return at
+
+        self._step("login", action)
+
+    def browse_home(self):
+        at = self._page("pages/Home.py")
+        self._step("home", lambda: at.run())
+        self._step("search", lambda: at.text_input[0].input(self.rng.choice(SEARCH_QUERIES)).run())
+        self._step("filter", lambda: at.selectbox[0].select(self.rng.choice(CATEGORIES)).run())
+        self._step("sort", lambda: at.selectbox[1].select(self.rng.choice(SORTS)).run())
+        # The search/filter may have left nothing to click on
+        view = _find_button(at, "View Recipe")
+        if view is not None:
+            self._step("view_recipe", lambda: view.click().run())
+
+    def browse_feed(self):
+        at = self._page("pages/Meal_Feed.py")
+        self._step("feed", lambda: at.run())
+        if at.sidebar.selectbox:
+            options = at.sidebar.selectbox[0].options
+            self._step("feed_filter", lambda: at.sidebar.selectbox[0].select(self.rng.choice(options)).run())
+        details = _find_button(at, "View Details")
+        if details is not None:
+            self._step("feed_details", lambda: details.click().run())
+
+    def share_meal(self, iteration):
+        def action():
+            at = self._page("pages/Share_Your_Meal.py")
+            at.run()
+            at.text_input[0].input(f"Load Test Meal {self.user_no}-{iteration}")
+            at.text_area[1].input("1 cup rice\n200g chicken breast\n1 tbsp olive oil")
+            at.text_area[2].input("Cook the rice\nGrill the chicken\nServe")
+            _find_button(at, "Share Your Meal").click()
+            at.run()
+            return at
+
+        self._step("share", action)
+
+    def run(self, deadline, iterations):
+        iteration = 0
+        while (iterations is None or iteration < iterations) and (deadline is None or time.time() < deadline):
+            self.login(iteration)
+            self.browse_home()
+            self.browse_feed()
+            self.share_meal(iteration)
+            iteration += 1
+
+
+def run_user(user_no, seed, workdir, deadline, iterations):
+    """Process entry point for one simulated user."""
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    stats = Stats()
+    SimulatedUser(user_no, stats, random.Random(seed + user_no)).run(deadline, iterations)
+    return stats.to_dict()
+
+
+def lock_probe(db_path, stop, results):
+    """Repeatedly take and release a write lock to measure how long writers wait for each other."""
+    conn = sqlite3.connect(db_path, timeout=5, isolation_level=None, check_same_thread=False)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("ROLLBACK")
+            results["waits"].append(time.perf_counter() - start)
+        except sqlite3.OperationalError:
+            # Still locked after the 5s busy timeout
+            results["timeouts"] += 1
+        time.sleep(0.05)
+    conn.close()
+
+
+def prepare_workdir(in_place):
+    if in_place:
+        return ROOT, None
+    tmp = tempfile.TemporaryDirectory(prefix="leo_load_")
+    for name in APP_FILES:
+        src = os.path.join(ROOT, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(tmp.name, name), ignore=shutil.ignore_patterns("__pycache__"))
+        elif os.path.exists(src):
+            shutil.copy2(src, os.path.join(tmp.name, name))
+    return tmp.name, tmp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent headless load test for Leo's Kitchen")
+    parser.add_argument("--users", type=int, default=4, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run (ignored with --iterations)")
+    parser.add_argument("--iterations", type=int, help="Scenario loops per user instead of a fixed duration")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-place", action="store_true", help="Run against the working tree instead of a copy")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    workdir, tmp = prepare_workdir(args.in_place)
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+
+    # Make sure the users table exists before anyone probes it
+    from utils.db import get_db_connection, init_user_table
+
+    conn = get_db_connection()
+    init_user_table(conn)
+    conn.close()
+
+    stats = Stats()
+    probe_results = {"waits": [], "timeouts": 0}
+    stop = threading.Event()
+    probe = threading.Thread(target=lock_probe, args=("food_app.db", stop, probe_results), daemon=True)
+    probe.start()
+
+    print(f"Running {args.users} simulated users in {workdir}...", flush=True)
+    start = time.perf_counter()
+    deadline = None if args.iterations else time.time() + args.duration
+    with ProcessPoolExecutor(max_workers=args.users) as pool:
+        futures = [pool.submit(run_user, i, args.seed, workdir, deadline, args.iterations)
+                   for i in range(args.users)]
+        for future in futures:
+            stats.merge(future.result())
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe.join()
+
+    all_latencies = [v for values in stats.latencies.values() for v in values]
+    report = {
+        "users": args.users,
+        "elapsed_s": round(elapsed, 2),
+        "reruns": len(all_latencies),
+        "throughput_reruns_per_s": round(len(all_latencies) / elapsed, 2) if elapsed else 0,
+        "rerun_latency": _percentiles(all_latencies),
+        "steps": {step: {**_percentiles(values), "errors": stats.errors.get(step, 0)}
+                  for step, values in sorted(stats.latencies.items())},
+        "error_samples": stats.error_samples,
+        "db_lock": {"probes": len(probe_results["waits"]), "timeouts": probe_results["timeouts"],
+                    "wait": _percentiles(probe_results["waits"])},
+    }
+
+    print(f"\n{report['reruns']} reruns in {report['elapsed_s']}s "
+          f"-> {report['throughput_reruns_per_s']} reruns/s")
+    print(f"{'step':<14} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for step, s in report["steps"].items():
+        print(f"{step:<14} {s['count']:>6} {s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9} {s['errors']:>7}")
+    lock = report["db_lock"]
+    print(f"\nDB write lock: {lock['probes']} probes, {lock['timeouts']} timeouts, "
+          f"wait p50 {lock['wait'].get('p50_ms')}ms / p99 {lock['wait'].get('p99_ms')}ms")
+    for step, error in report["error_samples"].items():
+        print(f"  first {step} error: {error}")
+
+    if json_path:
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if tmp is not None:
+        os.chdir(ROOT)
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
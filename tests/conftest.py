@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+# The app runs from the repository root (streamlit run Home.py), so that's where utils is imported from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import comments, db, ingredients, interactions, ratings, search  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """A fresh app database for one test, used by every module that opens its own connection."""
+    path = str(tmp_path / "food_app.db")
+
+    def get_db_connection(path=path):
+        return db.get_db_connection(path)
+
+    for module in (comments, ingredients, interactions, ratings, search):
+        monkeypatch.setattr(module, "get_db_connection", get_db_connection)
+    for module in (comments, ingredients, interactions, ratings):
+        # Tables are created once per process; this test has a new database
+        monkeypatch.setattr(module, "_tables_ready", False)
+    # The process-wide indexes remember how far into the previous test's tables they've read
+    monkeypatch.setattr(ingredients, "_index", ingredients.IngredientIndex())
+    monkeypatch.setattr(search, "_index", search.PrefixIndex())
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = db.get_db_connection(db_path)
+    yield conn
+    conn.close()
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from utils import catalog
+
+TEXT_COLUMNS = ["meal_name", "ingredients"]
+NUMERIC_COLUMNS = ["protein", "calories"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def meals(names, protein=10):
+    return pd.DataFrame({"meal_name": names, "ingredients": [f"{name} ingredients" for name in names],
+                         "protein": [protein] * len(names), "calories": [250.5] * len(names)})
+
+
+def read(path, columns=("meal_name", "protein", "calories")):
+    return catalog.read_catalog(path, list(columns), TEXT_COLUMNS, NUMERIC_COLUMNS)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "catalog")
+
+
+def test_an_empty_catalog(path):
+    assert catalog.read_manifest(path) is None
+    assert catalog.catalog_version(path) is None
+    assert read(path).empty
+
+
+def test_write_and_read(path):
+    catalog.write_catalog(path, meals(["Soup", "Salad", "Stew"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    meals_df = read(path)
+    assert list(meals_df.index) == [0, 1, 2]
+    assert list(meals_df["meal_name"]) == ["Soup", "Salad", "Stew"]
+    # Only the asked-for columns are read, and whole-number columns come back as integers like read_csv's
+    assert list(meals_df.columns) == ["meal_name", "protein", "calories"]
+    assert meals_df["protein"].dtype == "int64"
+    assert meals_df["calories"].dtype == "float64"
+
+
+def test_appends_continue_the_ids_and_change_the_version(path):
+    catalog.write_catalog(path, meals(["Soup"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    version = catalog.catalog_version(path)
+    assert catalog.append_rows(path, meals(["Salad", "Stew"]), TEXT_COLUMNS, NUMERIC_COLUMNS) == 1
+    assert catalog.append_rows(path, meals(["Curry"]), TEXT_COLUMNS, NUMERIC_COLUMNS) == 3
+    assert catalog.catalog_version(path) != version
+    assert list(read(path)["meal_name"]) == ["Soup", "Salad", "Stew", "Curry"]
+    assert catalog.read_manifest(path)["rows"] == 4
+
+
+def test_read_rows_reads_only_the_meals_asked_for(path):
+    catalog.write_catalog(path, meals(["Soup", "Salad"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    catalog.append_rows(path, meals(["Stew", "Curry"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    rows = catalog.read_rows(path, [3, 1], ["meal_name", "ingredients"], TEXT_COLUMNS, NUMERIC_COLUMNS)
+    assert rows.to_dict("index") == {1: {"meal_name": "Salad", "ingredients": "Salad ingredients"},
+                                     3: {"meal_name": "Curry", "ingredients": "Curry ingredients"}}
+    assert catalog.read_rows(path, [99], ["meal_name"], TEXT_COLUMNS, NUMERIC_COLUMNS).empty
+
+
+def test_small_trailing_parts_are_merged(path, monkeypatch):
+    monkeypatch.setattr(catalog, "MAX_PARTS", 3)
+    catalog.write_catalog(path, meals(["Soup"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    for n in range(5):
+        catalog.append_rows(path, meals([f"Meal {n}"], protein=n + 0.5), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    manifest = catalog.read_manifest(path)
+    assert len(manifest["parts"]) <= 3
+    # The merged parts' files are gone, and nothing was lost or reordered
+    assert sorted(name for name in os.listdir(path) if name.endswith(".parquet")) \
+        == sorted(part["file"] for part in manifest["parts"])
+    meals_df = read(path)
+    assert list(meals_df["meal_name"]) == ["Soup"] + [f"Meal {n}" for n in range(5)]
+    assert meals_df["protein"].dtype == "float64"
+
+
+def test_appends_from_several_processes_are_all_kept(path):
+    catalog.write_catalog(path, meals(["Soup"]), TEXT_COLUMNS, NUMERIC_COLUMNS)
+    script = (
+        "import sys, pandas as pd\n"
+        "from utils import catalog\n"
+        "for n in range(15):\n"
+        "    catalog.append_rows(sys.argv[1], pd.DataFrame({'meal_name': [f'{sys.argv[2]}-{n}']}),\n"
+        "                        ['meal_name', 'ingredients'], ['protein', 'calories'])\n"
+    )
+    writers = [subprocess.Popen([sys.executable, "-c", script, path, str(writer)], cwd=ROOT) for writer in range(4)]
+    assert [writer.wait(timeout=120) for writer in writers] == [0] * 4
+
+    meals_df = read(path)
+    assert len(meals_df) == catalog.read_manifest(path)["rows"] == 1 + 4 * 15
+    assert list(meals_df.index) == list(range(len(meals_df)))
+    assert set(meals_df["meal_name"]) == {"Soup"} | {f"{writer}-{n}" for writer in range(4) for n in range(15)}
@@ -0,0 +1,83 @@
+import pytest
+
+from utils import comments
+from utils.comments import (add_comment, format_age, get_comment_counts, get_comments, init_comment_tables,
+                            rebuild_comment_counts, thread_key)
+
+
+def all_pages(meal_id, conn, limit):
+    pages, cursor = [], None
+    while True:
+        page, cursor = get_comments(meal_id, before=cursor, limit=limit, conn=conn)
+        pages.append([comment["body"] for comment in page])
+        if cursor is None:
+            return pages
+
+
+def test_pages_are_newest_first_and_cover_the_thread_once(conn):
+    for n in range(7):
+        add_comment(1, f"comment {n}", conn=conn)
+    add_comment(2, "other meal", conn=conn)
+    assert all_pages(1, conn, limit=3) == [["comment 6", "comment 5", "comment 4"],
+                                           ["comment 3", "comment 2", "comment 1"],
+                                           ["comment 0"]]
+
+
+def test_a_full_last_page_has_no_cursor(conn):
+    for n in range(4):
+        add_comment(1, f"comment {n}", conn=conn)
+    assert [len(page) for page in all_pages(1, conn, limit=2)] == [2, 2]
+    assert get_comments(3, conn=conn) == ([], None)
+
+
+def test_comments_at_the_same_time_are_ordered_by_id(conn, monkeypatch):
+    # The cursor is (created_at, id), so comments written in the same instant are neither skipped nor repeated
+    monkeypatch.setattr(comments.time, "time", lambda: 1000.0)
+    for n in range(5):
+        add_comment(1, f"comment {n}", conn=conn)
+    assert all_pages(1, conn, limit=2) == [["comment 4", "comment 3"], ["comment 2", "comment 1"], ["comment 0"]]
+
+
+def test_comments_are_checked(conn):
+    with pytest.raises(ValueError):
+        add_comment(1, "   ", conn=conn)
+    with pytest.raises(ValueError):
+        add_comment(1, "x" * (comments.MAX_COMMENT_LENGTH + 1), conn=conn)
+    assert get_comment_counts([1], conn=conn) == {1: 0}
+
+
+def test_counts_are_written_with_the_comment(conn):
+    for meal_id in (1, 1, 2, "demo-1"):
+        add_comment(meal_id, "hi", conn=conn)
+    assert get_comment_counts([1, 2, 3, "demo-1"], conn=conn) == {1: 2, 2: 1, 3: 0, "demo-1": 1}
+    conn.execute("DELETE FROM comment_counts")
+    rebuild_comment_counts(conn)
+    assert get_comment_counts([1, 2, "demo-1"], conn=conn) == {1: 2, 2: 1, "demo-1": 1}
+
+
+def test_demo_threads_are_kept_apart_from_catalog_meals(conn):
+    assert thread_key("1") == 1
+    assert thread_key(1.0) == 1
+    assert thread_key("demo-1") == "demo-1"
+    add_comment("demo-1", "on the demo recipe", conn=conn)
+    add_comment(1, "on catalog meal 1", conn=conn)
+    assert [c["body"] for c in get_comments("demo-1", conn=conn)[0]] == ["on the demo recipe"]
+    assert [c["body"] for c in get_comments("1", conn=conn)[0]] == ["on catalog meal 1"]
+
+
+def test_an_integer_keyed_counts_table_is_recreated(conn):
+    conn.execute("CREATE TABLE comment_counts (meal_id INTEGER PRIMARY KEY, count INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE comments (id INTEGER PRIMARY KEY AUTOINCREMENT, meal_id INTEGER NOT NULL, "
+                 "user_id INTEGER, username TEXT, body TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.executemany("INSERT INTO comments (meal_id, body, created_at) VALUES (?, 'hi', 0)", [(4,), (4,), (5,)])
+    conn.commit()
+    init_comment_tables(conn)
+    assert get_comment_counts([4, 5], conn=conn) == {4: 2, 5: 1}
+    add_comment("demo-1", "text keys fit now", conn=conn)
+    assert get_comment_counts(["demo-1"], conn=conn) == {"demo-1": 1}
+
+
+def test_format_age():
+    assert format_age(100, now=130) == "just now"
+    assert format_age(0, now=90) == "1 minute ago"
+    assert format_age(0, now=3 * 86400) == "3 days ago"
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from utils import events, interactions
+from utils.events import MAX_RETRIES, Event, EventLog
+
+
+class ListSink:
+    """Keeps what it's given; can be made to hold up the writer, or to fail."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, batch):
+        self.writing.set()
+        self.release.wait(10)
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append([event.meal_id for event in batch])
+
+    def close(self):
+        pass
+
+
+def event(n):
+    return Event(time.time(), "view", "Home", "session", 1, n, None)
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_events_are_dropped_and_counted_while_the_writer_is_behind():
+    sink = ListSink()
+    sink.release.clear()
+    # The writer only wakes up for a full batch
+    log = EventLog([sink], capacity=4, batch_size=2, flush_interval=60)
+    assert log.put(event(0)) and log.put(event(1))
+    # The writer has the first batch and is stuck in the sink
+    assert sink.writing.wait(10)
+    assert all(log.put(event(n)) for n in range(2, 6))
+    assert not log.put(event(6))
+    assert not log.put(event(7))
+    stats = log.stats()
+    assert stats["pending"] == 4 and stats["dropped_full"] == 2 and stats["enqueued"] == 6
+
+    sink.release.set()
+    log.close()
+    assert [n for batch in sink.batches for n in batch] == [0, 1, 2, 3, 4, 5]
+    assert log.stats()["written"] == 6
+
+
+def test_a_failing_batch_is_retried_on_the_failed_sink_only_then_dropped():
+    good, bad = ListSink(), ListSink(fail=True)
+    log = EventLog([good, bad], capacity=10, batch_size=1, flush_interval=0.01)
+    log.put(event(0))
+    wait_for(lambda: log.stats()["dropped_failed"])
+    bad.fail = False
+    log.put(event(1))
+    log.close()
+    stats = log.stats()
+    assert stats["write_errors"] == MAX_RETRIES
+    assert stats["dropped_failed"] == 1
+    assert stats["written"] == 1
+    assert good.batches == [[0], [1]]
+    assert bad.batches == [[1]]
+
+
+def test_closing_writes_out_whats_buffered():
+    sink = ListSink()
+    log = EventLog([sink], capacity=10, batch_size=100, flush_interval=60)
+    for n in range(3):
+        log.put(event(n))
+    log.close()
+    assert sink.batches == [[0, 1, 2]]
+    assert not log.thread.is_alive()
+
+
+def test_interaction_kinds_match_the_interactions_table():
+    assert events.INTERACTION_KINDS == interactions.INTERACTION_KINDS
@@ -0,0 +1,76 @@
+import io
+import json
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import export
+from utils.export import EXPORT_COLUMNS, NUMERIC_COLUMNS, DailyTotals, iter_meals
+from utils.meals import append_meals
+
+
+def meals(n=23):
+    rng = np.random.default_rng(0)
+    meals_df = pd.DataFrame({
+        "meal_name": [f"Meal {i}" for i in range(n)],
+        "meal_category": "Lunch",
+        "protein": rng.integers(5, 50, n).astype(float),
+        "carbs": rng.integers(10, 90, n).astype(float),
+        "fat": rng.integers(2, 30, n).astype(float),
+        "calories": rng.integers(200, 900, n).astype(float),
+        # Three meals a day, so chunks split days
+        "datetime": [f"2025-02-{1 + i // 3:02d} {8 + i % 3 * 5}:00:00" for i in range(n)],
+    })
+    meals_df.loc[4, "fat"] = np.nan  # counts as nothing
+    return meals_df
+
+
+@pytest.fixture(params=["catalog", "meals.csv"])
+def path(request, tmp_path):
+    path = str(tmp_path / request.param)
+    append_meals(meals(), path)
+    return path
+
+
+def expected_days(meals_df):
+    days = meals_df.assign(date=pd.to_datetime(meals_df["datetime"]).dt.strftime("%Y-%m-%d"))
+    sums = days.reindex(columns=["date"] + NUMERIC_COLUMNS).fillna(0).groupby("date").sum()
+    return [{"date": date, "meals": int(count), **{c: round(float(row[c]), 2) for c in NUMERIC_COLUMNS}}
+            for (date, row), count in zip(sums.iterrows(), days.groupby("date").size())]
+
+
+def test_meals_are_read_in_chunks_in_id_order(path):
+    wanted = [20, 3, 7, 8, 99, 3, 0, 15, 11, 12, 19]  # 99 isn't in the catalog
+    chunks = list(iter_meals(wanted, chunk_rows=4, path=path))
+    assert all(len(chunk) <= 4 for chunk in chunks)
+    assert all(list(chunk.columns) == EXPORT_COLUMNS for chunk in chunks)
+    ids = [meal_id for chunk in chunks for meal_id in chunk.index]
+    assert ids == [0, 3, 7, 8, 11, 12, 15, 19, 20]
+    assert [name for chunk in chunks for name in chunk["meal_name"]] == [f"Meal {i}" for i in ids]
+
+
+def test_daily_totals_summed_chunk_by_chunk_match_a_sum_over_all_meals():
+    meals_df = meals()
+    totals = DailyTotals()
+    for start in range(0, len(meals_df), 5):
+        totals.add(meals_df.iloc[start:start + 5])
+    assert totals.rows() == expected_days(meals_df)
+    assert sum(day["meals"] for day in totals.rows()) == len(meals_df)
+
+
+def test_exports_in_small_chunks_hold_every_meal(path, monkeypatch):
+    monkeypatch.setattr(export, "iter_meals", partial(iter_meals, chunk_rows=4))
+    meal_ids = range(23)
+
+    exported = pd.read_csv(io.StringIO("".join(export.meals_csv(meal_ids, path))), index_col="meal_id")
+    assert list(exported.index) == list(meal_ids)
+    assert list(exported.columns) == EXPORT_COLUMNS
+
+    daily = pd.read_csv(io.StringIO("".join(export.daily_nutrition_csv(meal_ids, path))))
+    assert daily.fillna(0).to_dict("records") == expected_days(meals())
+
+    data = json.loads("".join(export.export_json(meal_ids, path)))
+    assert [meal["meal_id"] for meal in data["meals"]] == list(meal_ids)
+    assert data["daily_nutrition"] == expected_days(meals())
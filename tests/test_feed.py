@@ -0,0 +1,66 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.feed import FeedSnapshot, FeedStore
+from utils.meals import SORT_OPTIONS, append_meal, filter_meals, sort_meals
+
+
+def meal(name, category="Lunch", protein=20, calories=400, day=1):
+    return {"meal_name": name, "meal_category": category, "meal_tags": "", "protein": protein, "carbs": 30,
+            "fat": 10, "calories": calories, "datetime": f"2025-01-{day:02d} 12:00:00"}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "catalog")
+    for n in range(3):
+        append_meal(meal(f"Meal {n}", day=n + 1), path)
+    return path
+
+
+def test_a_meal_added_by_this_process_is_inserted_without_a_reload(path):
+    store = FeedStore(path)
+    store.refresh()
+    meal_id = append_meal(meal("Mine", day=9), path)
+    store.add_meal(meal_id, meal("Mine", day=9))
+    version = store.version
+    store.refresh()
+    # The file's version was taken for the store's: nothing to reload
+    assert store.version == version
+    assert list(store.order("All", "Newest")) == [3, 2, 1, 0]
+
+
+def test_a_meal_another_process_added_meanwhile_isnt_missed(path):
+    store = FeedStore(path)
+    store.refresh()
+    meal_id = append_meal(meal("Mine", day=9), path)
+    # Another process appends before this one tells its store
+    append_meal(meal("Theirs", day=5), path)
+    store.add_meal(meal_id, meal("Mine", day=9))
+    store.refresh()
+    assert list(store.meals_df["meal_name"]) == ["Meal 0", "Meal 1", "Meal 2", "Mine", "Theirs"]
+    assert list(store.order("All", "Newest")) == [3, 4, 2, 1, 0]
+
+
+def test_inserted_meals_go_where_sort_meals_puts_them():
+    # Ties and missing values in every sort column, and meals of other categories
+    meals_df = pd.DataFrame({
+        "meal_name": [f"Meal {i}" for i in range(12)],
+        "meal_category": ["Lunch", "Dinner", "Lunch", "Lunch", "Snacks", "Lunch",
+                          "Dinner", "Lunch", "Lunch", "Dinner", "Lunch", "Lunch"],
+        "protein": [20, 35, 20, np.nan, 5, 35, 20, np.nan, 50, 20, 1, 20],
+        "calories": [400, 600, np.nan, 400, 150, 700, 400, 300, np.nan, 400, 400, 900],
+        "datetime": ["2025-01-02 12:00:00", "2025-01-01 18:00:00", "2025-01-02 12:00:00", None,
+                     "2025-01-03 10:00:00", "2025-01-01 18:00:00", "2025-01-03 10:00:00", "2025-01-05 12:00:00",
+                     "2025-01-02 12:00:00", None, "2024-12-31 12:00:00", "2025-01-01 18:00:00"],
+    })
+    known = 5
+    for category, sort_by in product(["All", "Lunch", "Dinner"], list(SORT_OPTIONS) + ["Unknown"]):
+        snapshot = FeedSnapshot(meals_df.iloc[:known], category, sort_by)
+        for meal_id in range(known, len(meals_df)):
+            snapshot.insert(meal_id, meals_df.loc[meal_id].to_dict())
+            expected = sort_meals(filter_meals(meals_df.iloc[:meal_id + 1], category=category), sort_by)
+            assert list(snapshot.ids) == list(expected.index), (category, sort_by, meal_id)
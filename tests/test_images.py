@@ -0,0 +1,69 @@
+import io
+import struct
+import zlib
+
+import pytest
+from PIL import Image, ImageFile
+
+from utils import images
+from utils.images import process_upload
+
+
+def encode(image, fmt="PNG", **params):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def claiming(data, width, height):
+    # A PNG whose header claims other dimensions than its (tiny) pixel data has
+    header = data[12:16] + struct.pack(">II", width, height) + data[24:29]
+    return data[:8] + struct.pack(">I", 13) + header + struct.pack(">I", zlib.crc32(header)) + data[33:]
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "P"])
+def test_the_measured_peak_is_what_the_header_projected(mode):
+    data = encode(Image.new(mode, (640, 480)))
+    with Image.open(io.BytesIO(data)) as image:
+        projected = images._projected_peak(image)
+    result = process_upload(data)
+    assert result["peak_bytes"] == projected
+    assert result["size"] == (640, 480)
+
+
+def test_a_transparent_png_within_the_decode_cap_is_refused_over_the_peak_cap(monkeypatch):
+    # 4 bytes a pixel decoded, then an RGBA copy and an RGB background: 11 bytes a pixel at the peak
+    data = encode(Image.new("RGBA", (400, 400)))
+    monkeypatch.setattr(images, "MAX_DECODE_BYTES", 400 * 400 * 4)
+    monkeypatch.setattr(images, "MAX_PEAK_BYTES", 400 * 400 * 11 - 1)
+    with pytest.raises(ValueError, match="too large to process"):
+        process_upload(data)
+    monkeypatch.setattr(images, "MAX_PEAK_BYTES", 400 * 400 * 11)
+    assert process_upload(data)["peak_bytes"] == 400 * 400 * 11
+
+
+@pytest.mark.parametrize("mode, width, height, message", [
+    ("1", 20_000, 20_000, "under 40 megapixels"),  # Pillow's own bomb check
+    ("L", 9_000, 9_000, "is 9000×9000"),
+    ("RGBA", 6_000, 6_000, "too large to process"),
+])
+def test_a_decompression_bomb_is_refused_before_it_is_decoded(monkeypatch, mode, width, height, message):
+    data = claiming(encode(Image.new(mode, (8, 8))), width, height)
+    assert len(data) < 1000
+
+    def load(image):
+        raise AssertionError("decoded")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", load)
+    with pytest.raises(ValueError, match=message):
+        process_upload(data)
+
+
+def test_uploads_that_arent_small_images_are_refused(monkeypatch):
+    monkeypatch.setattr(images, "MAX_UPLOAD_BYTES", 1000)
+    with pytest.raises(ValueError, match="larger than"):
+        process_upload(b"\0" * 1001)
+    with pytest.raises(ValueError, match="isn't a JPEG or PNG"):
+        process_upload(b"<svg></svg>")
+    with pytest.raises(ValueError, match="isn't a JPEG or PNG"):
+        process_upload(encode(Image.new("RGB", (8, 8)), "GIF"))
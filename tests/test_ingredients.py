@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from utils import ingredients
+from utils.ingredients import get_meal_ingredients, parse_ingredient_line, parse_ingredients, \
+    save_many_meal_ingredients, save_meal_ingredients, singular, split_ingredient_query, sync_ingredient_index
+
+
+@pytest.mark.parametrize("line, quantity, unit, name", [
+    ("1 1/2 cups rolled oats", 1.5, "cup", "rolled oat"),
+    ("½ tsp salt", 0.5, "tsp", "salt"),
+    ("1½ cups milk", 1.5, "cup", "milk"),
+    ("2-3 cloves garlic, minced", 2.5, "clove", "garlic"),
+    ("1 to 2 tbsp olive oil", 1.5, "tbsp", "olive oil"),
+    ("1 (14 oz) can chickpeas, drained", 1.0, "can", "chickpea"),
+    ("200g chicken breast", 200.0, "g", "chicken breast"),
+    ("2 T sugar", 2.0, "tbsp", "sugar"),
+    ("2 t vanilla", 2.0, "tsp", "vanilla"),
+    ("2 c flour", 2.0, "cup", "flour"),
+    ("- 1 lb ground beef", 1.0, "lb", "beef"),
+    ("3 large eggs", 3.0, None, "egg"),
+    ("1 cup cherry tomatoes", 1.0, "cup", "cherry tomato"),
+    # A single letter is only a unit right after a number
+    ("t-bone steak", None, None, "t bone steak"),
+    ("Finely chopped Onions (red)", None, None, "onion"),
+    ("Salt and pepper to taste", None, None, "salt and pepper"),
+])
+def test_parse_ingredient_line(line, quantity, unit, name):
+    item = parse_ingredient_line(line)
+    assert (item["quantity"], item["unit"], item["name"]) == (quantity, unit, name)
+
+
+def test_blank_lines_and_lines_without_a_name_are_skipped():
+    assert parse_ingredient_line("  ") is None
+    assert [item["name"] for item in parse_ingredients("2 eggs\n\n  \n• 1 cup rice\nto taste")] == ["egg", "rice"]
+    assert parse_ingredients(None) == []
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("tomatoes", "tomato"), ("berries", "berry"), ("peaches", "peach"), ("radishes", "radish"), ("eggs", "egg"),
+    ("swiss", "swiss"), ("peas", "pea"), ("gas", "gas"), ("rice", "rice"),
+])
+def test_singular(word, expected):
+    assert singular(word) == expected
+
+
+def test_split_ingredient_query():
+    assert split_ingredient_query("chicken, rice and tomatoes") == ["chicken", "rice", "tomatoes"]
+    assert split_ingredient_query("What can I make with garlic & basil + olive oil") == ["garlic", "basil", "olive oil"]
+    assert split_ingredient_query("sandwich") == ["sandwich"]
+
+
+def last_meal_id(conn):
+    return conn.execute("SELECT last_meal_id FROM meal_ingredients_state WHERE id = 0").fetchone()[0]
+
+
+def test_saving_the_next_meal_advances_the_parsed_mark(conn):
+    save_meal_ingredients(0, "2 cups rice", conn)
+    save_meal_ingredients(1, "1 lemon", conn)
+    assert last_meal_id(conn) == 1
+    # A meal further on doesn't: meals 2 and 3 haven't been parsed
+    save_meal_ingredients(4, "3 eggs", conn)
+    assert last_meal_id(conn) == 1
+    save_many_meal_ingredients([(3, "1 onion"), (2, "2 carrots")], conn)
+    assert last_meal_id(conn) == 3
+
+
+def test_sync_doesnt_parse_a_shared_meal_again(conn, monkeypatch):
+    meals_df = pd.DataFrame({"ingredients": ["2 cups rice", "1 lemon"]})
+    sync_ingredient_index(meals_df, conn)
+    # The share page stores the new meal's ingredients itself
+    save_meal_ingredients(2, "200g chicken breast", conn)
+
+    parsed = []
+    monkeypatch.setattr(ingredients, "save_many_meal_ingredients", lambda meals, conn=None: parsed.extend(meals))
+    index = sync_ingredient_index(pd.DataFrame({"ingredients": ["2 cups rice", "1 lemon", "200g chicken breast"]}),
+                                  conn)
+    assert parsed == []
+    assert 2 in index.lookup("chicken breast")
+    assert [item["name"] for item in get_meal_ingredients(2, conn)] == ["chicken breast"]
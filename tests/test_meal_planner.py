@@ -0,0 +1,76 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import meal_planner
+from utils.meal_planner import PLAN_NUTRIENTS, MealPlanner
+
+
+def catalog(per_category=8, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for category in ["Breakfast", "Lunch", "Dinner", "Snacks"]:
+        for _ in range(per_category):
+            protein, carbs, fat = rng.integers(5, 60), rng.integers(10, 90), rng.integers(3, 35)
+            rows.append({"meal_name": f"{category} {len(rows)}", "meal_category": category, "protein": protein,
+                         "carbs": carbs, "fat": fat, "calories": 4 * protein + 4 * carbs + 9 * fat})
+    return pd.DataFrame(rows)
+
+
+def score(meals_df, meal_ids, targets):
+    totals = meals_df.loc[meal_ids, PLAN_NUTRIENTS].sum()
+    return sum(((totals[n] - targets[n]) / targets[n]) ** 2 for n in PLAN_NUTRIENTS)
+
+
+def test_the_best_plan_is_the_best_there_is(monkeypatch):
+    # A beam as wide as every combination: the search can't miss the best plan
+    monkeypatch.setattr(meal_planner, "BEAM_WIDTH", 8 ** 3)
+    meals_df = catalog()
+    targets = {"protein": 90, "carbs": 150, "fat": 50, "calories": 1400}
+    slots = ["Breakfast", "Lunch", "Dinner"]
+    plans = MealPlanner(meals_df).plan(targets, slots)
+
+    by_category = [meals_df.index[meals_df["meal_category"] == slot] for slot in slots]
+    best = min(product(*by_category), key=lambda meal_ids: score(meals_df, list(meal_ids), targets))
+    assert plans[0]["meal_ids"] == list(best)
+    assert plans[0]["score"] == pytest.approx(score(meals_df, list(best), targets))
+
+
+def test_plans_are_distinct_and_best_first():
+    meals_df = catalog()
+    plans = MealPlanner(meals_df).plan(slots=["Breakfast", "Snacks", "Snacks"], n_plans=5)
+    # Polishing can turn two beams into the same plan, so there may be fewer than asked for
+    assert 1 < len(plans) <= 5
+    # Two snacks swapped are the same plan
+    assert len({(plan["meal_ids"][0], frozenset(plan["meal_ids"][1:])) for plan in plans}) == len(plans)
+    assert [plan["score"] for plan in plans] == sorted(plan["score"] for plan in plans)
+    for plan in plans:
+        totals = meals_df.loc[plan["meal_ids"], PLAN_NUTRIENTS].sum()
+        assert plan["totals"] == {n: pytest.approx(float(totals[n]), abs=0.05) for n in PLAN_NUTRIENTS}
+
+
+def test_a_repeated_slot_never_takes_the_same_meal_twice():
+    meals_df = catalog()
+    # Twice this snack would hit the targets exactly
+    meals_df.loc[len(meals_df)] = {"meal_name": "Perfect half", "meal_category": "Snacks", "protein": 50,
+                                   "carbs": 80, "fat": 20, "calories": 700}
+    targets = {"protein": 100, "carbs": 160, "fat": 40, "calories": 1400}
+    plans = MealPlanner(meals_df).plan(targets, ["Snacks", "Snacks"], n_plans=3)
+    assert plans
+    for plan in plans:
+        assert len(set(plan["meal_ids"])) == 2
+    assert len(meals_df) - 1 in plans[0]["meal_ids"]
+
+
+def test_a_slot_without_meals_is_refused():
+    with pytest.raises(ValueError, match="Desserts"):
+        MealPlanner(catalog()).plan(slots=["Lunch", "Desserts"])
+
+
+def test_there_are_no_plans_when_a_repeated_slot_has_one_meal():
+    meals_df = catalog().query("meal_category != 'Snacks'")
+    meals_df = pd.concat([meals_df, pd.DataFrame([{"meal_name": "Only snack", "meal_category": "Snacks",
+                                                   "protein": 5, "carbs": 20, "fat": 5, "calories": 145}])])
+    assert MealPlanner(meals_df.reset_index(drop=True)).plan(slots=["Snacks", "Snacks"]) == []
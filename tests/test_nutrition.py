@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from utils.nutrition import NUTRIENT_COLUMNS, estimate_many, estimate_nutrition
+
+FOODS = ",".join(["name", "aliases"] + NUTRIENT_COLUMNS + ["grams_per_cup", "grams_per_piece"]) + """
+chicken breast,chicken|chicken breasts,31,0,3.6,165,0,0,74,85,1,0,140,174
+rice,white rice,2.7,28,0.3,130,0.4,0.1,1,0,0.1,0,185,
+egg,eggs,13,1.1,11,155,0,1.1,124,373,3.3,0,243,50
+bell pepper,,1,6,0.3,31,2.1,4.2,4,0,0,0,149,120
+salt,,0,0,0,0,0,0,38758,0,0,0,288,
+"""
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "foods.csv"
+    path.write_text(FOODS)
+    return str(path)
+
+
+def test_totals_are_the_grams_of_each_food_times_its_values(path):
+    estimate = estimate_nutrition("1 cup rice\n200g chicken breast\n2 large eggs", servings=2, path=path)
+    # 185 g of rice, 200 g of chicken, 2 eggs of 50 g
+    grams = {"rice": 185, "chicken breast": 200, "egg": 100}
+    foods = pd.read_csv(path).set_index("name")
+    for column in NUTRIENT_COLUMNS:
+        expected = sum(foods.loc[name, column] * g / 100 for name, g in grams.items()) / 2
+        assert estimate["totals"][column] == pytest.approx(expected, abs=0.051)  # rounded to 0.1
+    assert [(food, g) for _, food, g in estimate["matched"]] == [("rice", 185), ("chicken breast", 200), ("egg", 100)]
+    assert estimate["unmatched"] == []
+
+
+def test_lines_are_matched_by_alias_and_by_the_end_of_the_name(path):
+    estimate = estimate_nutrition("2 chicken breasts\n1 red bell pepper, diced\nsalt to taste\n1 cup unobtainium",
+                                  path=path)
+    assert estimate["matched"] == [("2 chicken breasts", "chicken breast", 348.0),
+                                   ("1 red bell pepper, diced", "bell pepper", 120.0),
+                                   # No amount: matched, but not counted
+                                   ("salt to taste", "salt", 0.0)]
+    assert estimate["unmatched"] == ["1 cup unobtainium"]
+    assert estimate["totals"]["sodium"] == pytest.approx(74 * 3.48 + 4 * 1.2, abs=0.051)
+
+
+def test_batch_estimates_match_one_at_a_time(path):
+    texts = pd.Series({10: "1 cup rice\n3 eggs", 11: "", 12: "1 cup unobtainium", 13: "½ cup rice\n1 bell pepper"})
+    totals = estimate_many(texts, path=path)
+    assert list(totals.index) == [10, 11, 12, 13]
+    for meal_id, text in texts.items():
+        assert totals.loc[meal_id].to_dict() == pytest.approx(estimate_nutrition(text, path=path)["totals"], abs=0.11)
+    assert (totals.loc[[11, 12]] == 0).all().all()
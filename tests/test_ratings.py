@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+
+from utils.db import get_db_connection
+from utils.ratings import DEFAULT_AVERAGE, PRIOR_WEIGHT, RatingStore
+
+
+@pytest.fixture
+def store(db_path):
+    return RatingStore()
+
+
+def test_a_changed_rating_replaces_the_earlier_one(store, conn):
+    assert store.rate(1, 10, 5, conn=conn) is None
+    assert store.rate(2, 10, 4, conn=conn) is None
+    assert store.rate(1, 10, 3, conn=conn) == 5
+    assert store.summary(10) == (3.5, 2)
+    assert store.user_rating(1, 10, conn=conn) == 3
+    assert store.user_rating(3, 10, conn=conn) is None
+
+
+@pytest.mark.parametrize("rating", [0, 6, 2.5])
+def test_only_whole_stars_are_taken(store, conn, rating):
+    with pytest.raises(ValueError):
+        store.rate(1, 10, rating, conn=conn)
+    assert store.summary(10) == (None, 0)
+
+
+def test_aggregates_are_persisted(store, conn):
+    store.rate(1, 10, 5, conn=conn)
+    store.rate(2, 10, 2, conn=conn)
+    store.rate(1, 11, 4, conn=conn)
+    fresh = RatingStore()
+    assert fresh.summary(10) == (3.5, 2)
+    assert fresh.summary(11) == (4.0, 1)
+    assert fresh.site_average() == store.site_average() == 11 / 3
+
+
+def test_bayesian_average_pulls_few_ratings_towards_the_site_average(store, conn):
+    assert store.site_average() == DEFAULT_AVERAGE
+    store.rate(1, 10, 5, conn=conn)
+    for user_id in range(100, 150):
+        store.rate(user_id, 11, 5 if user_id % 10 else 4, conn=conn)
+        store.rate(user_id, 12, 3, conn=conn)
+    average = store.site_average()
+    assert store.bayesian_average(10) == pytest.approx((PRIOR_WEIGHT * average + 5) / (PRIOR_WEIGHT + 1))
+    # One 5-star rating doesn't beat fifty ratings averaging 4.9
+    assert store.bayesian_average(11) > store.bayesian_average(10)
+    assert store.bayesian_average(13) == pytest.approx(average)
+
+
+def test_rank_orders_by_bayesian_average_and_keeps_ties_in_order(store, conn):
+    assert store.rank([3, 1, 2]).tolist() == [3, 1, 2]
+    for user_id in range(20):
+        store.rate(user_id, 2, 5, conn=conn)
+        store.rate(user_id, 4, 1, conn=conn)
+    store.rate(1, 3, 4, conn=conn)
+    ranked = store.rank(np.arange(6))
+    assert ranked[:2].tolist() == [2, 3]
+    assert ranked[-1] == 4
+    # Unrated meals keep their given order
+    assert [meal_id for meal_id in ranked if meal_id in (0, 1, 5)] == [0, 1, 5]
+
+
+def test_concurrent_ratings_keep_memory_and_database_in_step(store, db_path):
+    def rate_many(user_id):
+        conn = get_db_connection(db_path)
+        for n in range(30):
+            store.rate(user_id, n % 3, n % 5 + 1, conn=conn)
+        conn.close()
+
+    store.site_average()  # create the tables before the threads start
+    threads = [threading.Thread(target=rate_many, args=(user_id,)) for user_id in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    conn = get_db_connection(db_path)
+    stored = {meal_id: [count, total] for meal_id, count, total in
+              conn.execute("SELECT meal_id, COUNT(*), SUM(rating) FROM ratings GROUP BY meal_id")}
+    conn.close()
+    assert store.stats == stored
+    assert RatingStore().summary(0) == store.summary(0)
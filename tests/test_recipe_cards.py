@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from utils import recipe_cards
+from utils.recipe_cards import CardCache, card_version
+
+CARD = {"name": "Chicken Rice", "category": "Dinner", "image": None, "protein": 30, "carbs": 50, "fat": 10,
+        "calories": 410, "ingredients": ["1 cup rice", "200g chicken"], "instructions": ["Cook the rice."]}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    # What a card shows is enough to tell them apart; drawing them isn't what's tested here
+    monkeypatch.setattr(recipe_cards, "render_card", lambda card, fmt="png": f"{card['name']}.{fmt}".encode())
+    return CardCache(str(tmp_path))
+
+
+def test_a_changed_card_is_never_served_stale(cache):
+    assert cache.get("meal-1", CARD) == b"Chicken Rice.png"
+    changed = {**CARD, "name": "Chicken Fried Rice"}
+    assert cache.get("meal-1", changed) == b"Chicken Fried Rice.png"
+    # The old version was replaced
+    assert os.listdir(cache.directory) == [f"meal-1-{card_version(changed)}.png"]
+    assert cache.get("meal-1", changed) == b"Chicken Fried Rice.png"
+    assert cache.counters == {"hits": 1, "renders": 2, "background_renders": 0}
+
+
+def test_queued_cards_are_rendered_in_the_background(cache):
+    cache.get("meal-1", CARD, "pdf")
+    changed = {**CARD, "protein": 35}
+    cache.render_later("meal-1", lambda: changed, "pdf")
+    cache.render_later("meal-2", lambda: None, "png")  # no such meal any more
+    assert cache.wait(10)
+    assert cache.counters["background_renders"] == 1
+    assert os.listdir(cache.directory) == [f"meal-1-{card_version(changed)}.pdf"]
+    # The next request is a hit
+    cache.get("meal-1", changed, "pdf")
+    assert cache.counters["hits"] == 1 and cache.counters["renders"] == 1
+
+
+def test_refresh_meal_cards_queues_the_formats_on_disk(cache, monkeypatch):
+    monkeypatch.setattr(recipe_cards, "_cache", cache)
+    monkeypatch.setattr(recipe_cards, "card_for_meal", lambda meal_id: {**CARD, "name": f"Meal {meal_id}"})
+    cache.get("meal-3", CARD, "pdf")
+    cache.get("demo-1", CARD, "png")
+    assert cache.formats_on_disk("meal-") == {"meal-3": {"pdf"}}
+
+    recipe_cards.refresh_meal_cards()
+    recipe_cards.refresh_meal_cards([7])  # a new meal: its PNG card is made ahead
+    assert cache.wait(10)
+    assert sorted(os.listdir(cache.directory)) == sorted([
+        f"demo-1-{card_version(CARD)}.png",
+        f"meal-3-{card_version({**CARD, 'name': 'Meal 3'})}.pdf",
+        f"meal-7-{card_version({**CARD, 'name': 'Meal 7'})}.png",
+    ])
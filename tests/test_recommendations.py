@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.interactions import record_interaction
+from utils.recommendations import BLOCKS, Recommender, meal_features
+
+
+def catalog(n=6):
+    # Even ids: high-protein lunches; odd ids: carb-heavy desserts
+    return pd.DataFrame({
+        "meal_name": [f"Meal {i}" for i in range(n)],
+        "meal_category": ["Lunch" if i % 2 == 0 else "Desserts" for i in range(n)],
+        "meal_tags": ["high-protein, chicken" if i % 2 == 0 else "sweet, baking" for i in range(n)],
+        "protein": [40 if i % 2 == 0 else 3 for i in range(n)],
+        "carbs": [20 if i % 2 == 0 else 60 for i in range(n)],
+        "fat": [10 for _ in range(n)],
+        "calories": [400 for _ in range(n)],
+    })
+
+
+@pytest.fixture
+def recommender(db_path):
+    return Recommender()
+
+
+def test_features_are_unit_length_per_block():
+    matrix = meal_features(catalog())
+    assert matrix.shape[0] == 6
+    for block in BLOCKS:
+        assert np.allclose(np.linalg.norm(matrix[:, block], axis=1), 1)
+
+
+def test_appended_meals_extend_the_matrix_and_keep_profiles(recommender):
+    meals_df = catalog()
+    recommender.sync(meals_df, 1)
+    record_interaction(7, 0, "like")
+    recommender.rank(7, meals_df.index.to_numpy(), key="All")
+    matrix = recommender.matrix.copy()
+
+    # A new meal without calories turns the column into floats; the earlier meals are unchanged
+    new = pd.DataFrame([{"meal_name": "New", "meal_category": "Lunch", "meal_tags": "chicken", "protein": 35,
+                         "carbs": 25, "fat": 8, "calories": None}], index=[6])
+    recommender.sync(pd.concat([meals_df, new]), 2)
+    assert np.array_equal(recommender.matrix[:6], matrix)
+    assert recommender.matrix.shape[0] == 7
+    # Profiles survive an append; only their cached rankings are dropped
+    assert recommender.profiles[7].top == {}
+    assert recommender.profiles[7].sums.any()
+
+
+def test_meals_changed_in_place_rebuild_the_matrix(recommender):
+    meals_df = catalog()
+    recommender.sync(meals_df, 1)
+    record_interaction(7, 0, "like")
+    recommender.rank(7, meals_df.index.to_numpy())
+
+    changed = meals_df.copy()
+    changed["protein"] = 1
+    changed["calories"] = 900
+    recommender.sync(changed, 2)
+    assert np.allclose(recommender.matrix, meal_features(changed))
+    # The summed vectors were built from the old rows
+    assert recommender.profiles == {}
+
+
+def test_no_ranking_before_any_interaction(recommender):
+    recommender.sync(catalog(), 1)
+    assert recommender.rank(7, catalog().index.to_numpy(), key="All") is None
+
+
+def test_meals_like_the_liked_ones_come_first(recommender):
+    meals_df = catalog()
+    recommender.sync(meals_df, 1)
+    record_interaction(7, 0, "like")
+    # The other lunches, then the desserts; the liked meal itself goes after the matches
+    assert list(recommender.rank(7, meals_df.index.to_numpy())) == [2, 4, 1, 3, 5, 0]
+    # Only the candidates are ranked, and equal matches keep the candidates' order
+    assert list(recommender.rank(7, [5, 4, 3])) == [4, 5, 3]
+
+
+def test_top_matches_are_cached_per_feed_until_the_user_interacts(recommender):
+    meals_df = catalog()
+    recommender.sync(meals_df, 1)
+    record_interaction(7, 0, "like")
+    ids = meals_df.index.to_numpy()
+    first = recommender.rank(7, ids, key="All")
+    assert list(recommender.profiles[7].top) == ["All"]
+    assert list(recommender.rank(7, ids, key="All")) == list(first)
+    recommender.rank(7, ids)  # e.g. search results: not cached
+    assert list(recommender.profiles[7].top) == ["All"]
+
+    record_interaction(7, 1, "share")
+    record_interaction(7, 3, "share")
+    assert list(recommender.rank(7, ids, key="All")) == [5, 2, 4, 0, 1, 3]
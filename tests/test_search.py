@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from utils.ingredients import init_ingredient_table, save_meal_ingredients
+from utils.search import PrefixIndex, prefix_search, query_words
+
+MEALS = pd.DataFrame({
+    "meal_name": ["Chicken Fried Rice", "Beef Tacos", "Chickpea Curry", "Lemon Rice Salad"],
+    "meal_tags": ["asian, quick", "mexican", "vegan, indian", "vegan"],
+    "meal_description": ["Leftover rice, wok-fried", "Street food classic", "", "A zesty summer side"],
+    "ingredients": ["2 cups rice\n200g chicken breast\n2 eggs", "300g ground beef\n8 tortillas",
+                    "1 can chickpeas\n1 cup coconut milk", "1 cup rice\n1 lemon"],
+})
+
+
+@pytest.fixture
+def index(conn):
+    init_ingredient_table(conn)
+    index = PrefixIndex()
+    index.refresh(MEALS, conn)
+    return index
+
+
+def test_query_words():
+    assert query_words("Chick, RIC!") == ["chick", "ric"]
+    assert query_words(None) == []
+
+
+def test_match_needs_a_prefix_of_every_word(index):
+    assert index.match(["chick"]) == {0, 2}
+    assert index.match(["chick", "ric"]) == {0}
+    assert index.match(["vegan"]) == {2, 3}
+    assert index.match(["chick", "taco"]) == set()
+
+
+def test_match_includes_tags_descriptions_and_ingredients(index):
+    assert index.match(["mexican"]) == {1}
+    assert index.match(["zest"]) == {3}
+    assert index.match(["street", "food"]) == {1}
+    assert index.match(["tortilla"]) == {1}
+    # Plural query words also find the singular ingredient name
+    assert index.match(["eggs"]) == {0}
+
+
+@pytest.mark.parametrize("scan_max", [500, 0])  # checking each meal's words, or going through the trie
+def test_refine_agrees_with_a_fresh_match(index, monkeypatch, scan_max):
+    monkeypatch.setattr("utils.search.REFINE_SCAN_MAX", scan_max)
+    for old, new in [(["chi"], ["chic"]), (["chi"], ["chicken", "r"]), (["v"], ["vegan", "lem"])]:
+        # The query's last word was extended ("chi" -> "chic"), or words were added after it
+        assert index.refine(index.match(old), new) == index.match(old[:-1] + new)
+
+
+def test_prefix_search_reuses_and_refines_the_last_search(index):
+    ids, state = prefix_search(index, "chi")
+    assert ids == {0, 2}
+    # The same query again is the same result
+    again, same_state = prefix_search(index, "chi", state)
+    assert again is ids and same_state is state
+    # An extended query only checks the last matches
+    ids, state = prefix_search(index, "chicken r", state)
+    assert ids == {0}
+    # Anything else is a new lookup
+    ids, _ = prefix_search(index, "beef", state)
+    assert ids == {1}
+
+
+def test_prefix_search_suggests_close_words_when_nothing_matches(index):
+    ids, state = prefix_search(index, "chiken")
+    assert ids == set()
+    assert "chicken" in state["suggestions"]
+
+
+def test_new_meals_invalidate_earlier_results(index, conn):
+    ids, state = prefix_search(index, "rice")
+    more = pd.concat([MEALS, pd.DataFrame({"meal_name": ["Rice Pudding"], "meal_tags": [""],
+                                           "ingredients": ["1 cup rice"]}, index=[4])])
+    index.refresh(more, conn)
+    ids, _ = prefix_search(index, "rice", state)
+    assert 4 in ids
+
+
+def test_ingredient_rows_ahead_of_the_catalog_dont_hide_its_meals(conn):
+    # Ingredient rows can be stored for a meal before the loaded catalog frame has it
+    init_ingredient_table(conn)
+    save_meal_ingredients(5, "2 cups quinoa", conn)
+    index = PrefixIndex()
+    index.refresh(MEALS, conn)
+    assert index.match(["quinoa"]) == {5}
+    assert index.max_meal_id == 3
+
+    more = pd.concat([MEALS, pd.DataFrame({"meal_name": ["Tofu Scramble", "Quinoa Bowl"], "meal_tags": ["", ""],
+                                           "meal_description": ["", "A hearty bowl"], "ingredients": ["", ""]},
+                                          index=[4, 5])])
+    index.refresh(more, conn)
+    assert index.match(["tofu"]) == {4}
+    assert index.match(["hearty"]) == {5}
+    assert index.max_meal_id == 5
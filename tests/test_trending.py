@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from utils.trending import TrendingScores
+
+HALF_LIFE_HOURS = 2
+
+
+def events(n, meals, start, span, seed=0):
+    rng = random.Random(seed)
+    return sorted(((start + rng.uniform(0, span), rng.randrange(meals), rng.choice([1.0, 3.0, 5.0]))
+                   for _ in range(n)))
+
+
+def decayed(events, now, half_life_hours=HALF_LIFE_HOURS):
+    # Every score decayed to `now` the direct way
+    scores = {}
+    for at, meal_id, weight in events:
+        scores[meal_id] = scores.get(meal_id, 0.0) + weight * 0.5 ** ((now - at) / (half_life_hours * 3600))
+    return scores
+
+
+def ranking(scores):
+    return sorted(scores, key=lambda meal_id: (-scores[meal_id], meal_id))
+
+
+def test_stored_scores_rank_meals_as_the_decayed_scores_do():
+    trending = TrendingScores(HALF_LIFE_HOURS, top_candidates=1000)
+    log = events(2000, 100, trending.epoch, 3 * 24 * 3600)
+    for at, meal_id, weight in log:
+        trending.add(meal_id, weight, at)
+
+    now = log[-1][0] + 3600
+    expected = decayed(log, now)
+    for meal_id, score in expected.items():
+        assert trending.score(meal_id, now) == pytest.approx(score)
+    assert ranking(trending.scores) == ranking(expected)
+
+
+def test_scores_carry_over_when_the_epoch_moves():
+    trending = TrendingScores(HALF_LIFE_HOURS)
+    start = trending.epoch
+    # Far enough apart that the stored values would overflow without a rebase
+    log = [(start, 1, 5.0), (start + 1200 * 3600, 2, 1.0), (start + 1201 * 3600, 1, 3.0)]
+    for at, meal_id, weight in log:
+        trending.add(meal_id, weight, at)
+    assert trending.epoch > start
+    now = start + 1202 * 3600
+    for meal_id, score in decayed(log, now).items():
+        assert trending.score(meal_id, now) == pytest.approx(score)
+
+
+def test_the_heap_keeps_exactly_the_top_meals():
+    trending = TrendingScores(HALF_LIFE_HOURS, top_candidates=5)
+    log = events(3000, 60, trending.epoch, 24 * 3600, seed=1)
+    for at, meal_id, weight in log:
+        trending.add(meal_id, weight, at)
+        # Evictions and heap rebuilds never lose one of the best meals
+        assert set(trending.top) == set(ranking(trending.scores)[:5])
+    assert len(trending.heap) <= 4 * 5
+    assert [meal_id for meal_id, _ in trending.top_k(3)] == ranking(trending.scores)[:3]
@@ -0,0 +1,240 @@
+# utils/catalog.py
+"""
+Columnar (Parquet) storage for the meal catalog.
+
+The catalog is a directory of Parquet part files plus a small manifest
+(_manifest.json) listing the parts in meal-id order:
+
+    data/catalog/_manifest.json
+    data/catalog/part-0000000000-<generation>.parquet
+    ...
+
+Every row carries its meal_id, so a detail view can read one meal's
+ingredients and instructions without touching the rest of the catalog, and
+list views read only the columns they show (projection), memory-mapped.
+
+Appending a meal writes one small part and replaces the manifest atomically,
+so readers see either the old or the new catalog. When the parts pile up,
+the small trailing ones are merged. Writers (the app, and the import and
+backfill scripts in their own processes) take turns through a lock file next
+to the manifest, so no two read-modify-write it at once. Use utils.meals (load_meals, append_meal,
+...) rather than this module directly; it picks CSV or Parquet by path.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads in the same process are kept apart
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = "_manifest.json"
+LOCK_FILE = "_manifest.lock"
+ROW_GROUP_ROWS = 10_000
+PART_ROWS = 100_000
+MAX_PARTS = 32
+
+# Appends are read-modify-write on the manifest; sessions in this process take turns (and see _writing)
+_write_lock = threading.Lock()
+
+
+def _manifest_path(path):
+    return os.path.join(path, MANIFEST)
+
+
+@contextmanager
+def _writing(path):
+    # Hold the catalog for a write: the thread lock for this process, the lock file for the others
+    os.makedirs(path, exist_ok=True)
+    with _write_lock, open(os.path.join(path, LOCK_FILE), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_manifest(path):
+    """The catalog's manifest ({"parts": [...], "rows": n}), or None if there is no catalog at path."""
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(path, manifest):
+    tmp_path = f"{_manifest_path(path)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, _manifest_path(path))
+
+
+def catalog_version(path):
+    """Changes whenever the catalog does (the manifest is replaced on every write)."""
+    try:
+        stat = os.stat(_manifest_path(path))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _schema(text_columns, numeric_columns):
+    import pyarrow as pa
+    return pa.schema([("meal_id", pa.int64())]
+                     + [(column, pa.string()) for column in text_columns]
+                     + [(column, pa.float64()) for column in numeric_columns])
+
+
+def _to_table(meals_df, first_id, text_columns, numeric_columns):
+    import pyarrow as pa
+    columns = {"meal_id": np.arange(first_id, first_id + len(meals_df), dtype="int64")}
+    for column in text_columns:
+        values = meals_df[column] if column in meals_df.columns else pd.Series(None, index=meals_df.index)
+        columns[column] = values.astype("string").to_numpy(dtype=object, na_value=None)
+    for column in numeric_columns:
+        values = meals_df[column] if column in meals_df.columns else pd.Series(np.nan, index=meals_df.index)
+        columns[column] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    return pa.table(columns, schema=_schema(text_columns, numeric_columns))
+
+
+def _write_part(path, table, first_id):
+    import pyarrow.parquet as pq
+    name = f"part-{first_id:010d}-{uuid.uuid4().hex[:8]}.parquet"
+    pq.write_table(table, os.path.join(path, name), row_group_size=ROW_GROUP_ROWS, compression="zstd")
+
+    # Numeric columns are stored as floats; note which are whole numbers with no gaps, so reads can
+    # hand them back as integers (like read_csv does) without checking every value each time
+    integer_columns = []
+    for field in table.schema:
+        if field.type == "double":
+            values = table.column(field.name).to_numpy()
+            if not np.isnan(values).any() and (values % 1 == 0).all():
+                integer_columns.append(field.name)
+    return {"file": name, "first_id": first_id, "rows": table.num_rows, "integer_columns": integer_columns}
+
+
+def _integer_columns(parts):
+    columns = None
+    for part in parts:
+        part_columns = set(part.get("integer_columns", []))
+        columns = part_columns if columns is None else columns & part_columns
+    return columns or set()
+
+
+def _from_table(table, integer_columns=()):
+    # Index by meal id, and give whole-number columns an integer dtype like read_csv would
+    meals_df = table.to_pandas()
+    meals_df = meals_df.set_index("meal_id", drop=True)
+    meals_df.index.name = None
+    if len(meals_df) and meals_df.index[-1] - meals_df.index[0] == len(meals_df) - 1 \
+            and meals_df.index.is_monotonic_increasing:
+        meals_df.index = pd.RangeIndex(meals_df.index[0], meals_df.index[-1] + 1)
+    for column in meals_df.columns:
+        if column in integer_columns:
+            meals_df[column] = meals_df[column].astype("int64")
+    return meals_df
+
+
+def read_catalog(path, columns, text_columns, numeric_columns):
+    """
+    Read the catalog at path as a DataFrame indexed by meal id.
+
+    Parameters:
+    columns (list): Columns to read; the others are never decoded
+    """
+    manifest = read_manifest(path)
+    columns = [c for c in columns if c in text_columns or c in numeric_columns]
+    schema = _schema(text_columns, numeric_columns)
+    if not manifest or not manifest["parts"]:
+        return _from_table(schema.empty_table().select(["meal_id"] + columns))
+
+    import pyarrow.parquet as pq
+    files = [os.path.join(path, part["file"]) for part in manifest["parts"]]
+    return _from_table(pq.read_table(files, columns=["meal_id"] + columns, schema=schema, memory_map=True),
+                       _integer_columns(manifest["parts"]))
+
+
+def read_rows(path, meal_ids, columns, text_columns, numeric_columns):
+    """Read some meals by id; only the parts (and row groups) that can hold them are read."""
+    import pyarrow.compute as pc
+    meal_ids = sorted(int(i) for i in meal_ids)
+    manifest = read_manifest(path) or {"parts": []}
+    parts = [part for part in manifest["parts"]
+             if any(part["first_id"] <= i < part["first_id"] + part["rows"] for i in meal_ids)]
+    if not parts:
+        return read_catalog(path, columns, text_columns, numeric_columns).iloc[0:0]
+
+    import pyarrow.dataset as ds
+    dataset = ds.dataset([os.path.join(path, part["file"]) for part in parts],
+                         schema=_schema(text_columns, numeric_columns), format="parquet")
+    keep = [c for c in columns if c in text_columns or c in numeric_columns]
+    table = dataset.to_table(columns=["meal_id"] + keep, filter=pc.field("meal_id").isin(meal_ids))
+    return _from_table(table, _integer_columns(parts))
+
+
+def write_catalog(path, meals_df, text_columns, numeric_columns):
+    """Replace the whole catalog with meals_df (ids are renumbered from 0 in row order)."""
+    with _writing(path):
+        old = read_manifest(path) or {"parts": []}
+        parts = []
+        for start in range(0, len(meals_df), PART_ROWS):
+            chunk = meals_df.iloc[start:start + PART_ROWS]
+            parts.append(_write_part(path, _to_table(chunk, start, text_columns, numeric_columns), start))
+        _write_manifest(path, {"parts": parts, "rows": len(meals_df), "updated": time.time()})
+        _remove_parts(path, old["parts"])
+
+
+def append_rows(path, meals_df, text_columns, numeric_columns):
+    """Append meals as new parts (one per PART_ROWS meals) and return the id of the first one."""
+    with _writing(path):
+        manifest = read_manifest(path) or {"parts": [], "rows": 0}
+        first_id = manifest["rows"]
+        parts = []
+        for start in range(0, len(meals_df), PART_ROWS):
+            chunk = meals_df.iloc[start:start + PART_ROWS]
+            parts.append(_write_part(path, _to_table(chunk, first_id + start, text_columns, numeric_columns),
+                                     first_id + start))
+        manifest = {"parts": manifest["parts"] + parts, "rows": first_id + len(meals_df), "updated": time.time()}
+        if len(manifest["parts"]) > MAX_PARTS:
+            manifest, merged = _merge_tail(path, manifest, text_columns, numeric_columns)
+        else:
+            merged = []
+        _write_manifest(path, manifest)
+        _remove_parts(path, merged)
+    return first_id
+
+
+def _merge_tail(path, manifest, text_columns, numeric_columns):
+    # Merge the trailing small parts (appends) into one, keeping the big ones as they are
+    parts = manifest["parts"]
+    keep = len(parts)
+    while keep > 0 and parts[keep - 1]["rows"] < PART_ROWS // 2:
+        keep -= 1
+    tail = parts[keep:]
+    if len(tail) < 2:
+        return manifest, []
+
+    import pyarrow.parquet as pq
+    import pyarrow as pa
+    table = pa.concat_tables([pq.read_table(os.path.join(path, part["file"]),
+                                            schema=_schema(text_columns, numeric_columns)) for part in tail])
+    merged = _write_part(path, table, tail[0]["first_id"])
+    return {**manifest, "parts": parts[:keep] + [merged]}, tail
+
+
+def _remove_parts(path, parts):
+    for part in parts:
+        try:
+            os.remove(os.path.join(path, part["file"]))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,165 @@
+# utils/comments.py
+"""
+Comments on meals.
+
+Comments are rows of the comments table, indexed by (meal_id, created_at, id).
+A meal's thread is read newest first a page at a time with keyset pagination:
+each page ends with a cursor (created_at, id of its last comment) and the next
+page starts below it, so any page - the first one included - is one index
+range scan of PAGE_SIZE rows however long the thread is (OFFSET would read
+and skip every earlier comment).
+
+Threads are keyed by catalog meal id. Something on a page that isn't a
+catalog meal (the demo recipe on Recipe_Detail) uses a string key such as
+"demo-1" instead, which SQLite stores as text and never matches a meal id.
+
+Comment counts live in the comment_counts table so lists of meals (My_Profile)
+don't count rows. A comment and its count increment are written in the same
+transaction, so the count is right whichever process wrote it, even one that
+stopped straight after. rebuild_comment_counts() recounts everything from the
+comments table.
+"""
+import time
+
+from utils.db import get_db_connection
+
+PAGE_SIZE = 20
+MAX_COMMENT_LENGTH = 2000
+
+_tables_ready = False
+
+
+def thread_key(meal_id):
+    """The key a thread is stored under: a catalog meal id as an int, any other key (e.g. "demo-1") as it is."""
+    if isinstance(meal_id, str) and not meal_id.isdigit():
+        return meal_id
+    return int(meal_id)
+
+
+def init_comment_tables(conn):
+    # Only needs to run once per process
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS comments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal_id INTEGER NOT NULL,
+        user_id INTEGER,
+        username TEXT,
+        body TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_meal ON comments (meal_id, created_at, id)")
+    # Keys are meal ids or strings ("demo-1"), so meal_id has no type; tables from before string keys used
+    # an INTEGER key, which only takes ids. Counts can always be rebuilt, so such a table is just recreated.
+    columns = conn.execute("PRAGMA table_info(comment_counts)").fetchall()
+    recreate = any(name == "meal_id" and column_type.upper() == "INTEGER" for _, name, column_type, *_ in columns)
+    if recreate:
+        conn.execute("DROP TABLE comment_counts")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS comment_counts (
+        meal_id NOT NULL PRIMARY KEY,
+        count INTEGER NOT NULL
+    )
+    ''')
+    if recreate:
+        conn.execute("INSERT INTO comment_counts (meal_id, count) SELECT meal_id, COUNT(*) FROM comments "
+                     "GROUP BY meal_id")
+    conn.commit()
+    _tables_ready = True
+
+
+def add_comment(meal_id, body, user_id=None, username=None, conn=None):
+    """
+    Store a comment and return its id.
+
+    Raises:
+    ValueError: If the comment is empty or longer than MAX_COMMENT_LENGTH
+    """
+    body = (body or "").strip()
+    if not body:
+        raise ValueError("Comment is empty")
+    if len(body) > MAX_COMMENT_LENGTH:
+        raise ValueError(f"Comments can be at most {MAX_COMMENT_LENGTH} characters")
+
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_comment_tables(conn)
+    meal_id = thread_key(meal_id)
+    with conn:
+        cursor = conn.execute("INSERT INTO comments (meal_id, user_id, username, body, created_at) "
+                              "VALUES (?, ?, ?, ?, ?)", (meal_id, user_id, username, body, time.time()))
+        conn.execute("INSERT INTO comment_counts (meal_id, count) VALUES (?, 1) "
+                     "ON CONFLICT (meal_id) DO UPDATE SET count = count + 1", (meal_id,))
+    if own_conn:
+        conn.close()
+    return cursor.lastrowid
+
+
+def get_comments(meal_id, before=None, limit=PAGE_SIZE, conn=None):
+    """
+    A page of a meal's comments, newest first.
+
+    Parameters:
+    before (tuple): Cursor returned with the previous page; None for the first page
+
+    Returns:
+    (list of {id, user_id, username, body, created_at}, cursor of the next page or None if this is the last)
+    """
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_comment_tables(conn)
+    created_at, comment_id = before or (float("inf"), 0)
+    rows = conn.execute("SELECT id, user_id, username, body, created_at FROM comments "
+                        "WHERE meal_id = ? AND (created_at, id) < (?, ?) "
+                        "ORDER BY created_at DESC, id DESC LIMIT ?",
+                        (thread_key(meal_id), created_at, comment_id, limit + 1)).fetchall()
+    if own_conn:
+        conn.close()
+
+    comments = [dict(zip(("id", "user_id", "username", "body", "created_at"), row)) for row in rows[:limit]]
+    cursor = (comments[-1]["created_at"], comments[-1]["id"]) if len(rows) > limit else None
+    return comments, cursor
+
+
+def get_comment_counts(meal_ids, conn=None):
+    """Comment counts of meals (or other thread keys), as {meal_id: count} (0 for meals without comments)."""
+    meal_ids = [thread_key(meal_id) for meal_id in meal_ids]
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_comment_tables(conn)
+    stored = {}
+    # Stay under SQLite's limit on query parameters
+    for start in range(0, len(meal_ids), 500):
+        chunk = meal_ids[start:start + 500]
+        stored.update(conn.execute(f"SELECT meal_id, count FROM comment_counts WHERE meal_id IN "
+                                   f"({','.join('?' * len(chunk))})", chunk).fetchall())
+    if own_conn:
+        conn.close()
+    return {meal_id: stored.get(meal_id, 0) for meal_id in meal_ids}
+
+
+def rebuild_comment_counts(conn=None):
+    """Recount every meal's comments from the comments table."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_comment_tables(conn)
+    with conn:
+        conn.execute("DELETE FROM comment_counts")
+        conn.execute("INSERT INTO comment_counts (meal_id, count) SELECT meal_id, COUNT(*) FROM comments "
+                     "GROUP BY meal_id")
+    if own_conn:
+        conn.close()
+
+
+def format_age(created_at, now=None):
+    """How long ago a Unix time was, e.g. "just now", "5 minutes ago", "2 days ago"."""
+    seconds = max(0, (time.time() if now is None else now) - created_at)
+    for unit, size in (("year", 365 * 86400), ("month", 30 * 86400), ("week", 7 * 86400), ("day", 86400),
+                       ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            n = int(seconds // size)
+            return f"{n} {unit}{'s' if n > 1 else ''} ago"
+    return "just now"
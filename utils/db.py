@@ -0,0 +1,35 @@
+# utils/db.py
+import sqlite3
+
+DB_PATH = "food_app.db"
+
+
+def get_db_connection(path=DB_PATH):
+    """Open a connection to the app database (shared by the pages, utils and scripts)."""
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    return conn
+
+
+_tables_ready = False
+
+
+def init_user_table(conn):
+    """Create the users table if it doesn't exist (only needs to run once per process)."""
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT,
+        bio TEXT,
+        profile_pic TEXT,
+        date_joined TEXT,
+        is_premium BOOLEAN DEFAULT 0
+    )
+    ''')
+    conn.commit()
+    _tables_ready = True
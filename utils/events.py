@@ -0,0 +1,302 @@
+# utils/events.py
+"""
+Append-only log of what people do in the app: page views, clicks, meal views.
+
+Pages never write events themselves. track() / log_event() put the event in
+an in-memory ring buffer (a few microseconds, under one lock) and return; a
+background writer thread takes them out in batches of up to BATCH_SIZE, every
+FLUSH_INTERVAL seconds or as soon as a batch is ready, and hands each batch to
+the sinks in one write:
+  - "sqlite": the events table of the app database, one transaction per batch.
+    Meal views, likes and saves also go to meal_interactions, which trending
+    and recommendations read (utils/trending.py, utils/recommendations.py).
+  - "jsonl": data/events/events-<time>.jsonl, a new file every MAX_FILE_BYTES,
+    keeping the newest MAX_FILES.
+The sinks are picked with LEO_EVENT_SINKS (default "sqlite"; e.g. "sqlite,jsonl").
+
+Backpressure: the buffer holds BUFFER_CAPACITY events. If the writer falls
+that far behind (e.g. the database is locked), new events are dropped and
+counted instead of blocking a page. A batch that fails to write is retried
+MAX_RETRIES times, then dropped and counted. stats() has the counters; with
+LEO_PROFILE on they are shown in the sidebar. Whatever is still buffered is
+written when the process exits.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from utils.profiling import PROFILING_ENABLED
+
+# Every page logs a view, so the database modules (and sqlite3) are only imported by the writer thread.
+# These are utils.interactions.INTERACTION_KINDS.
+INTERACTION_KINDS = ("share", "save", "like", "view")
+EVENT_KINDS = ("page_view", "click") + INTERACTION_KINDS
+BUFFER_CAPACITY = int(os.environ.get("LEO_EVENT_BUFFER", "10000"))
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+MAX_RETRIES = 3
+EVENT_SINKS = os.environ.get("LEO_EVENT_SINKS", "sqlite")
+EVENTS_DIR = os.environ.get("LEO_EVENTS_DIR", "data/events")
+MAX_FILE_BYTES = 16 * 1024 * 1024
+MAX_FILES = 20
+
+Event = namedtuple("Event", "created_at kind page session_id user_id meal_id data")
+
+_tables_ready = False
+
+
+def init_event_table(conn):
+    # Only needs to run once per process
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at REAL NOT NULL,
+        kind TEXT NOT NULL,
+        page TEXT,
+        session_id TEXT,
+        user_id INTEGER,
+        meal_id INTEGER,
+        data TEXT
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_kind ON events (kind, created_at)")
+    conn.commit()
+    _tables_ready = True
+
+
+class SQLiteSink:
+    """Writes batches to the events table (and meal interactions to meal_interactions)."""
+
+    def __init__(self, path=None):
+        self.path = path  # None: the app database
+        self.conn = None
+
+    def write(self, events):
+        # Only the writer thread uses the connection
+        from utils.db import get_db_connection
+        from utils.interactions import record_interactions
+
+        if self.conn is None:
+            self.conn = get_db_connection() if self.path is None else get_db_connection(self.path)
+            init_event_table(self.conn)
+        try:
+            self.conn.executemany(
+                "INSERT INTO events (created_at, kind, page, session_id, user_id, meal_id, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(e.created_at, e.kind, e.page, e.session_id, e.user_id, e.meal_id,
+                  json.dumps(e.data) if e.data else None) for e in events])
+            # Commits both inserts together
+            record_interactions([(e.user_id, e.meal_id, e.kind, e.created_at) for e in events
+                                 if e.kind in INTERACTION_KINDS and e.meal_id is not None], self.conn)
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class JsonlSink:
+    """Appends batches to JSON Lines files in a directory, starting a new file every max_bytes."""
+
+    def __init__(self, directory=EVENTS_DIR, max_bytes=MAX_FILE_BYTES, max_files=MAX_FILES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.file = None
+        self.files_opened = 0
+
+    def _rotate(self):
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.files_opened += 1
+        name = f"events-{stamp}-{os.getpid()}-{self.files_opened:04d}.jsonl"
+        self.file = open(os.path.join(self.directory, name), "a")
+        for old in sorted(glob.glob(os.path.join(self.directory, "events-*.jsonl")))[:-self.max_files]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def write(self, events):
+        if self.file is None or self.file.tell() >= self.max_bytes:
+            self._rotate()
+        self.file.write("".join(json.dumps(e._asdict()) + "\n" for e in events))
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+SINKS = {"sqlite": SQLiteSink, "jsonl": JsonlSink}
+
+
+class EventLog:
+    """A bounded ring buffer of events, emptied in batches into the sinks by a background thread."""
+
+    def __init__(self, sinks, capacity=BUFFER_CAPACITY, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.sinks = sinks
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = [None] * capacity
+        self.head = 0  # position of the oldest buffered event
+        self.size = 0
+        self.cond = threading.Condition()
+        self.counters = {"enqueued": 0, "written": 0, "dropped_full": 0, "dropped_failed": 0,
+                         "batches": 0, "write_errors": 0, "max_pending": 0}
+        self.last_batch_ms = 0.0
+        self.stopping = False
+        self.thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, event):
+        """Buffer an event without blocking; False if the buffer is full and the event was dropped."""
+        with self.cond:
+            if self.size >= self.capacity:
+                self.counters["dropped_full"] += 1
+                return False
+            self.buffer[(self.head + self.size) % self.capacity] = event
+            self.size += 1
+            self.counters["enqueued"] += 1
+            self.counters["max_pending"] = max(self.counters["max_pending"], self.size)
+            if self.size == self.batch_size:
+                self.cond.notify()
+        return True
+
+    def _take(self):
+        # Remove up to batch_size of the oldest events (caller holds the lock)
+        n = min(self.size, self.batch_size)
+        end = self.head + n
+        batch = self.buffer[self.head:min(end, self.capacity)] + self.buffer[:max(0, end - self.capacity)]
+        for i in range(self.head, self.head + n):
+            self.buffer[i % self.capacity] = None
+        self.head = end % self.capacity
+        self.size -= n
+        return batch
+
+    def _write(self, batch, sinks):
+        # Returns the sinks that failed to take the batch
+        start = time.perf_counter()
+        failed = []
+        for sink in sinks:
+            try:
+                sink.write(batch)
+            except Exception:
+                failed.append(sink)
+        with self.cond:
+            if failed:
+                self.counters["write_errors"] += 1
+            else:
+                self.counters["written"] += len(batch)
+                self.counters["batches"] += 1
+                self.last_batch_ms = (time.perf_counter() - start) * 1000
+        return failed
+
+    def _run(self):
+        retry, attempts = None, 0  # (batch, sinks that still need it)
+        while True:
+            with self.cond:
+                if (retry is not None or self.size < self.batch_size) and not self.stopping:
+                    self.cond.wait(self.flush_interval)
+                if self.stopping and not self.size and retry is None:
+                    return
+                batch, sinks = retry or (self._take(), self.sinks)
+            if not batch:
+                continue
+            failed = self._write(batch, sinks)
+            if not failed:
+                retry, attempts = None, 0
+            elif attempts + 1 >= MAX_RETRIES or self.stopping:
+                with self.cond:
+                    self.counters["dropped_failed"] += len(batch)
+                retry, attempts = None, 0
+            else:
+                # Only the sinks that failed get the batch again, on the next round (new events wait behind it)
+                retry, attempts = (batch, failed), attempts + 1
+
+    def close(self, timeout=5.0):
+        """Write out what's buffered and stop the writer."""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        self.thread.join(timeout)
+        for sink in self.sinks:
+            sink.close()
+
+    def stats(self):
+        with self.cond:
+            return {"capacity": self.capacity, "pending": self.size, **self.counters,
+                    "last_batch_ms": round(self.last_batch_ms, 3)}
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_event_log():
+    """The process-wide event log (its writer starts on first use)."""
+    global _log
+    with _log_lock:
+        if _log is None:
+            sinks = [SINKS[name.strip()]() for name in EVENT_SINKS.split(",") if name.strip()]
+            _log = EventLog(sinks)
+            atexit.register(_log.close)
+        return _log
+
+
+def log_event(kind, meal_id=None, user_id=None, session_id=None, page=None, data=None):
+    """Queue an event for writing; returns False if it was dropped because the writer is behind."""
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"Unknown event kind: {kind}")
+    return get_event_log().put(Event(time.time(), kind, page, session_id, user_id,
+                                     None if meal_id is None else int(meal_id), data))
+
+
+def track(kind, meal_id=None, **data):
+    """Log an event from a page script (or widget callback), for the current session, user and page."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return log_event(kind, meal_id, user_id=st.session_state.get("user_id"),
+                     session_id=ctx.session_id if ctx else None, page=st.session_state.get("event_page"),
+                     data=data or None)
+
+
+def track_page(page):
+    """Call at the top of a page script: logs a page view when the session arrives on the page."""
+    import streamlit as st
+
+    if st.session_state.get("event_page") != page:
+        st.session_state.event_page = page
+        track("page_view")
+    if PROFILING_ENABLED:
+        render_event_stats()
+
+
+def stats():
+    """Counters of the event log (see EventLog.stats)."""
+    return get_event_log().stats()
+
+
+def render_event_stats():
+    """Show the event log counters in a sidebar expander."""
+    import streamlit as st
+
+    with st.sidebar.expander("📨 Event log", expanded=False):
+        st.dataframe([{"counter": key, "value": value} for key, value in stats().items()],
+                     hide_index=True, use_container_width=True)
+        st.caption(f"Sinks: {EVENT_SINKS}")
@@ -0,0 +1,147 @@
+# utils/export.py
+"""
+Exports of a user's meals and their daily nutrition totals, as CSV or JSON.
+
+Exports are generators of text chunks. They read the meals from the catalog
+CHUNK_ROWS at a time (load_meal_rows: only the parts holding those ids, only
+the exported columns) and turn each chunk into text before reading the next,
+so memory stays the same however many meals are exported. The daily totals
+are summed as the chunks go by (one row per day, not per meal).
+
+write_export() writes the chunks to a file under data/exports/, which the
+web server doesn't serve; the page hands that file to st.download_button,
+so the export is only downloadable by the session that asked for it.
+(Streamlit reads it into memory once to serve the download; building it
+still goes a chunk at a time.) Each export gets a random directory name, and
+exports older than EXPORT_TTL are deleted when a new one is written, or as
+soon as they have been downloaded (remove_export).
+"""
+import json
+import os
+import secrets
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.meals import MEAL_COLUMNS, MEALS_CATALOG, NUMERIC_COLUMNS, is_csv, load_meal_rows
+
+CHUNK_ROWS = 5000
+# Not under static/: exports hold a user's data and must not be reachable by URL
+EXPORT_DIR = "data/exports"
+EXPORT_TTL = 60 * 60
+# Images stay on the server; everything else about a meal is exported
+EXPORT_COLUMNS = [column for column in MEAL_COLUMNS if column != "image_path"]
+DAILY_COLUMNS = ["date", "meals"] + NUMERIC_COLUMNS
+
+
+def iter_meals(meal_ids, columns=EXPORT_COLUMNS, chunk_rows=CHUNK_ROWS, path=MEALS_CATALOG):
+    """Yield meals by id, in id order, as frames of up to chunk_rows rows (ids no longer in the catalog are skipped)."""
+    meal_ids = sorted({int(meal_id) for meal_id in meal_ids})
+    if is_csv(path):
+        # A CSV catalog can't be read by id; go through it in chunks instead (row position = id)
+        wanted = pd.Index(meal_ids)
+        with pd.read_csv(path, usecols=lambda column: column in columns, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                chunk = chunk[chunk.index.isin(wanted)]
+                if len(chunk):
+                    yield chunk.reindex(columns=columns)
+        return
+    for start in range(0, len(meal_ids), chunk_rows):
+        chunk = load_meal_rows(meal_ids[start:start + chunk_rows], columns, path)
+        if len(chunk):
+            yield chunk.reindex(columns=columns)
+
+
+class DailyTotals:
+    """Nutrition summed per day over the meals added to it."""
+
+    def __init__(self):
+        self.days = {}  # "YYYY-MM-DD" -> [meals, *NUMERIC_COLUMNS totals]
+
+    def add(self, meals_df):
+        dates = pd.to_datetime(meals_df["datetime"], errors="coerce").dt.strftime("%Y-%m-%d")
+        values = meals_df.reindex(columns=NUMERIC_COLUMNS).apply(pd.to_numeric, errors="coerce").fillna(0)
+        values.insert(0, "meals", 1)
+        for date, sums in values.groupby(dates.to_numpy()).sum().iterrows():
+            totals = self.days.setdefault(date, np.zeros(len(DAILY_COLUMNS) - 1))
+            totals += sums.to_numpy(dtype=float)
+
+    def rows(self):
+        """One dict per day (DAILY_COLUMNS), oldest first."""
+        return [{"date": date, "meals": int(totals[0]),
+                 **{column: round(float(value), 2) for column, value in zip(NUMERIC_COLUMNS, totals[1:])}}
+                for date, totals in sorted(self.days.items())]
+
+
+def meals_csv(meal_ids, path=MEALS_CATALOG):
+    """The meals as CSV (a meal_id column plus EXPORT_COLUMNS), in chunks."""
+    yield pd.DataFrame(columns=["meal_id"] + EXPORT_COLUMNS).to_csv(index=False)
+    for chunk in iter_meals(meal_ids, path=path):
+        yield chunk.to_csv(header=False, index_label="meal_id")
+
+
+def daily_nutrition_csv(meal_ids, path=MEALS_CATALOG):
+    """Nutrition totals per day (DAILY_COLUMNS) of the meals as CSV; only the dates and nutrients are read."""
+    totals = DailyTotals()
+    for chunk in iter_meals(meal_ids, columns=["datetime"] + NUMERIC_COLUMNS, path=path):
+        totals.add(chunk)
+    yield pd.DataFrame(totals.rows(), columns=DAILY_COLUMNS).to_csv(index=False)
+
+
+def export_json(meal_ids, path=MEALS_CATALOG):
+    """{"meals": [...], "daily_nutrition": [...]} in one pass over the meals, in chunks."""
+    totals = DailyTotals()
+    yield '{"meals": ['
+    first = True
+    for chunk in iter_meals(meal_ids, path=path):
+        totals.add(chunk)
+        records = chunk.rename_axis("meal_id").reset_index().to_json(orient="records", force_ascii=False)
+        yield ("" if first else ",") + records[1:-1]
+        first = False
+    yield '], "daily_nutrition": ' + json.dumps(totals.rows()) + "}"
+
+
+EXPORTS = {
+    "Meals (CSV)": ("my_meals.csv", meals_csv),
+    "Daily nutrition (CSV)": ("my_daily_nutrition.csv", daily_nutrition_csv),
+    "Meals and daily nutrition (JSON)": ("my_meals.json", export_json),
+}
+
+
+def _remove_old_exports(now):
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    for name in os.listdir(EXPORT_DIR):
+        directory = os.path.join(EXPORT_DIR, name)
+        try:
+            if now - os.path.getmtime(directory) > EXPORT_TTL:
+                shutil.rmtree(directory, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def write_export(kind, meal_ids, path=MEALS_CATALOG):
+    """
+    Write one of the EXPORTS for the given meals to a new file under EXPORT_DIR.
+
+    Returns:
+    dict with "path", "file_name" and "size" (bytes)
+    """
+    file_name, export = EXPORTS[kind]
+    now = time.time()
+    _remove_old_exports(now)
+    token = secrets.token_urlsafe(16)
+    directory = os.path.join(EXPORT_DIR, token)
+    os.makedirs(directory)
+    file_path = os.path.join(directory, file_name)
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        for text in export(meal_ids, path=path):
+            f.write(text)
+    return {"path": file_path, "file_name": file_name, "size": os.path.getsize(file_path)}
+
+
+def remove_export(export_file):
+    """Delete an export written by write_export (e.g. once it has been downloaded)."""
+    shutil.rmtree(os.path.dirname(export_file["path"]), ignore_errors=True)
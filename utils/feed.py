@@ -0,0 +1,199 @@
+# utils/feed.py
+"""
+Feed snapshots shared by every session in the Streamlit process.
+
+Without this, each open session reloads the catalog and re-filters, re-sorts
+and rebuilds the same Trending/category feed on every rerun. FeedStore keeps
+one copy of the catalog's card columns (no ingredients or instructions; detail
+views load those per meal), one feed card per meal, and per (category, sort)
+the ordered meal ids. When a meal is added, the card is built once and inserted in
+place in every snapshot; nothing is re-sorted.
+
+Every change bumps FeedStore.version. Pages record the version they drew and
+call watch_feed_updates(), which polls it and reruns the page when a new meal
+arrives, so open feeds pick it up without the user reloading.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.meals import (CARD_COLUMNS, MEALS_CATALOG, SORT_OPTIONS, catalog_rows, catalog_version, filter_meals,
+                         load_meals, sort_meals, to_feed_meal)
+from utils.recipe_cards import refresh_meal_cards
+
+FEED_POLL_SECONDS = 5
+# Up to this many new meals are inserted into the existing snapshots; past it (a bulk import) they're rebuilt
+MAX_INSERTS = 1000
+
+
+def _sort_keys(values, column):
+    # Comparable numeric keys for a sort column (datetimes as nanoseconds); missing values become NaN
+    if column == "datetime":
+        stamps = pd.to_datetime(pd.Series(values), errors="coerce")
+        keys = stamps.to_numpy(dtype="datetime64[ns]").astype("int64").astype(float)
+        keys[stamps.isna().to_numpy()] = np.nan
+        return keys
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+
+
+class FeedSnapshot:
+    """The meal ids of one (category, sort) feed in display order, plus their sort keys."""
+
+    def __init__(self, meals_df, category, sort_by):
+        self.category = category
+        self.column, self.ascending = SORT_OPTIONS.get(sort_by, (None, True))
+        ordered = sort_meals(filter_meals(meals_df, category=category), sort_by)
+        self.ids = ordered.index.to_numpy()
+        self.keys = _sort_keys(ordered[self.column], self.column) if self.column in ordered.columns else None
+        self.cards = None
+
+    def insert(self, meal_id, meal_data):
+        """Insert a new meal where sort_meals() would put it (after ties, since its id is the newest)."""
+        if self.category != "All" and meal_data.get("meal_category") != self.category:
+            return
+        if self.keys is None:
+            position = len(self.ids)
+        else:
+            key = _sort_keys(pd.Series([meal_data.get(self.column)]), self.column)[0]
+            if np.isnan(key):
+                position = len(self.ids)
+            else:
+                # Keys are in display order (missing ones last), so the count of keys that go first is the position
+                position = int((self.keys <= key).sum() if self.ascending else (self.keys >= key).sum())
+            self.keys = np.insert(self.keys, position, key)
+        self.ids = np.insert(self.ids, position, meal_id)
+        self.cards = None
+
+
+class FeedStore:
+    """The catalog, its feed cards and the feed snapshots, kept up to date as meals are added."""
+
+    def __init__(self, path=MEALS_CATALOG):
+        self.path = path
+        self.lock = threading.RLock()
+        self.version = 0
+        self.file_version = None
+        self.meals_df = pd.DataFrame(columns=CARD_COLUMNS)
+        self.cards = {}
+        self.snapshots = {}
+
+    def refresh(self):
+        """Pick up changes made to the catalog file by other processes (e.g. the import and backfill scripts)."""
+        file_version = catalog_version(self.path)
+        if file_version == self.file_version:
+            return
+        with self.lock:
+            if file_version == self.file_version:
+                return
+            meals_df = load_meals(self.path, columns=CARD_COLUMNS)
+            known = len(self.meals_df)
+            if known and known <= len(meals_df) <= known + MAX_INSERTS \
+                    and meals_df.iloc[:known].equals(self.meals_df):
+                # Only appended: insert the new meals into the existing snapshots
+                for meal_id, meal_data in zip(meals_df.index[known:], meals_df.iloc[known:].to_dict("records")):
+                    self._insert(meal_id, meal_data)
+                self.meals_df = meals_df
+            else:
+                self.meals_df = meals_df
+                self.cards = {meal_id: to_feed_meal(meal_data, user=None, meal_id=meal_id)
+                              for meal_id, meal_data in zip(meals_df.index, meals_df.to_dict("records"))}
+                self.snapshots = {}
+            self.file_version = file_version
+            self.version += 1
+
+    def add_meal(self, meal_id, meal_data):
+        """Add a meal just appended to the catalog (by this process) without reloading the file."""
+        with self.lock:
+            if meal_id != len(self.meals_df):
+                # We've missed other changes; reload instead
+                self.refresh()
+                return
+            self._insert(meal_id, meal_data)
+            row = pd.DataFrame([meal_data], index=[meal_id])
+            self.meals_df = pd.concat([self.meals_df, row.reindex(columns=self.meals_df.columns)])
+            self.version += 1
+            # The file's version only stands for what this store holds if no other process appended since this
+            # meal. Read before the row count, so an append in between shows up in one or the other.
+            file_version = catalog_version(self.path)
+            if catalog_rows(self.path) == len(self.meals_df):
+                self.file_version = file_version
+            else:
+                self.refresh()
+
+    def _insert(self, meal_id, meal_data):
+        self.cards[meal_id] = to_feed_meal(meal_data, user=None, meal_id=meal_id)
+        for snapshot in self.snapshots.values():
+            snapshot.insert(meal_id, meal_data)
+
+    def snapshot(self, category="All", sort_by="Newest"):
+        self.refresh()
+        key = (category, sort_by)
+        # An RLock: view() calls this while holding it
+        with self.lock:
+            if key not in self.snapshots:
+                self.snapshots[key] = FeedSnapshot(self.meals_df, category, sort_by)
+            return self.snapshots[key]
+
+    def order(self, category="All", sort_by="Newest"):
+        """Meal ids of a feed, in display order."""
+        return self.snapshot(category, sort_by).ids
+
+    def view(self, category="All", sort_by="Newest"):
+        """
+        The catalog frame, a feed's meal ids in display order and the store version, all from the same state
+        of the store (a meal added between reading the frame and the order could otherwise be missing from one).
+        """
+        self.refresh()
+        with self.lock:
+            return self.meals_df, self.snapshot(category, sort_by).ids, self.version
+
+    def feed(self, category="All", sort_by="Newest"):
+        """Feed cards (see utils.meals.to_feed_meal) in display order. Cards without a poster have user None."""
+        snapshot = self.snapshot(category, sort_by)
+        with self.lock:
+            if snapshot.cards is None:
+                snapshot.cards = tuple(self.cards[meal_id] for meal_id in snapshot.ids)
+            return snapshot.cards
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feed_store(path=MEALS_CATALOG):
+    """The process-wide feed store (one per catalog path)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = FeedStore(path)
+        return _store
+
+
+def notify_meal_added(meal_id, meal_data, path=MEALS_CATALOG):
+    """
+    Tell the feed store (and through it every open feed) that a meal was appended to the catalog, and have its
+    recipe card rendered in the background.
+    """
+    get_feed_store(path).add_meal(meal_id, meal_data)
+    if path == MEALS_CATALOG:
+        refresh_meal_cards([meal_id])
+
+
+def watch_feed_updates(seen_version, path=MEALS_CATALOG):
+    """
+    Rerun the page when the feed store has changed since the version it drew (checked every few seconds).
+
+    Parameters:
+    seen_version (int): FeedStore.version at the time the page read its feed
+    """
+    import streamlit as st
+
+    @st.fragment(run_every=FEED_POLL_SECONDS)
+    def _watch():
+        store = get_feed_store(path)
+        store.refresh()
+        if store.version != seen_version:
+            st.rerun()
+
+    _watch()
@@ -0,0 +1,143 @@
+# utils/images.py
+"""
+Checking and shrinking uploaded meal images before anything is stored or shown.
+
+An upload is checked in stages, so a hostile file is turned away as early as
+possible:
+
+  1. Size: more than MAX_UPLOAD_BYTES is rejected without being parsed
+     (Streamlit also refuses bodies over server.maxUploadSize, see
+     .streamlit/config.toml).
+  2. Header: Image.open() reads only the header. The format must be JPEG or
+     PNG, and the dimensions within MAX_SIDE and MAX_PIXELS. Nothing has been
+     decoded yet, so a decompression bomb never gets further than this.
+  3. Decode: JPEGs are decoded straight at a reduced scale (draft mode, 1/2 to
+     1/8 of full size) close to STORED_MAX_SIDE; PNGs have no such mode and are
+     decoded at full size. Either way, the bytes the decoded raster will take
+     are worked out from the header first, and refused above MAX_DECODE_BYTES.
+     So is the peak of the whole job (MAX_PEAK_BYTES): the decoded raster plus
+     the copies made after it, from the EXIF rotation or the conversion to RGB
+     (an RGBA copy and a white RGB background for a transparent PNG).
+  4. Derivatives: the stored image (at most STORED_MAX_SIDE, JPEG) and a small
+     preview (PREVIEW_MAX_SIDE) are made from the decoded image; pages show the
+     preview, never the upload itself.
+
+process_upload() reports the peak bytes of raster memory held during steps 3
+and 4, as measured on the images it made; MAX_PEAK_BYTES bounds it.
+"""
+import io
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+MAX_SIDE = 12_000
+MAX_PIXELS = 40_000_000
+MAX_DECODE_BYTES = 64 * 1024 * 1024
+# Raster memory of the whole job: the decoded image plus the copies made from it
+MAX_PEAK_BYTES = 128 * 1024 * 1024
+STORED_MAX_SIDE = 1600
+PREVIEW_MAX_SIDE = 480
+ALLOWED_FORMATS = {"JPEG", "PNG"}
+JPEG_QUALITY = 85
+
+
+def _raster_bytes(image):
+    # Bytes Pillow allocates for a decoded image (a byte per band per pixel, more for the wide modes)
+    bytes_per_pixel = {"1": 1, "L": 1, "P": 1, "I": 4, "F": 4, "I;16": 2}.get(image.mode, len(image.getbands()))
+    return image.width * image.height * bytes_per_pixel
+
+
+def _conversion_bytes(image):
+    # Bytes _to_rgb allocates for an image of this mode and size, known from the header
+    pixels = image.width * image.height
+    if image.mode == "RGB":
+        return 0
+    if "A" not in image.getbands() and "transparency" not in image.info:
+        return pixels * 3
+    return pixels * (4 + 3)
+
+
+def _projected_peak(image):
+    # Peak raster bytes of processing an image that hasn't been decoded yet: the decoded raster, plus whichever
+    # is bigger of the rotated copy (freed before the conversion) and the conversion to RGB
+    decoded = _raster_bytes(image)
+    rotated = image.getexif().get(0x0112, 1) not in (0, 1)
+    return decoded + max(decoded if rotated else 0, _conversion_bytes(image))
+
+
+def _to_rgb(image):
+    # JPEG has no transparency: put transparent images on white. Returns the image and any bytes used on the way.
+    from PIL import Image
+    if image.mode == "RGB":
+        return image, 0
+    if "A" not in image.getbands() and "transparency" not in image.info:
+        return image.convert("RGB"), 0
+    rgba = image.convert("RGBA")
+    background = Image.new("RGB", rgba.size, "white")
+    background.paste(rgba, mask=rgba.getchannel("A"))
+    return background, _raster_bytes(rgba)
+
+
+def _encode(image, max_side):
+    from PIL import Image
+    image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def process_upload(data):
+    """
+    Check an uploaded image and make the stored copy and the preview.
+
+    Parameters:
+    data (bytes): The uploaded file's contents
+
+    Returns:
+    dict with "image" (JPEG bytes, at most STORED_MAX_SIDE), "preview" (JPEG bytes, at most PREVIEW_MAX_SIDE),
+    "original_size" (width, height), "size" (of the stored image) and "peak_bytes" (raster memory used)
+
+    Raises:
+    ValueError: The upload is too big, not a JPEG or PNG, its dimensions are over the limits, or processing it
+        would take more than MAX_DECODE_BYTES / MAX_PEAK_BYTES of memory
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(f"The image is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+
+    try:
+        image = Image.open(io.BytesIO(data), formats=sorted(ALLOWED_FORMATS))
+    except UnidentifiedImageError:
+        raise ValueError("That file isn't a JPEG or PNG image we can read.") from None
+    except Image.DecompressionBombError:
+        raise ValueError(f"The image is too large; please upload one under {MAX_PIXELS // 1_000_000} megapixels.") \
+            from None
+
+    with image:
+        original_size = image.size
+        width, height = original_size
+        if width > MAX_SIDE or height > MAX_SIDE or width * height > MAX_PIXELS:
+            raise ValueError(f"The image is {width}×{height}; please upload one under "
+                             f"{MAX_PIXELS // 1_000_000} megapixels.")
+
+        if image.format == "JPEG":
+            # Decode at the smallest DCT scale that still covers the stored size
+            image.draft("RGB", (STORED_MAX_SIDE, STORED_MAX_SIDE))
+        if _raster_bytes(image) > MAX_DECODE_BYTES or _projected_peak(image) > MAX_PEAK_BYTES:
+            raise ValueError("The image is too large to process; please upload a smaller one.")
+
+        try:
+            image.load()
+        except (OSError, Image.DecompressionBombError):
+            raise ValueError("The image file is damaged or incomplete.") from None
+
+        # Phone photos are often stored sideways with an EXIF rotation; apply it in place (no second copy)
+        ImageOps.exif_transpose(image, in_place=True)
+        rgb, conversion_bytes = _to_rgb(image)
+        peak = _raster_bytes(image) + (_raster_bytes(rgb) if rgb is not image else 0) + conversion_bytes
+
+        stored = _encode(rgb, STORED_MAX_SIDE)
+        size = rgb.size
+        preview = _encode(rgb, PREVIEW_MAX_SIDE)
+
+    return {"image": stored, "preview": preview, "original_size": original_size, "size": size,
+            "peak_bytes": peak}
@@ -0,0 +1,326 @@
+# utils/ingredients.py
+"""
+Ingredient parsing and the normalized ingredient index.
+
+Share_Your_Meal.py parses the free-text ingredient list once, when a meal is
+submitted, into (quantity, unit, canonical name) rows in the meal_ingredients
+table. The table is loaded into in-memory posting lists (ingredient -> meal
+ids), so "what can I make with chicken and rice" is a set intersection rather
+than a substring scan over every ingredients blob.
+
+Meal ids are row positions in the catalog (see utils/meals.py).
+"""
+import re
+import threading
+from fractions import Fraction
+
+from utils.db import get_db_connection
+from utils.meals import filter_meals, load_meal_rows
+
+UNIT_ALIASES = {
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbs": "tbsp", "tbl": "tbsp", "T": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp", "t": "tsp",
+    "gram": "g", "grams": "g", "g": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kg": "kg",
+    "ounce": "oz", "ounces": "oz", "oz": "oz",
+    "pound": "lb", "pounds": "lb", "lb": "lb", "lbs": "lb",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml", "ml": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l", "l": "l",
+    "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can", "tin": "can", "tins": "can",
+    "scoop": "scoop", "scoops": "scoop",
+    "slice": "slice", "slices": "slice",
+    "piece": "piece", "pieces": "piece",
+    "pinch": "pinch", "pinches": "pinch", "dash": "pinch",
+    "handful": "handful", "handfuls": "handful",
+    "bunch": "bunch", "bunches": "bunch",
+    "stalk": "stalk", "stalks": "stalk",
+    "package": "package", "packages": "package", "pack": "package", "packet": "package",
+}
+
+# Words that describe preparation or size rather than the ingredient itself
+DESCRIPTORS = {
+    "fresh", "freshly", "large", "medium", "small", "big", "chopped", "finely", "roughly", "coarsely", "diced",
+    "sliced", "thinly", "minced", "grated", "shredded", "crushed", "ground", "peeled", "cooked", "uncooked", "raw",
+    "boneless", "skinless", "optional", "to", "taste", "of", "a", "an", "about", "approx", "approximately",
+    "softened", "melted", "room", "temperature", "divided", "packed", "heaping", "level", "whole", "halved",
+    "quartered", "drained", "rinsed", "frozen", "dried", "canned", "plain", "extra", "virgin", "ripe", "cold",
+    "warm", "hot", "lightly", "beaten", "trimmed", "cubed", "zested", "juiced", "spring", "for", "serving",
+    "pressed", "mashed", "toasted", "unsalted", "salted", "low", "fat", "free", "reduced",
+}
+
+UNICODE_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8", "⅕": "1/5"}
+
+_QUANTITY_RE = re.compile(r"^\s*(\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?)(?:\s*(?:-|to)\s*(\d+(?:\.\d+)?))?")
+_ATTACHED_UNIT_RE = re.compile(r"^([a-zA-Z]+)\b")
+_QUERY_SPLIT_RE = re.compile(r",|;|\band\b|&|\+", re.IGNORECASE)
+_QUERY_PREFIX_RE = re.compile(r"^.*\bwith\b", re.IGNORECASE)
+
+
+def _parse_quantity(text):
+    # Returns (quantity or None, rest of the line)
+    for symbol, fraction in UNICODE_FRACTIONS.items():
+        text = text.replace(symbol, f" {fraction}")
+    match = _QUANTITY_RE.match(text)
+    if not match:
+        return None, text
+    low = float(sum(Fraction(part) for part in match.group(1).split()))
+    # Ranges like "2-3 cloves" use the midpoint
+    quantity = (low + float(match.group(2))) / 2 if match.group(2) else low
+    return quantity, text[match.end():]
+
+
+def singular(word):
+    """The singular of a word, e.g. "tomatoes" -> "tomato" (short words and "-ss" words are kept as they are)."""
+    if len(word) <= 3 or word.endswith("ss"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def canonical_name(text):
+    """Reduce an ingredient description to a canonical name, e.g. "Finely chopped Onions (red)" -> "onion"."""
+    text = re.sub(r"\(.*?\)", " ", text.lower())
+    # "1 onion, diced" / "salt or pepper" -> the first part names the ingredient
+    text = re.split(r",| or ", text)[0]
+    words = [singular(word) for word in re.findall(r"[a-z]+", text) if word not in DESCRIPTORS]
+    return " ".join(words)
+
+
+def parse_ingredient_line(line):
+    """
+    Parse one ingredient line into its parts.
+
+    Parameters:
+    line (str): e.g. "1 1/2 cups rolled oats"
+
+    Returns:
+    dict with quantity (float or None), unit (str or None), name (canonical) and raw, or None for a blank line
+    """
+    raw = line.strip().lstrip("-•*").strip()
+    if not raw:
+        return None
+
+    quantity, rest = _parse_quantity(raw)
+    # "1 (14 oz) can chickpeas" -> the size note isn't the unit
+    rest = re.sub(r"\(.*?\)", " ", rest).strip()
+
+    unit = None
+    match = _ATTACHED_UNIT_RE.match(rest)
+    if match:
+        word = match.group(1)
+        key = word if word in ("T", "t") else word.lower()
+        # Single-letter units only count right after a number ("2 c flour"), never as part of a name
+        if key in UNIT_ALIASES and (quantity is not None or len(key) > 1):
+            unit = UNIT_ALIASES[key]
+            rest = rest[match.end():].lstrip(". ")
+
+    name = canonical_name(rest) or canonical_name(raw)
+    return {"quantity": quantity, "unit": unit, "name": name, "raw": raw}
+
+
+def parse_ingredients(text):
+    """Parse a free-text ingredient list (one ingredient per line)."""
+    if not isinstance(text, str):
+        return []
+    parsed = (parse_ingredient_line(line) for line in text.split("\n"))
+    return [item for item in parsed if item is not None and item["name"]]
+
+
+# --- STORAGE ---
+
+_tables_ready = False
+
+
+def init_ingredient_table(conn):
+    # Only needs to run once per process; after that it would just be a write on every rerun
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS meal_ingredients (
+        meal_id INTEGER NOT NULL,
+        line_no INTEGER NOT NULL,
+        quantity REAL,
+        unit TEXT,
+        name TEXT NOT NULL,
+        raw TEXT,
+        PRIMARY KEY (meal_id, line_no)
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meal_ingredients_name ON meal_ingredients (name, meal_id)")
+    # Highest catalog meal id that has been through the parser (meals can have no ingredient rows at all)
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS meal_ingredients_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        last_meal_id INTEGER NOT NULL
+    )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO meal_ingredients_state (id, last_meal_id) VALUES (0, -1)")
+    conn.commit()
+    _tables_ready = True
+
+
+def save_meal_ingredients(meal_id, ingredients_text, conn=None):
+    """Parse a meal's ingredient list and store it (replacing any previous rows for that meal)."""
+    return save_many_meal_ingredients([(meal_id, ingredients_text)], conn)[0]
+
+
+def save_many_meal_ingredients(meals, conn=None):
+    """Parse and store ingredients for many (meal_id, ingredients_text) pairs in one transaction."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_ingredient_table(conn)
+
+    parsed_meals = []
+    rows = []
+    for meal_id, ingredients_text in meals:
+        parsed = parse_ingredients(ingredients_text)
+        parsed_meals.append(parsed)
+        rows.extend((int(meal_id), line_no, item["quantity"], item["unit"], item["name"], item["raw"])
+                    for line_no, item in enumerate(parsed))
+
+    with conn:
+        conn.executemany("DELETE FROM meal_ingredients WHERE meal_id = ?", [(int(m),) for m, _ in meals])
+        conn.executemany("INSERT INTO meal_ingredients VALUES (?, ?, ?, ?, ?, ?)", rows)
+        # Meals right after the last one parsed (e.g. one just shared) needn't be parsed again by
+        # sync_ingredient_index. Any other meal leaves it alone: the meals before it haven't been parsed yet.
+        conn.executemany("UPDATE meal_ingredients_state SET last_meal_id = ? WHERE id = 0 AND last_meal_id = ?",
+                         [(meal_id, meal_id - 1) for meal_id in sorted({int(m) for m, _ in meals})])
+    if own_conn:
+        conn.close()
+    return parsed_meals
+
+
+def get_meal_ingredients(meal_id, conn=None):
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_ingredient_table(conn)
+    rows = conn.execute("SELECT quantity, unit, name, raw FROM meal_ingredients WHERE meal_id = ? ORDER BY line_no",
+                        (int(meal_id),)).fetchall()
+    if own_conn:
+        conn.close()
+    return [{"quantity": q, "unit": u, "name": n, "raw": r} for q, u, n, r in rows]
+
+
+# --- POSTING LISTS ---
+
+class IngredientIndex:
+    """In-memory posting lists: canonical ingredient name (and each word of it) -> set of meal ids."""
+
+    def __init__(self):
+        self.by_name = {}
+        self.by_word = {}
+        self.last_rowid = 0
+        self.max_meal_id = -1
+        self.lock = threading.Lock()
+
+    def add(self, meal_id, name):
+        self.by_name.setdefault(name, set()).add(meal_id)
+        for word in name.split():
+            self.by_word.setdefault(word, set()).add(meal_id)
+        self.max_meal_id = max(self.max_meal_id, meal_id)
+
+    def refresh(self, conn):
+        # Only rows added since the last refresh are read, so keeping up with new meals is cheap
+        rows = conn.execute("SELECT rowid, meal_id, name FROM meal_ingredients WHERE rowid > ? ORDER BY rowid",
+                            (self.last_rowid,)).fetchall()
+        for rowid, meal_id, name in rows:
+            self.add(meal_id, name)
+            self.last_rowid = rowid
+
+    def lookup(self, term):
+        """Meal ids containing one ingredient term (matches the full name or every word of it)."""
+        name = canonical_name(term)
+        if not name:
+            return set()
+        if name in self.by_name and " " in name:
+            return set(self.by_name[name])
+        postings = [self.by_word.get(word, set()) for word in name.split()]
+        return set.intersection(*postings) if postings else set()
+
+    def meals_with_all(self, terms):
+        """Meal ids that contain every one of the ingredient terms."""
+        result = None
+        # Intersect the shortest posting lists first
+        for postings in sorted((self.lookup(term) for term in terms), key=len):
+            result = postings if result is None else result & postings
+            if not result:
+                return set()
+        return result or set()
+
+
+_index = IngredientIndex()
+
+
+def get_ingredient_index(conn=None):
+    """Return the process-wide ingredient index, brought up to date with the database."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_ingredient_table(conn)
+    with _index.lock:
+        _index.refresh(conn)
+    if own_conn:
+        conn.close()
+    return _index
+
+
+def sync_ingredient_index(meals_df, conn=None):
+    """
+    Parse and store ingredients for catalog rows that haven't been indexed yet.
+
+    The catalog is append-only, so this only has to look at meal ids above the
+    last one indexed; on most reruns it is a single comparison.
+    """
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    index = get_ingredient_index(conn)
+
+    if len(meals_df):
+        with _index.lock:
+            last_meal_id = conn.execute("SELECT last_meal_id FROM meal_ingredients_state WHERE id = 0").fetchone()[0]
+            if meals_df.index.max() > last_meal_id:
+                pending_ids = meals_df.index[meals_df.index > last_meal_id]
+                if "ingredients" in meals_df.columns:
+                    pending = meals_df.loc[pending_ids, "ingredients"]
+                else:
+                    # A projected frame (card columns only): read just the new meals' ingredients
+                    pending = load_meal_rows(pending_ids, ["ingredients"])["ingredients"]
+                save_many_meal_ingredients(list(pending.items()), conn)
+                with conn:
+                    conn.execute("UPDATE meal_ingredients_state SET last_meal_id = ? WHERE id = 0",
+                                 (int(meals_df.index.max()),))
+                index.refresh(conn)
+
+    if own_conn:
+        conn.close()
+    return index
+
+
+def split_ingredient_query(query):
+    """Split "what can I make with chicken and rice" into ["chicken", "rice"]."""
+    query = _QUERY_PREFIX_RE.sub("", query)
+    return [term.strip() for term in _QUERY_SPLIT_RE.split(query) if term.strip()]
+
+
+def search_meals(meals_df, search_query="", category="All", index=None):
+    """
+    Search meals, using the ingredient index instead of scanning ingredient text.
+
+    A query matches name, description and tags as text, or an ingredient by name. A query that reads as
+    several ingredients ("chicken and rice", "eggs, spinach") also matches meals containing all of them:
+    it may just as well be a meal's name ("Steak and Sweet Potato", "Mac & Cheese").
+    """
+    if not search_query:
+        return filter_meals(meals_df, category=category)
+
+    index = index or get_ingredient_index()
+    terms = split_ingredient_query(search_query)
+    ingredient_ids = index.meals_with_all(terms) if len(terms) > 1 else index.lookup(search_query)
+    return filter_meals(meals_df, search_query=search_query, category=category, ingredient_ids=ingredient_ids)
@@ -0,0 +1,98 @@
+# utils/interactions.py
+"""
+What users do with meals: share, save, like, view.
+
+Each interaction is a row in the meal_interactions table of the app database.
+Rows only ever get added, so readers that keep state (the recommender, see
+utils/recommendations.py) ask for the rows after the last id they have seen.
+Views come in through the event log (utils/events.py), a batch at a time.
+"""
+import time
+
+from utils.db import get_db_connection
+
+INTERACTION_KINDS = ("share", "save", "like", "view")
+
+_tables_ready = False
+
+
+def init_interaction_table(conn):
+    # Only needs to run once per process
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS meal_interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,  -- NULL for guests (views)
+        meal_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_meal_interactions_user ON meal_interactions (user_id, id)")
+    conn.commit()
+    _tables_ready = True
+
+
+def record_interaction(user_id, meal_id, kind, conn=None):
+    """Store one interaction (user_id None for a guest) and return its id."""
+    if kind not in INTERACTION_KINDS:
+        raise ValueError(f"Unknown interaction kind: {kind}")
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_interaction_table(conn)
+    with conn:
+        cursor = conn.execute("INSERT INTO meal_interactions (user_id, meal_id, kind, created_at) VALUES (?, ?, ?, ?)",
+                              (user_id, int(meal_id), kind, time.time()))
+    if own_conn:
+        conn.close()
+    return cursor.lastrowid
+
+
+def record_interactions(rows, conn=None):
+    """Store many interactions in one transaction; rows are (user_id, meal_id, kind, created_at) tuples."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_interaction_table(conn)
+    with conn:
+        conn.executemany("INSERT INTO meal_interactions (user_id, meal_id, kind, created_at) VALUES (?, ?, ?, ?)",
+                         rows)
+    if own_conn:
+        conn.close()
+
+
+def get_user_interactions(user_id, after_id=0, conn=None):
+    """A user's interactions with id above after_id, oldest first, as (id, meal_id, kind) tuples."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_interaction_table(conn)
+    rows = conn.execute("SELECT id, meal_id, kind FROM meal_interactions WHERE user_id = ? AND id > ? ORDER BY id",
+                        (user_id, after_id)).fetchall()
+    if own_conn:
+        conn.close()
+    return rows
+
+
+def get_user_meal_ids(user_id, kind="share", conn=None):
+    """Ids of the meals a user has shared (or saved, liked, ...), oldest first, each once."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_interaction_table(conn)
+    rows = conn.execute("SELECT meal_id FROM meal_interactions WHERE user_id = ? AND kind = ? GROUP BY meal_id "
+                        "ORDER BY MIN(id)", (user_id, kind)).fetchall()
+    if own_conn:
+        conn.close()
+    return [meal_id for meal_id, in rows]
+
+
+def get_interactions(after_id=0, since=0.0, conn=None):
+    """Everyone's interactions after after_id and since a Unix time, as (id, meal_id, kind, created_at) tuples."""
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_interaction_table(conn)
+    rows = conn.execute("SELECT id, meal_id, kind, created_at FROM meal_interactions WHERE id > ? AND created_at >= ? "
+                        "ORDER BY id", (after_id, since)).fetchall()
+    if own_conn:
+        conn.close()
+    return rows
@@ -0,0 +1,158 @@
+# utils/meal_planner.py
+"""
+Daily meal plans that come as close as possible to a set of macro targets.
+
+A plan picks one meal per slot (a meal category such as Breakfast, Lunch,
+Dinner), and its score is the weighted squared relative deviation of the
+plan's totals from the targets. The search runs in three steps over NumPy
+arrays of the catalog's macros:
+
+  1. Shortlist: for each slot, keep the meals closest to that slot's share of
+     the targets (argpartition, so no full sort of the category).
+  2. Beam search: add one slot at a time, keeping the best partial plans,
+     where a partial plan is scored as if the remaining slots hit their share.
+  3. Polish: for each resulting plan, repeatedly swap a slot for the best meal
+     in its whole category while that lowers the score.
+
+This keeps a plan interactive on catalogs of 100k meals. The arrays are built
+once per catalog version (see utils.meals.catalog_version).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from utils.meals import MEALS_CATALOG, load_meals
+
+PLAN_NUTRIENTS = ["protein", "carbs", "fat", "calories"]
+DEFAULT_TARGETS = {"protein": 150, "carbs": 200, "fat": 65, "calories": 2000}
+DEFAULT_SLOTS = ["Breakfast", "Lunch", "Dinner"]
+
+# Rough share of the day's targets each kind of meal should carry (normalised over the chosen slots)
+SLOT_SHARES = {"Breakfast": 0.25, "Lunch": 0.3, "Dinner": 0.35, "Snacks": 0.1, "Desserts": 0.1}
+
+SHORTLIST_SIZE = 256
+BEAM_WIDTH = 256
+MAX_POLISH_PASSES = 5
+
+
+class MealPlanner:
+    """The catalog's macros grouped by category, ready for plan searches."""
+
+    def __init__(self, meals_df):
+        complete = meals_df.dropna(subset=[c for c in PLAN_NUTRIENTS if c in meals_df.columns])
+        # Just what a plan shows, so the pages don't reload the catalog to display one
+        self.details = complete.reindex(columns=["meal_name", "meal_category"] + PLAN_NUTRIENTS)
+        self.meals = {}
+        for category, group in complete.groupby("meal_category", sort=False):
+            macros = group.reindex(columns=PLAN_NUTRIENTS).to_numpy(dtype=float)
+            self.meals[category] = (group.index.to_numpy(), macros)
+
+    def plan(self, targets=None, slots=None, n_plans=3, weights=None):
+        """
+        Find the n_plans best distinct plans.
+
+        Parameters:
+        targets (dict): Daily target per nutrient in PLAN_NUTRIENTS
+        slots (list): Meal category for each meal of the day (a category may repeat, e.g. two Snacks)
+        weights (dict): Relative importance of each nutrient (default: all equal)
+
+        Returns:
+        list of dicts with "meal_ids" (one per slot), "totals" (nutrient -> amount) and "score" (lower is closer)
+        """
+        targets = {**DEFAULT_TARGETS, **(targets or {})}
+        slots = list(slots or DEFAULT_SLOTS)
+        missing = [slot for slot in slots if slot not in self.meals]
+        if missing:
+            raise ValueError(f"No meals to plan with in: {', '.join(missing)}")
+
+        target = np.array([max(float(targets[n]), 1.0) for n in PLAN_NUTRIENTS])
+        weight = np.array([float((weights or {}).get(n, 1.0)) for n in PLAN_NUTRIENTS])
+        shares = np.array([SLOT_SHARES.get(slot, 1.0 / len(slots)) for slot in slots])
+        shares = shares / shares.sum()
+
+        def score(totals):
+            # Weighted squared relative deviation, over the last axis
+            return (((totals - target) / target) ** 2 * weight).sum(axis=-1)
+
+        # 1. Shortlist per slot: positions (within the slot's category) nearest the slot's share
+        shortlists = []
+        for slot, share in zip(slots, shares):
+            _, macros = self.meals[slot]
+            distance = score(macros / share) if len(macros) else np.array([])
+            size = min(SHORTLIST_SIZE, len(macros))
+            shortlists.append(np.argpartition(distance, size - 1)[:size])
+
+        # 2. Beam search over slots. Each beam is a choice of position per slot so far, and its running totals.
+        choices = np.zeros((1, 0), dtype=int)
+        totals = np.zeros((1, len(PLAN_NUTRIENTS)))
+        for s, slot in enumerate(slots):
+            _, macros = self.meals[slot]
+            candidates = shortlists[s]
+            expanded = totals[:, None, :] + macros[candidates][None, :, :]
+            remaining = target * shares[s + 1:].sum()
+            expanded_score = score(expanded + remaining)
+
+            # The same meal can't fill two slots of the same plan
+            for previous, previous_slot in enumerate(slots[:s]):
+                if previous_slot == slot:
+                    expanded_score[choices[:, previous][:, None] == candidates[None, :]] = np.inf
+
+            flat = expanded_score.ravel()
+            keep = min(BEAM_WIDTH, np.isfinite(flat).sum())
+            if keep == 0:
+                return []
+            best = np.argpartition(flat, keep - 1)[:keep]
+            beam, candidate = np.divmod(best, len(candidates))
+            choices = np.column_stack([choices[beam], candidates[candidate]])
+            totals = expanded[beam, candidate]
+
+        # 3. Polish the best few beams against the whole category, then keep distinct plans
+        order = np.argsort(score(totals))[:n_plans * 4]
+        plans = {}
+        for b in order:
+            chosen, plan_totals = self._polish(choices[b].copy(), totals[b].copy(), slots, score)
+            key = tuple(sorted(zip(slots, chosen.tolist())))
+            if key not in plans:
+                plans[key] = (chosen, plan_totals)
+
+        results = []
+        for chosen, plan_totals in plans.values():
+            results.append({
+                "meal_ids": [int(self.meals[slot][0][pos]) for slot, pos in zip(slots, chosen)],
+                "totals": {n: round(float(v), 1) for n, v in zip(PLAN_NUTRIENTS, plan_totals)},
+                "score": float(score(plan_totals)),
+            })
+        results.sort(key=lambda result: result["score"])
+        return results[:n_plans]
+
+    def describe(self, plan, slots):
+        """A plan's meals as a table: one row per slot, with the meal's name and macros."""
+        table = self.details.loc[plan["meal_ids"]].reset_index(names="meal_id")
+        table.insert(0, "slot", slots)
+        return table
+
+    def _polish(self, chosen, totals, slots, score):
+        # Coordinate descent: try every meal of a slot's category in its place, keep the best, repeat
+        for _ in range(MAX_POLISH_PASSES):
+            improved = False
+            for s, slot in enumerate(slots):
+                _, macros = self.meals[slot]
+                others = totals - macros[chosen[s]]
+                swap_scores = score(others + macros)
+                for t, other_slot in enumerate(slots):
+                    if t != s and other_slot == slot:
+                        swap_scores[chosen[t]] = np.inf
+                best = int(np.argmin(swap_scores))
+                if swap_scores[best] < score(totals) - 1e-12:
+                    chosen[s] = best
+                    totals = others + macros[best]
+                    improved = True
+            if not improved:
+                break
+        return chosen, totals
+
+
+@lru_cache(maxsize=2)
+def get_meal_planner(version=None, path=MEALS_CATALOG):
+    """The planner for the catalog at `path`; `version` (utils.meals.catalog_version) keys the cache."""
+    return MealPlanner(load_meals(path, columns=["meal_name", "meal_category"] + PLAN_NUTRIENTS))
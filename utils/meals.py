@@ -0,0 +1,306 @@
+# utils/meals.py
+"""
+Shared access to the meal catalog.
+
+The page scripts and the benchmark/maintenance scripts all load, filter, sort
+and append meals through these functions so they behave the same everywhere.
+
+The catalog lives in data/catalog, a columnar (Parquet) store (see
+utils/catalog.py), so list views can read just the card columns and a detail
+view just one meal. Any path ending in .csv is read and written as CSV
+instead; data/meals.csv is the CSV copy, converted back and forth with
+scripts/convert_catalog.py.
+
+A meal's id is its row position in the catalog. Meals are only ever appended,
+so ids are stable, and the frame returned by load_meals() is indexed by them.
+"""
+import os
+import random
+from functools import lru_cache
+
+import pandas as pd
+
+from utils import catalog
+
+MEALS_CSV = "data/meals.csv"
+MEALS_CATALOG = "data/catalog"
+
+MEAL_COLUMNS = [
+    "meal_name", "meal_category", "meal_tags", "meal_description", "recipe_url",
+    "protein", "carbs", "fat", "calories", "fiber", "sugar", "sodium", "cholesterol",
+    "saturated_fat", "trans_fat", "ingredients", "instructions", "datetime", "image_path",
+]
+
+# Large text only needed by detail views; everything else is what a feed card needs
+DETAIL_COLUMNS = ["ingredients", "instructions"]
+CARD_COLUMNS = [column for column in MEAL_COLUMNS if column not in DETAIL_COLUMNS]
+NUMERIC_COLUMNS = ["protein", "carbs", "fat", "calories", "fiber", "sugar", "sodium", "cholesterol",
+                   "saturated_fat", "trans_fat"]
+TEXT_COLUMNS = [column for column in MEAL_COLUMNS if column not in NUMERIC_COLUMNS]
+
+MEAL_CATEGORIES = ["Breakfast", "Lunch", "Dinner", "Snacks", "Desserts"]
+
+# Columns searched by the free-text search box
+SEARCH_COLUMNS = ["meal_name", "meal_description", "ingredients", "meal_tags"]
+
+# Sort options used by the pages -> (column, ascending). Home.py and Meal_Feed.py
+# use slightly different labels for the same orderings.
+SORT_OPTIONS = {
+    "Newest": ("datetime", False),
+    "Newest First": ("datetime", False),
+    "Oldest First": ("datetime", True),
+    "Highest Protein": ("protein", False),
+    "Lowest Calories": ("calories", True),
+    # Only the sample meals have these columns; catalog meals are ranked by utils/trending.py and utils/ratings.py
+    "Most Popular": ("reviews", False),
+    "Top Rated": ("rating", False),
+}
+
+PLACEHOLDER_IMAGE = "https://api.placeholder.com/640/480"
+
+
+def is_csv(path):
+    return str(path).endswith(".csv")
+
+
+def load_meals(path=MEALS_CATALOG, columns=None):
+    """
+    Load the meal catalog, returning an empty frame (with the usual columns) if there is none yet.
+
+    Parameters:
+    columns (list): Only read these columns (e.g. CARD_COLUMNS for list views). Default: all of them.
+    """
+    if not is_csv(path):
+        return catalog.read_catalog(path, columns or MEAL_COLUMNS, TEXT_COLUMNS, NUMERIC_COLUMNS)
+    try:
+        return pd.read_csv(path, usecols=None if columns is None else lambda column: column in columns)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return pd.DataFrame(columns=columns or MEAL_COLUMNS)
+
+
+def load_meal_rows(meal_ids, columns=None, path=MEALS_CATALOG):
+    """Load just some meals by id (e.g. DETAIL_COLUMNS for the meals being expanded)."""
+    columns = columns or MEAL_COLUMNS
+    if not is_csv(path):
+        return catalog.read_rows(path, meal_ids, columns, TEXT_COLUMNS, NUMERIC_COLUMNS)
+    meals_df = load_meals(path, columns)
+    return meals_df.loc[meals_df.index.intersection(list(meal_ids))]
+
+
+def load_meal(meal_id, columns=None, path=MEALS_CATALOG):
+    """One meal as a dict, or None if there is no such meal."""
+    rows = load_meal_rows([meal_id], columns, path)
+    return rows.iloc[0].to_dict() if len(rows) else None
+
+
+def catalog_exists(path=MEALS_CATALOG):
+    return catalog_version(path) is not None
+
+
+def catalog_rows(path=MEALS_CATALOG):
+    """How many meals the catalog holds, from its manifest; None for a CSV catalog (it would have to be read)."""
+    if is_csv(path):
+        return None
+    manifest = catalog.read_manifest(path)
+    return manifest["rows"] if manifest else 0
+
+
+def catalog_version(path=MEALS_CATALOG):
+    """A value that changes whenever the catalog is written, for keying caches built from it."""
+    if not is_csv(path):
+        return catalog.catalog_version(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def filter_ranges(meals_df, ranges):
+    """
+    Keep the meals whose values fall within every (column, low, high) range. Either bound may be None.
+
+    This scans the columns; the catalog pages use utils/nutrient_index.py for the same thing with an index.
+    """
+    mask = pd.Series(True, index=meals_df.index)
+    for column, low, high in ranges:
+        if column not in meals_df.columns:
+            return meals_df.iloc[0:0]
+        values = pd.to_numeric(meals_df[column], errors="coerce")
+        mask &= values.notna()
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return meals_df[mask]
+
+
+def filter_meals(meals_df, search_query="", category="All", ingredient_ids=None, ranges=()):
+    """
+    Apply the category filter and a case-insensitive search over name, description, ingredients and tags.
+
+    Parameters:
+    ingredient_ids (set): Meal ids whose parsed ingredients match the query (see utils/ingredients.py).
+        When given, these are used instead of scanning the ingredients text.
+    ranges (tuple): (column, low, high) nutrition ranges the meals must fall within
+    """
+    if category != "All":
+        meals_df = meals_df[meals_df["meal_category"] == category]
+
+    if ranges:
+        meals_df = filter_ranges(meals_df, ranges)
+
+    if search_query:
+        search_mask = pd.Series(False, index=meals_df.index)
+        if ingredient_ids is not None:
+            search_mask |= meals_df.index.isin(ingredient_ids)
+        for column in SEARCH_COLUMNS:
+            if column == "ingredients" and ingredient_ids is not None:
+                continue
+            if column in meals_df.columns:
+                search_mask |= meals_df[column].astype("string").str.contains(
+                    search_query, case=False, na=False, regex=False)
+        meals_df = meals_df[search_mask]
+
+    return meals_df
+
+
+def sort_meals(meals_df, sort_by="Newest"):
+    """Sort meals by one of the SORT_OPTIONS labels. Unknown options, or a missing column, keep file order."""
+    if sort_by not in SORT_OPTIONS:
+        return meals_df
+    column, ascending = SORT_OPTIONS[sort_by]
+    if column not in meals_df.columns:
+        return meals_df
+    # A stable sort keeps ties in file order, so the feed doesn't jump around between reruns
+    return meals_df.sort_values(column, ascending=ascending, kind="stable")
+
+
+def to_feed_meal(meal_dict, user="@Guest", meal_id=None):
+    """Convert a catalog row (as a dict) into the card format used by the Home feed."""
+    return {
+        "meal_id": meal_id,
+        "name": meal_dict.get("meal_name", "Untitled Meal"),
+        "image": meal_dict.get("image_path", PLACEHOLDER_IMAGE),
+        "user": meal_dict.get("user", user),
+        # Catalog meals' ratings come from utils/ratings.py when they're shown
+        "rating": meal_dict.get("rating"),
+        "reviews": meal_dict.get("reviews", 0),
+        "protein": meal_dict.get("protein", 0),
+        "carbs": meal_dict.get("carbs", 0),
+        "fat": meal_dict.get("fat", 0),
+        "calories": meal_dict.get("calories", 0),
+        "category": meal_dict.get("meal_category", "Other"),
+        "date_posted": meal_dict.get("datetime", pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")),
+        # Additional fields for details view
+        "description": meal_dict.get("meal_description", ""),
+        "recipe_url": meal_dict.get("recipe_url", ""),
+        "ingredients": meal_dict.get("ingredients", ""),
+        "instructions": meal_dict.get("instructions", ""),
+        "is_user_submitted": meal_dict.get("is_user_submitted", True),
+        "original_data": meal_dict  # Store the original data for reference
+    }
+
+
+# --- SAMPLE MEALS ---
+# Filler content for the Home feed when there aren't enough real meals yet.
+# It is generated once from a fixed seed, so the feed (and any selected index)
+# stays the same from one rerun to the next.
+
+SAMPLE_SEED = 2025
+SAMPLE_MEALS_PER_CATEGORY = 10
+SAMPLE_USERS = ["@HealthyChef", "@FitnessFoodie", "@MacroMaster", "@KetoKing", "@VeganVibes", "@LeoTheChef"]
+SAMPLE_ITEMS = {
+    "Breakfast": ["Protein Oatmeal", "Greek Yogurt Bowl", "Egg White Scramble", "Avocado Toast", "Protein Pancakes"],
+    "Lunch": ["Chicken Salad", "Tuna Wrap", "Quinoa Bowl", "Turkey Sandwich", "Lentil Soup"],
+    "Dinner": ["Salmon with Veggies", "Steak and Sweet Potato", "Chicken Stir Fry", "Tofu Curry", "Turkey Meatballs"],
+    "Snacks": ["Protein Bar", "Greek Yogurt", "Hummus and Veggies", "Protein Shake", "Apple with Peanut Butter"],
+    "Desserts": ["Protein Brownies", "Fruit Parfait", "Protein Cookies", "Frozen Yogurt", "Protein Mug Cake"],
+}
+
+
+@lru_cache(maxsize=None)
+def get_sample_pool(seed=SAMPLE_SEED):
+    """Build the fixed pool of sample meals, in the same columns as the real catalog."""
+    rng = random.Random(seed)
+    rows = []
+    for meal_category in MEAL_CATEGORIES:
+        for _ in range(SAMPLE_MEALS_PER_CATEGORY):
+            protein = rng.randint(15, 40)
+            carbs = rng.randint(20, 60)
+            fat = rng.randint(5, 25)
+            posted = pd.Timestamp("2025-03-01") - pd.Timedelta(days=rng.randint(0, 30))
+            rows.append({
+                "meal_name": rng.choice(SAMPLE_ITEMS[meal_category]),
+                "meal_category": meal_category,
+                "protein": protein,
+                "carbs": carbs,
+                "fat": fat,
+                "calories": protein * 4 + carbs * 4 + fat * 9,
+                "datetime": posted.strftime("%Y-%m-%d %H:%M:%S"),
+                "image_path": PLACEHOLDER_IMAGE,
+                "user": rng.choice(SAMPLE_USERS),
+                "rating": round(rng.uniform(3.5, 5.0), 1),
+                "reviews": rng.randint(10, 200),
+                "is_user_submitted": False,
+            })
+    pool = pd.DataFrame(rows).reindex(columns=MEAL_COLUMNS + ["user", "rating", "reviews", "is_user_submitted"])
+    text_columns = ["meal_tags", "meal_description", "recipe_url", "ingredients", "instructions"]
+    return pool.fillna({column: "" for column in text_columns}).fillna(0)
+
+
+@lru_cache(maxsize=256)
+def _sample_feed(search_query, category, sort_by, ranges):
+    # Sample meals go through the same filter and sort path as real meals
+    pool = filter_meals(get_sample_pool(), search_query=search_query, category=category, ranges=ranges)
+    pool = sort_meals(pool, sort_by)
+    return tuple(to_feed_meal(meal_dict) for meal_dict in pool.to_dict("records"))
+
+
+def get_sample_meals(n=12, search_query="", category="All", sort_by="Newest", ranges=()):
+    """Return up to n sample meals matching the search, category, nutrition ranges and sort (cached per combination)."""
+    return list(_sample_feed(search_query, category, sort_by, tuple(ranges))[:n])
+
+
+def append_meal(meal_data, path=MEALS_CATALOG):
+    """Append one meal (a dict keyed by MEAL_COLUMNS) to the catalog and return its meal id."""
+    return append_meals(pd.DataFrame([meal_data]), path)
+
+
+def append_meals(meals_df, path=MEALS_CATALOG):
+    """Append many meals in one write and return the id of the first one (the others follow in row order)."""
+    if not is_csv(path):
+        # Written as new parts; the rest of the catalog isn't touched
+        return catalog.append_rows(path, meals_df, TEXT_COLUMNS, NUMERIC_COLUMNS)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    existing_df = load_meals(path)
+    _write_meals(pd.concat([existing_df, meals_df], ignore_index=True), path)
+    # Meal ids are row positions
+    return len(existing_df)
+
+
+def save_meals(meals_df, path=MEALS_CATALOG):
+    """
+    Rewrite the whole catalog, via a temporary file (or new parts) so readers never see it half-written.
+
+    Any meal may have changed, so the recipe cards on disk are queued for re-rendering (see
+    utils/recipe_cards.py); a script that calls this waits for them when it exits.
+    """
+    from utils.recipe_cards import refresh_meal_cards
+
+    _write_meals(meals_df, path)
+    if path == MEALS_CATALOG:
+        refresh_meal_cards()
+
+
+def _write_meals(meals_df, path):
+    if not is_csv(path):
+        catalog.write_catalog(path, meals_df, TEXT_COLUMNS, NUMERIC_COLUMNS)
+        return
+    tmp_path = f"{path}.tmp"
+    meals_df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
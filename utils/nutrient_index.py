@@ -0,0 +1,155 @@
+# utils/nutrient_index.py
+"""
+Range search over the nutrition columns ("at least 30g protein, under 400 calories").
+
+A search is a tuple of (column, low, high) ranges; either bound may be None for
+an open end. NutrientIndex keeps each column of the catalog sorted, so one range
+is a binary search, and a search with several ranges starts from the narrowest
+one and checks the others as a vectorized mask over just those candidates.
+The index is rebuilt only when the nutrition values in the catalog change.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.meals import filter_ranges
+from utils.nutrition import NUTRIENT_COLUMNS
+
+# column -> (slider label, slider maximum). A slider left at its maximum means "no upper limit".
+NUTRIENT_FILTERS = {
+    "protein": ("Protein (g)", 150),
+    "carbs": ("Carbs (g)", 200),
+    "fat": ("Fat (g)", 100),
+    "calories": ("Calories", 1500),
+    "fiber": ("Fiber (g)", 50),
+    "sugar": ("Sugar (g)", 100),
+    "sodium": ("Sodium (mg)", 3000),
+    "cholesterol": ("Cholesterol (mg)", 600),
+    "saturated_fat": ("Saturated Fat (g)", 50),
+    "trans_fat": ("Trans Fat (g)", 10),
+}
+
+
+def _numeric_matrix(meals_df, columns):
+    # Missing columns and unparsable values become NaN, which never satisfies a range
+    return np.column_stack([
+        pd.to_numeric(meals_df[column], errors="coerce").to_numpy(dtype=float) if column in meals_df.columns
+        else np.full(len(meals_df), np.nan)
+        for column in columns
+    ]) if len(meals_df) else np.empty((0, len(columns)))
+
+
+class NutrientIndex:
+    """Each nutrition column of the catalog sorted, for range scans by binary search."""
+
+    def __init__(self, meals_df, columns=NUTRIENT_COLUMNS):
+        self.columns = list(columns)
+        self.index = meals_df.index
+        self.ids = self.index.to_numpy()
+        self.values = _numeric_matrix(meals_df, self.columns)
+        self.key = self.fingerprint(self.values)
+        self.version = None
+
+        # Positions in value order (NaN sorts last), the sorted values, and how many aren't NaN
+        self.order = np.argsort(self.values, axis=0, kind="stable")
+        self.sorted_values = np.take_along_axis(self.values, self.order, axis=0)
+        self.valid = (~np.isnan(self.values)).sum(axis=0)
+
+    @staticmethod
+    def fingerprint(values):
+        return values.shape, hash(values.tobytes())
+
+    def _span(self, column, low, high):
+        # Slice of the sorted column within [low, high]
+        j = self.columns.index(column)
+        sorted_column = self.sorted_values[:self.valid[j], j]
+        start = 0 if low is None else np.searchsorted(sorted_column, low, side="left")
+        stop = len(sorted_column) if high is None else np.searchsorted(sorted_column, high, side="right")
+        return j, start, max(start, stop)
+
+    def query(self, ranges):
+        """Return the ids (in catalog order) of the meals within every range."""
+        return self.ids[self.positions(ranges)]
+
+    def positions(self, ranges):
+        """Row positions (ascending) of the meals within every range."""
+        if not ranges:
+            return np.arange(len(self.ids))
+        spans = [(self._span(column, low, high), low, high) for column, low, high in ranges]
+
+        # Start from the range with the fewest meals, then mask the candidates by the rest
+        (j, start, stop), _, _ = min(spans, key=lambda span: span[0][2] - span[0][1])
+        candidates = self.order[start:stop, j]
+        for (k, _, _), low, high in spans:
+            if k == j or candidates.size == 0:
+                continue
+            values = self.values[candidates, k]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            candidates = candidates[keep]
+        return np.sort(candidates)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_nutrient_index(meals_df, version=None):
+    """
+    The index for this catalog, shared across sessions.
+
+    Parameters:
+    version: Identifies the catalog contents (see utils.meals.catalog_version). The index is rebuilt when it
+        changes; without one, the nutrition values themselves are compared, which costs about as much as a scan.
+    """
+    global _index
+    with _index_lock:
+        if _index is not None and _index.index.equals(meals_df.index):
+            if version is not None and _index.version == version:
+                return _index
+            if version is None and _index.key == NutrientIndex.fingerprint(
+                    _numeric_matrix(meals_df, NUTRIENT_COLUMNS)):
+                return _index
+        _index = NutrientIndex(meals_df)
+        _index.version = version
+        return _index
+
+
+def filter_nutrient_ranges(meals_df, ranges, index=None):
+    """Keep the meals within every (column, low, high) range, using the index when one is given."""
+    if not ranges:
+        return meals_df
+    if index is None:
+        return filter_ranges(meals_df, ranges)
+    if index.index.equals(meals_df.index):
+        # The frame the index was built from: take the rows by position
+        return meals_df.take(index.positions(ranges))
+    return meals_df.loc[meals_df.index.intersection(index.query(ranges), sort=False)]
+
+
+def nutrient_range_filters(container=None, key="nutrients", columns_per_row=4):
+    """
+    Draw a slider per nutrient and return the ranges the user narrowed, as a hashable tuple.
+
+    Parameters:
+    container: Where to draw the sliders (defaults to the main page; pass st.sidebar for the sidebar)
+    key (str): Widget key prefix, so pages can keep their own selections
+    """
+    import streamlit as st
+    container = container or st
+
+    ranges = []
+    names = list(NUTRIENT_FILTERS)
+    for row_start in range(0, len(names), columns_per_row):
+        row = names[row_start:row_start + columns_per_row]
+        cols = container.columns(columns_per_row) if columns_per_row > 1 else [container] * len(row)
+        for col, column in zip(cols, row):
+            label, maximum = NUTRIENT_FILTERS[column]
+            low, high = col.slider(label, 0, maximum, (0, maximum), key=f"{key}_{column}")
+            if low > 0 or high < maximum:
+                ranges.append((column, low or None, high if high < maximum else None))
+    return tuple(ranges)
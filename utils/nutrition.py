@@ -0,0 +1,147 @@
+# utils/nutrition.py
+"""
+Nutrition estimates from ingredient lists.
+
+Parsed ingredient lines (see utils/ingredients.py) are matched against the
+bundled food-composition table in data/food_composition.csv (values per
+100 g). Every line becomes a (food row, grams) pair, and the totals for a
+meal are one matrix product of the grams vector with the food-by-nutrient
+matrix. The table, the name lookup and each resolved line are cached, so a
+repeated estimate only parses and sums.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.ingredients import canonical_name, parse_ingredients
+
+FOOD_TABLE = "data/food_composition.csv"
+
+NUTRIENT_COLUMNS = ["protein", "carbs", "fat", "calories", "fiber", "sugar", "sodium", "cholesterol",
+                    "saturated_fat", "trans_fat"]
+MICRONUTRIENT_COLUMNS = ["fiber", "sugar", "sodium", "cholesterol", "saturated_fat", "trans_fat"]
+
+# Units that are a fixed mass
+GRAMS_PER_UNIT = {"g": 1.0, "kg": 1000.0, "oz": 28.35, "lb": 453.6}
+# Volume units, in cups (converted to grams with each food's grams_per_cup)
+CUPS_PER_UNIT = {"cup": 1.0, "tbsp": 1 / 16, "tsp": 1 / 48, "ml": 1 / 236.6, "l": 1000 / 236.6}
+# Count-like units without a food-specific weight
+DEFAULT_UNIT_GRAMS = {"can": 400.0, "scoop": 30.0, "slice": 30.0, "piece": 100.0, "clove": 3.0, "pinch": 0.4,
+                      "handful": 30.0, "bunch": 100.0, "stalk": 40.0, "package": 400.0}
+DEFAULT_GRAMS_PER_CUP = 240.0
+DEFAULT_GRAMS_PER_PIECE = 100.0
+
+
+class FoodTable:
+    """The food-composition table as arrays, plus a canonical-name -> row lookup."""
+
+    def __init__(self, foods_df):
+        self.names = foods_df["name"].tolist()
+        # Per gram, so totals are simply grams @ values
+        self.values = foods_df[NUTRIENT_COLUMNS].to_numpy(dtype=float) / 100.0
+        self.grams_per_cup = foods_df["grams_per_cup"].fillna(DEFAULT_GRAMS_PER_CUP).to_numpy(dtype=float)
+        self.grams_per_piece = foods_df["grams_per_piece"].to_numpy(dtype=float)
+
+        self.lookup = {}
+        for row, (name, aliases) in enumerate(zip(foods_df["name"], foods_df["aliases"].fillna(""))):
+            for alias in [name] + [a for a in aliases.split("|") if a]:
+                self.lookup.setdefault(canonical_name(alias), row)
+
+    def match(self, name):
+        """Row of the food best matching a canonical ingredient name, or -1."""
+        if name in self.lookup:
+            return self.lookup[name]
+        words = name.split()
+        # Try shorter phrases, longest first, preferring the end of the name ("red bell pepper" -> "bell pepper")
+        for length in range(len(words) - 1, 0, -1):
+            for start in range(len(words) - length, -1, -1):
+                phrase = " ".join(words[start:start + length])
+                if phrase in self.lookup:
+                    return self.lookup[phrase]
+        return -1
+
+    def grams(self, row, quantity, unit):
+        if quantity is None:
+            # "salt to taste", "oil for frying": not counted
+            return 0.0
+        if unit in GRAMS_PER_UNIT:
+            return quantity * GRAMS_PER_UNIT[unit]
+        if unit in CUPS_PER_UNIT:
+            return quantity * CUPS_PER_UNIT[unit] * self.grams_per_cup[row]
+        piece = self.grams_per_piece[row]
+        if unit in (None, "piece", "clove", "slice") and not np.isnan(piece):
+            return quantity * piece
+        return quantity * DEFAULT_UNIT_GRAMS.get(unit, DEFAULT_GRAMS_PER_PIECE)
+
+
+@lru_cache(maxsize=4)
+def load_food_table(path=FOOD_TABLE):
+    return FoodTable(pd.read_csv(path))
+
+
+@lru_cache(maxsize=8192)
+def _resolve(quantity, unit, name, path=FOOD_TABLE):
+    # Per-ingredient cache: the same line ("1 cup rice") resolves to the same food and grams every time
+    table = load_food_table(path)
+    row = table.match(name)
+    if row < 0:
+        return -1, 0.0
+    return row, float(table.grams(row, quantity, unit))
+
+
+def _resolve_lines(items, path=FOOD_TABLE):
+    return [_resolve(item["quantity"], item["unit"], item["name"], path) for item in items]
+
+
+def estimate_nutrition(ingredients, servings=1, path=FOOD_TABLE):
+    """
+    Estimate the nutrition of one recipe.
+
+    Parameters:
+    ingredients (str or list): Ingredient text (one per line) or the output of parse_ingredients()
+    servings (int): The totals are divided by this
+
+    Returns:
+    dict with "totals" (nutrient -> amount per serving), "matched" [(line, food, grams)] and "unmatched" [line]
+    """
+    items = parse_ingredients(ingredients) if isinstance(ingredients, str) else list(ingredients)
+    table = load_food_table(path)
+    resolved = _resolve_lines(items, path)
+
+    rows = np.array([row for row, _ in resolved], dtype=int)
+    grams = np.array([g for _, g in resolved], dtype=float)
+    found = rows >= 0
+    totals = grams[found] @ table.values[rows[found]] if found.any() else np.zeros(len(NUTRIENT_COLUMNS))
+    totals = totals / max(servings, 1)
+
+    return {
+        "totals": {column: round(float(value), 1) for column, value in zip(NUTRIENT_COLUMNS, totals)},
+        "matched": [(item["raw"], table.names[row], round(g, 1)) for item, (row, g) in zip(items, resolved)
+                    if row >= 0],
+        "unmatched": [item["raw"] for item, (row, _) in zip(items, resolved) if row < 0],
+    }
+
+
+def estimate_many(ingredient_texts, path=FOOD_TABLE):
+    """
+    Batch mode: estimate whole-recipe totals for many ingredient lists at once.
+
+    Returns a DataFrame with one row per input (same index) and a column per nutrient.
+    """
+    texts = pd.Series(ingredient_texts)
+    table = load_food_table(path)
+
+    meal_positions, rows, grams = [], [], []
+    for position, text in enumerate(texts):
+        for row, g in _resolve_lines(parse_ingredients(text), path):
+            if row >= 0:
+                meal_positions.append(position)
+                rows.append(row)
+                grams.append(g)
+
+    totals = np.zeros((len(texts), len(NUTRIENT_COLUMNS)))
+    if rows:
+        contributions = np.asarray(grams)[:, None] * table.values[np.asarray(rows)]
+        np.add.at(totals, np.asarray(meal_positions), contributions)
+    return pd.DataFrame(totals.round(1), index=texts.index, columns=NUTRIENT_COLUMNS)
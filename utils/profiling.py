@@ -0,0 +1,210 @@
+# utils/profiling.py
+"""
+Lightweight render-time profiling for the page scripts.
+
+Profiling is switched on with the LEO_PROFILE environment variable:
+
+    LEO_PROFILE=1 streamlit run Home.py
+
+When it is off, timer() hands back a shared no-op object and the page hooks
+return immediately, so the instrumentation costs one function call per phase.
+
+When it is on, every timed phase is recorded per page, summarised as
+p50/p95/p99 in a sidebar debug panel, and written to data/metrics.json
+(override with LEO_PROFILE_FILE) for scripts and dashboards to read.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+
+PROFILING_ENABLED = os.environ.get("LEO_PROFILE", "").lower() not in ("", "0", "false", "no")
+METRICS_FILE = os.environ.get("LEO_PROFILE_FILE", "data/metrics.json")
+
+# Only keep the most recent samples for each (page, phase) pair
+MAX_SAMPLES = 2000
+# Don't rewrite the metrics file more often than this (seconds)
+WRITE_INTERVAL = 5.0
+
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_lock = threading.Lock()
+_local = threading.local()
+_last_write = 0.0
+
+
+class _NullTimer:
+    """Stand-in used when profiling is off: does nothing as a context manager or decorator."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, func):
+        return func
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    def __init__(self, page, phase):
+        self.page = page
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.page, self.phase, time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.page, self.phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def timer(page, phase):
+    """
+    Time a phase of a page, as a context manager or a decorator.
+
+    Parameters:
+    page (str): Page the phase belongs to, e.g. "Home"
+    phase (str): Name of the phase, e.g. "load", "filter", "sort", "render"
+    """
+    if not PROFILING_ENABLED:
+        return _NULL_TIMER
+    return _Timer(page, phase)
+
+
+def fragment(page, name, **kwargs):
+    """
+    st.fragment (a part of a page that reruns on its own when its widgets are used), as a decorator.
+
+    A rerun of just the fragment doesn't run the page script, so start_page()/finish_page() don't see it.
+    With profiling on it is recorded as the phase "<name> rerun" of the page instead: the work per click
+    there, next to the page's "total" for full runs.
+
+    Parameters:
+    page (str): Page the fragment is on
+    name (str): Name of the fragment, e.g. "card"
+    kwargs: Passed on to st.fragment (e.g. run_every)
+    """
+    import streamlit as st
+
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **func_kwargs):
+            if not PROFILING_ENABLED or not _fragment_rerun():
+                return func(*args, **func_kwargs)
+            with _Timer(page, f"{name} rerun"):
+                return func(*args, **func_kwargs)
+
+        return st.fragment(wrapper, **kwargs)
+
+    return decorate
+
+
+def _fragment_rerun():
+    # Whether this run is a rerun of the fragment being called (not a full run, nor one of an outer fragment)
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run and ctx.current_fragment_id in ctx.fragment_ids_this_run)
+
+
+def record(page, phase, seconds):
+    with _lock:
+        _samples[(page, phase)].append(seconds)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def get_metrics():
+    """Summarise the recorded samples as {page: {phase: {count, mean_ms, p50_ms, p95_ms, p99_ms}}}."""
+    with _lock:
+        snapshot = {key: list(values) for key, values in _samples.items()}
+
+    metrics = defaultdict(dict)
+    for (page, phase), values in snapshot.items():
+        values.sort()
+        metrics[page][phase] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(_percentile(values, 50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 99) * 1000, 3),
+        }
+    return dict(metrics)
+
+
+def write_metrics(path=METRICS_FILE):
+    """Write the current metrics to a JSON file (atomically, so readers never see a partial file)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "pages": get_metrics()}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def reset_metrics():
+    with _lock:
+        _samples.clear()
+
+
+def start_page(page):
+    """Call at the top of a page script to time the whole run."""
+    if not PROFILING_ENABLED:
+        return
+    _local.page = page
+    _local.start = time.perf_counter()
+
+
+def finish_page():
+    """Call at the end of a page script: records the total, writes the metrics file and shows the debug panel."""
+    global _last_write
+    if not PROFILING_ENABLED or getattr(_local, "start", None) is None:
+        return
+
+    page = _local.page
+    record(page, "total", time.perf_counter() - _local.start)
+    _local.start = None
+
+    now = time.monotonic()
+    if now - _last_write >= WRITE_INTERVAL:
+        _last_write = now
+        try:
+            write_metrics()
+        except OSError:
+            pass
+
+    render_debug_panel(page)
+
+
+def render_debug_panel(page=None):
+    """Show the per-phase percentiles in a sidebar expander."""
+    import streamlit as st
+
+    metrics = get_metrics()
+    with st.sidebar.expander("⏱️ Render timings", expanded=False):
+        pages = [page] if page in metrics else sorted(metrics)
+        for name in pages:
+            st.markdown(f"**{name}**")
+            rows = [{"phase": phase, **stats} for phase, stats in sorted(metrics[name].items())]
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        st.caption(f"Written to `{METRICS_FILE}`")
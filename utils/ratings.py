@@ -0,0 +1,187 @@
+# utils/ratings.py
+"""
+Star ratings (1-5) of meals: one per user and meal, which they can change.
+
+Ratings are rows of the ratings table. Per-meal aggregates (count and sum of
+the ratings) live in meal_rating_stats and are updated in the same transaction
+as the rating itself: a new rating adds 1 and its stars, a changed one adds
+the difference. The aggregates are also kept in memory, so showing a meal's
+rating or sorting by rating never runs an aggregation query. The store's lock
+only covers that in-memory copy; the database write runs outside it, so a
+slow write doesn't hold up the pages reading ratings.
+
+"Top Rated" sorts by Bayesian average: every meal starts with PRIOR_WEIGHT
+ratings' worth of the site-wide average,
+
+    (PRIOR_WEIGHT * site average + sum) / (PRIOR_WEIGHT + count)
+
+so one 5-star rating doesn't put a meal above one with hundreds of 4.8s.
+Meals without ratings score the site average.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.db import get_db_connection
+
+MIN_RATING = 1
+MAX_RATING = 5
+PRIOR_WEIGHT = 5
+# Site average to start from while there are no ratings at all
+DEFAULT_AVERAGE = 3.5
+
+_tables_ready = False
+
+
+def init_rating_tables(conn):
+    # Only needs to run once per process
+    global _tables_ready
+    if _tables_ready:
+        return
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS ratings (
+        user_id INTEGER NOT NULL,
+        meal_id INTEGER NOT NULL,
+        rating INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (user_id, meal_id)
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS meal_rating_stats (
+        meal_id INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL,
+        total INTEGER NOT NULL
+    )
+    ''')
+    conn.commit()
+    _tables_ready = True
+
+
+class RatingStore:
+    """The per-meal rating aggregates, loaded once and kept up to date as ratings come in."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = None  # meal id -> [count, total]
+        self.count = 0  # over all meals
+        self.total = 0
+        self.arrays = None  # (Index of rated meal ids, counts, totals) for ranking, rebuilt after changes
+
+    def _load(self, conn=None):
+        # Caller holds the lock
+        if self.stats is not None:
+            return
+        own_conn = conn is None
+        conn = conn or get_db_connection()
+        init_rating_tables(conn)
+        rows = conn.execute("SELECT meal_id, count, total FROM meal_rating_stats").fetchall()
+        if own_conn:
+            conn.close()
+        self.stats = {meal_id: [count, total] for meal_id, count, total in rows}
+        self.count = sum(count for _, count, _ in rows)
+        self.total = sum(total for _, _, total in rows)
+
+    def rate(self, user_id, meal_id, rating, conn=None):
+        """
+        Store a user's rating of a meal (replacing their earlier one) and update the aggregates.
+
+        Returns:
+        The user's previous rating of the meal, or None
+
+        Raises:
+        ValueError: If the rating isn't a whole number of stars from MIN_RATING to MAX_RATING
+        """
+        if int(rating) != rating or not MIN_RATING <= rating <= MAX_RATING:
+            raise ValueError(f"Ratings are {MIN_RATING} to {MAX_RATING} stars")
+        rating, meal_id = int(rating), int(meal_id)
+        own_conn = conn is None
+        conn = conn or get_db_connection()
+        init_rating_tables(conn)
+        # Loaded before the write, so the aggregates in memory never already include it
+        with self.lock:
+            self._load(conn)
+        with conn:
+            # Take the write lock up front: the previous rating read is then the one this write replaces
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute("SELECT rating FROM ratings WHERE user_id = ? AND meal_id = ?",
+                                    (user_id, meal_id)).fetchone()
+            previous = previous[0] if previous else None
+            added = 0 if previous is not None else 1
+            change = rating - (previous or 0)
+            conn.execute("INSERT INTO ratings (user_id, meal_id, rating, updated_at) VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT (user_id, meal_id) DO UPDATE SET rating = excluded.rating, "
+                         "updated_at = excluded.updated_at", (user_id, meal_id, rating, time.time()))
+            conn.execute("INSERT INTO meal_rating_stats (meal_id, count, total) VALUES (?, ?, ?) "
+                         "ON CONFLICT (meal_id) DO UPDATE SET count = count + excluded.count, "
+                         "total = total + excluded.total", (meal_id, added, change))
+        if own_conn:
+            conn.close()
+        # Only the in-memory update holds the lock; changes are deltas, so concurrent ones add up in any order
+        with self.lock:
+            stats = self.stats.setdefault(meal_id, [0, 0])
+            stats[0] += added
+            stats[1] += change
+            self.count += added
+            self.total += change
+            self.arrays = None
+        return previous
+
+    def user_rating(self, user_id, meal_id, conn=None):
+        """A user's rating of a meal, or None."""
+        own_conn = conn is None
+        conn = conn or get_db_connection()
+        init_rating_tables(conn)
+        row = conn.execute("SELECT rating FROM ratings WHERE user_id = ? AND meal_id = ?",
+                           (user_id, int(meal_id))).fetchone()
+        if own_conn:
+            conn.close()
+        return row[0] if row else None
+
+    def site_average(self):
+        with self.lock:
+            self._load()
+            return self.total / self.count if self.count else DEFAULT_AVERAGE
+
+    def summary(self, meal_id):
+        """(average rating, number of ratings) of a meal; the average is None without ratings."""
+        with self.lock:
+            self._load()
+            count, total = self.stats.get(int(meal_id), (0, 0))
+        return (total / count if count else None), count
+
+    def bayesian_average(self, meal_id):
+        """A meal's rating pulled towards the site average by PRIOR_WEIGHT ratings (see the module docs)."""
+        average = self.site_average()
+        with self.lock:
+            count, total = self.stats.get(int(meal_id), (0, 0))
+        return (PRIOR_WEIGHT * average + total) / (PRIOR_WEIGHT + count)
+
+    def rank(self, meal_ids):
+        """Meal ids ordered by Bayesian average, best first; ties (e.g. unrated meals) keep the given order."""
+        meal_ids = np.asarray(meal_ids)
+        average = self.site_average()
+        with self.lock:
+            if self.arrays is None:
+                ids = np.fromiter(self.stats.keys(), dtype=np.int64, count=len(self.stats))
+                values = np.array(list(self.stats.values()), dtype=np.float64).reshape(-1, 2)
+                self.arrays = (pd.Index(ids), values[:, 0], values[:, 1])
+            index, counts, totals = self.arrays
+        if not len(index):
+            return meal_ids
+        positions = index.get_indexer(meal_ids)
+        rated = positions >= 0
+        scores = np.full(len(meal_ids), average)
+        scores[rated] = (PRIOR_WEIGHT * average + totals[positions[rated]]) / (PRIOR_WEIGHT + counts[positions[rated]])
+        return meal_ids[np.argsort(-scores, kind="stable")]
+
+
+_store = RatingStore()
+
+
+def get_rating_store():
+    """The process-wide rating store."""
+    return _store
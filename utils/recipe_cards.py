@@ -0,0 +1,335 @@
+# utils/recipe_cards.py
+"""
+Printable and shareable recipe cards: one compact image (PNG) or page (PDF)
+per meal with its photo, macros, ingredients and instructions.
+
+Cards are rendered with Pillow and cached on disk in CARDS_DIR as
+<key>-<version>.<format>, where the version is a hash of everything drawn on
+the card (and of the photo file's size and modification time), plus the most
+recent ones in memory. So:
+  - a repeated print or share of an unchanged meal is a cache hit,
+  - when meals change (a meal is shared, the catalog is rewritten, e.g. by
+    scripts/backfill_nutrition.py), refresh_meal_cards() queues their cards
+    for a background thread, which renders the new versions ahead of the
+    next print or share. A new meal gets its PNG card the same way.
+  - a card that isn't current yet is rendered on the spot (replacing the
+    meal's old version), so a card that no longer matches its meal is never
+    handed out.
+Cards still queued when the process exits are rendered before it does.
+
+card_for_meal() builds the card content of a catalog meal; the demo recipe
+on Recipe_Detail passes its own.
+"""
+import atexit
+import functools
+import glob
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from utils.meals import load_meal
+
+CARDS_DIR = "data/cards"
+CARD_FORMATS = {"png": "image/png", "pdf": "application/pdf"}
+MAX_CACHED = 64
+# Formats rendered ahead for a new meal (the card a share shows)
+PREWARM_FORMATS = ("png",)
+
+CARD_WIDTH = 1080
+PHOTO_HEIGHT = 560
+MARGIN = 48
+MAX_INGREDIENTS = 14
+MAX_STEPS = 10
+MAX_LINE_CHARS = 72
+# Height of the plain banner drawn instead of a photo
+BANNER_HEIGHT = 160
+STEP_NUMBER = re.compile(r"^\s*\d+[.)]\s*")
+
+BACKGROUND = "#fbead3"
+ACCENT = "#f9c0ab"
+GREEN = "#a8cd89"
+TEXT = "#2b2b2b"
+
+MACROS = [("protein", "Protein", "g"), ("carbs", "Carbs", "g"), ("fat", "Fat", "g"), ("calories", "Calories", "")]
+
+
+def card_for_meal(meal_id):
+    """The card content of a catalog meal, or None if there is no such meal."""
+    meal = load_meal(meal_id)
+    if meal is None:
+        return None
+
+    def lines(text):
+        return [line.strip() for line in str(text or "").split("\n") if line.strip()]
+
+    return {
+        "name": meal.get("meal_name") or "Untitled Meal",
+        "category": meal.get("meal_category") or "",
+        "image": meal.get("image_path") if isinstance(meal.get("image_path"), str) else None,
+        **{key: meal.get(key) for key, _, _ in MACROS},
+        "ingredients": lines(meal.get("ingredients")),
+        "instructions": lines(meal.get("instructions")),
+    }
+
+
+def card_version(card):
+    """Hash of what a card shows (its photo by size and modification time)."""
+    digest = hashlib.sha1(json.dumps(card, sort_keys=True, default=str).encode())
+    image = card.get("image")
+    if image and os.path.isfile(image):
+        stat = os.stat(image)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _font(size, bold=False):
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype("DejaVuSans-Bold.ttf" if bold else "DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _wrap(text, width=MAX_LINE_CHARS):
+    import textwrap
+    return textwrap.wrap(str(text), width) or [""]
+
+
+def _photo(path, width, height):
+    # The meal photo cropped to fill width x height, or None if there isn't a readable local one
+    from PIL import Image, ImageOps
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with Image.open(path) as image:
+            image.draft("RGB", (width, height))
+            return ImageOps.fit(ImageOps.exif_transpose(image).convert("RGB"), (width, height))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def render_card(card, fmt="png"):
+    """Draw a card and return it encoded as PNG or PDF bytes."""
+    from PIL import Image, ImageDraw
+
+    title_font, heading_font, body_font, small_font = _font(44, True), _font(28, True), _font(24), _font(20)
+    inner = CARD_WIDTH - 2 * MARGIN
+    title = _wrap(card["name"], 36)[:2]
+    ingredients = [line for item in card["ingredients"][:MAX_INGREDIENTS] for line in _wrap(f"• {item}")]
+    if len(card["ingredients"]) > MAX_INGREDIENTS:
+        ingredients.append(f"  … and {len(card['ingredients']) - MAX_INGREDIENTS} more")
+    # Steps are often numbered already ("1. Heat the oil")
+    steps = [line for n, step in enumerate(card["instructions"][:MAX_STEPS], 1)
+             for line in _wrap(f"{n}. {STEP_NUMBER.sub('', step)}")]
+    if len(card["instructions"]) > MAX_STEPS:
+        steps.append(f"  … {len(card['instructions']) - MAX_STEPS} more steps")
+
+    photo = _photo(card.get("image"), inner, PHOTO_HEIGHT)
+    top = PHOTO_HEIGHT if photo is not None else BANNER_HEIGHT
+    line_height = 34
+    height = (MARGIN + top + 32 + 56 * len(title) + 40 + 110 + 40
+              + (60 + line_height * len(ingredients)) + 24 + (60 + line_height * len(steps)) + 80)
+    image = Image.new("RGB", (CARD_WIDTH, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    y = MARGIN
+    if photo is not None:
+        image.paste(photo, (MARGIN, y))
+    else:
+        draw.rectangle((MARGIN, y, MARGIN + inner, y + BANNER_HEIGHT), fill=GREEN)
+        draw.text((CARD_WIDTH // 2, y + BANNER_HEIGHT // 2), "Leo's Kitchen", fill=TEXT, font=title_font, anchor="mm")
+    y += top + 32
+
+    for line in title:
+        draw.text((MARGIN, y), line, fill=TEXT, font=title_font)
+        y += 56
+    if card.get("category"):
+        draw.text((MARGIN, y), card["category"], fill=TEXT, font=small_font)
+    y += 40
+
+    # Macros as four boxes
+    box = (inner - 3 * 16) // 4
+    for n, (key, label, unit) in enumerate(MACROS):
+        x = MARGIN + n * (box + 16)
+        draw.rounded_rectangle((x, y, x + box, y + 96), radius=16, fill=ACCENT)
+        value = card.get(key)
+        value = "–" if value is None or value != value else f"{float(value):g}{unit}"
+        draw.text((x + box // 2, y + 36), value, fill=TEXT, font=heading_font, anchor="mm")
+        draw.text((x + box // 2, y + 74), label, fill=TEXT, font=small_font, anchor="mm")
+    y += 110 + 40
+
+    for heading, lines in (("Ingredients", ingredients), ("Instructions", steps)):
+        draw.text((MARGIN, y), heading, fill=TEXT, font=heading_font)
+        y += 60
+        for line in lines or ["–"]:
+            draw.text((MARGIN, y), line, fill=TEXT, font=body_font)
+            y += line_height
+        y += 24
+
+    draw.text((CARD_WIDTH - MARGIN, height - MARGIN), "Leo's Kitchen", fill=TEXT, font=small_font, anchor="rs")
+
+    buffer = io.BytesIO()
+    if fmt == "pdf":
+        image.save(buffer, format="PDF", resolution=150)
+    else:
+        image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class CardCache:
+    """
+    Rendered cards on disk (and the latest few in memory), keyed by the version of their content, re-rendered
+    by a background thread when their content changes.
+    """
+
+    def __init__(self, directory=CARDS_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()  # (key, version, fmt) -> bytes
+        self.pending = set()  # (key, fmt) queued for the background thread
+        self.queue = queue.Queue()
+        self.thread = None
+        self.counters = {"hits": 0, "renders": 0, "background_renders": 0}
+
+    def _path(self, key, version, fmt):
+        return os.path.join(self.directory, f"{key}-{version}.{fmt}")
+
+    def _remember(self, entry, data):
+        # Caller holds the lock
+        self.memory[entry] = data
+        self.memory.move_to_end(entry)
+        while len(self.memory) > MAX_CACHED:
+            self.memory.popitem(last=False)
+
+    def _store(self, key, version, fmt, data):
+        # Write the new card, then remove the key's older versions
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key, version, fmt)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        for old in glob.glob(os.path.join(self.directory, f"{glob.escape(key)}-*.{fmt}")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        with self.lock:
+            for entry in [entry for entry in self.memory if entry[0] == key and entry[2] == fmt]:
+                del self.memory[entry]
+            self._remember((key, version, fmt), data)
+
+    def get(self, key, card, fmt="png"):
+        """A card's bytes: cached if current, else rendered now."""
+        version = card_version(card)
+        entry = (key, version, fmt)
+        with self.lock:
+            data = self.memory.get(entry)
+            if data is not None:
+                self.memory.move_to_end(entry)
+                self.counters["hits"] += 1
+                return data
+
+        path = self._path(key, version, fmt)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            with self.lock:
+                self._remember(entry, data)
+                self.counters["hits"] += 1
+            return data
+
+        data = render_card(card, fmt)
+        self._store(key, version, fmt, data)
+        with self.lock:
+            self.counters["renders"] += 1
+        return data
+
+
+    def formats_on_disk(self, prefix):
+        """{key: set of formats} of the cards on disk whose key starts with prefix."""
+        found = {}
+        for fmt in CARD_FORMATS:
+            for path in glob.glob(os.path.join(self.directory, f"{glob.escape(prefix)}*.{fmt}")):
+                key = os.path.basename(path)[:-len(fmt) - 1].rsplit("-", 1)[0]
+                found.setdefault(key, set()).add(fmt)
+        return found
+
+    def render_later(self, key, load_card, fmt="png"):
+        """Queue a card for the background thread; load_card() returns its content then (None: skip it)."""
+        with self.lock:
+            if (key, fmt) in self.pending:
+                return
+            self.pending.add((key, fmt))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="card-renderer", daemon=True)
+                self.thread.start()
+                atexit.register(self.wait)
+        self.queue.put((key, load_card, fmt))
+
+    def _run(self):
+        while True:
+            key, load_card, fmt = self.queue.get()
+            try:
+                # The content is read now, so a meal queued twice is rendered once, as it is by then
+                with self.lock:
+                    self.pending.discard((key, fmt))
+                card = load_card()
+                if card is not None:
+                    version = card_version(card)
+                    if not os.path.exists(self._path(key, version, fmt)):
+                        self._store(key, version, fmt, render_card(card, fmt))
+                        with self.lock:
+                            self.counters["background_renders"] += 1
+            except Exception:
+                pass
+            finally:
+                self.queue.task_done()
+
+    def wait(self, timeout=None):
+        """Wait until the queued cards are rendered (or timeout seconds); True if none are left."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+_cache = CardCache()
+
+
+def get_card_cache():
+    """The process-wide card cache."""
+    return _cache
+
+
+def meal_card(meal_id, fmt="png"):
+    """The card of a catalog meal as bytes, or None if there is no such meal."""
+    card = card_for_meal(meal_id)
+    return None if card is None else _cache.get(f"meal-{int(meal_id)}", card, fmt)
+
+
+def refresh_meal_cards(meal_ids=None):
+    """
+    Queue catalog meals' cards for re-rendering in the background, after the meals were added or changed.
+
+    Parameters:
+    meal_ids (list): The meals that changed: each is rendered in the formats it has cards in (PREWARM_FORMATS if
+        none yet). None: every meal with a card on disk, e.g. after the whole catalog was rewritten.
+    """
+    on_disk = _cache.formats_on_disk("meal-")
+    if meal_ids is None:
+        targets = [(int(key[len("meal-"):]), formats) for key, formats in on_disk.items()
+                   if key[len("meal-"):].isdigit()]
+    else:
+        targets = [(int(meal_id), on_disk.get(f"meal-{int(meal_id)}", PREWARM_FORMATS)) for meal_id in meal_ids]
+    for meal_id, formats in targets:
+        for fmt in formats:
+            _cache.render_later(f"meal-{meal_id}", functools.partial(card_for_meal, meal_id), fmt)
@@ -0,0 +1,206 @@
+# utils/recommendations.py
+"""
+The "For You" ranking: meals ordered by how well they match what a user has
+shared, saved and liked.
+
+Every meal gets a feature vector of three blocks, each scaled to unit length:
+  - its category (one-hot),
+  - its tags (hashed into TAG_BUCKETS buckets),
+  - its macro profile (share of calories from protein, carbs and fat, and how
+    big a meal it is).
+A user's vector is the weighted sum of the vectors of the meals they
+interacted with (INTERACTION_WEIGHTS), again scaled per block, so a meal's
+score is the sum of three cosine similarities. Scoring all candidates is one
+matrix-vector product.
+
+The feature matrix is built once per catalog, and extended when meals are
+appended: when the catalog grew and its earlier meals still have the values
+the matrix was built from. Anything else (e.g. the backfill script changing
+macros in place) rebuilds it. User vectors are kept between reruns and only take in interactions
+newer than the last one seen (see utils/interactions.py), and each user's
+top TOP_N per feed is cached until they interact again or the catalog changes.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.interactions import get_user_interactions
+from utils.meals import MEAL_CATEGORIES
+
+TAG_BUCKETS = 64
+TOP_N = 48
+MAX_PROFILES = 5000
+INTERACTION_WEIGHTS = {"share": 3.0, "save": 2.0, "like": 1.0, "view": 0.2}
+# The catalog columns the features are computed from
+FEATURE_COLUMNS = ["meal_category", "meal_tags", "protein", "carbs", "fat", "calories"]
+
+# Column ranges of the feature blocks
+_CATEGORY = slice(0, len(MEAL_CATEGORIES))
+_TAGS = slice(_CATEGORY.stop, _CATEGORY.stop + TAG_BUCKETS)
+_MACROS = slice(_TAGS.stop, _TAGS.stop + 4)
+BLOCKS = (_CATEGORY, _TAGS, _MACROS)
+N_FEATURES = _MACROS.stop
+
+
+def _normalize_blocks(matrix):
+    # Scale each block of each row to unit length (all-zero blocks stay zero)
+    for block in BLOCKS:
+        norms = np.linalg.norm(matrix[..., block], axis=-1, keepdims=True)
+        matrix[..., block] /= np.where(norms > 0, norms, 1)
+    return matrix
+
+
+def _tag_bucket(tag):
+    # A stable hash (Python's str hash changes between processes)
+    return zlib.crc32(tag.encode()) % TAG_BUCKETS
+
+
+def meal_features(meals_df):
+    """Feature matrix (float32, one row per meal in frame order) of a catalog frame with the card columns."""
+    n = len(meals_df)
+    matrix = np.zeros((n, N_FEATURES), dtype=np.float32)
+    if not n:
+        return matrix
+
+    categories = pd.Categorical(meals_df["meal_category"], categories=MEAL_CATEGORIES).codes
+    has_category = categories >= 0
+    matrix[np.flatnonzero(has_category), _CATEGORY.start + categories[has_category]] = 1
+
+    tags = meals_df["meal_tags"].astype("string").str.lower().str.split(",").explode().str.strip()
+    tags = tags[tags.notna() & (tags != "")]
+    if len(tags):
+        positions = meals_df.index.get_indexer(tags.index)
+        buckets = pd.Series(tags.unique()).map(_tag_bucket)
+        buckets.index = tags.unique()
+        np.add.at(matrix, (positions, _TAGS.start + buckets[tags.to_numpy()].to_numpy()), 1)
+
+    def numeric(column):
+        return pd.to_numeric(meals_df[column], errors="coerce").fillna(0).clip(lower=0).to_numpy(dtype=np.float32)
+
+    energy = np.column_stack([numeric("protein") * 4, numeric("carbs") * 4, numeric("fat") * 9])
+    total = energy.sum(axis=1, keepdims=True)
+    matrix[:, _MACROS.start:_MACROS.start + 3] = energy / np.where(total > 0, total, 1)
+    matrix[:, _MACROS.start + 3] = np.minimum(numeric("calories") / 800, 2)
+    return _normalize_blocks(matrix)
+
+
+class UserProfile:
+    """A user's summed feature vector, the meals they've interacted with, and their cached rankings."""
+
+    def __init__(self):
+        self.sums = np.zeros(N_FEATURES, dtype=np.float32)
+        self.last_id = 0
+        self.seen = set()
+        self.pending = []  # (meal_id, weight) for meals not in the feature matrix yet
+        self.top = {}  # feed key -> ids of the best TOP_N candidates
+
+    def vector(self):
+        return _normalize_blocks(self.sums.copy())
+
+
+class Recommender:
+    """Meal features for the catalog plus the profiles of recently active users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = pd.RangeIndex(0)
+        self.matrix = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.values = pd.DataFrame(columns=FEATURE_COLUMNS)  # what the matrix rows were computed from
+        self.version = None
+        self.profiles = OrderedDict()
+
+    def sync(self, meals_df, version):
+        """Bring the features up to date with the catalog frame (version: e.g. FeedStore.version)."""
+        with self.lock:
+            if version is not None and version == self.version:
+                return
+            known = len(self.index)
+            if known <= len(meals_df) and meals_df.index[:known].equals(self.index) \
+                    and self._unchanged(meals_df.iloc[:known]):
+                # Appended meals: just add their rows
+                self.matrix = np.vstack([self.matrix, meal_features(meals_df.iloc[known:])])
+                for profile in self.profiles.values():
+                    profile.top.clear()
+            else:
+                self.matrix = meal_features(meals_df)
+                # Summed vectors refer to the old rows; profiles are rebuilt from the database as needed
+                self.profiles.clear()
+            self.index = meals_df.index
+            self.values = meals_df[FEATURE_COLUMNS]
+            self.version = version
+
+    def _unchanged(self, meals_df):
+        # Whether these rows still have the values the matrix was built from (the dtypes may have changed
+        # when a meal was appended, e.g. int to float for a meal without calories)
+        if meals_df is self.values or not len(meals_df):
+            return True
+        try:
+            return meals_df[FEATURE_COLUMNS].astype(self.values.dtypes.to_dict()).equals(self.values)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def _profile(self, user_id):
+        # Get a user's profile, taking in interactions since it was last updated
+        profile = self.profiles.pop(user_id, None) or UserProfile()
+        self.profiles[user_id] = profile
+        while len(self.profiles) > MAX_PROFILES:
+            self.profiles.popitem(last=False)
+
+        rows = get_user_interactions(user_id, profile.last_id)
+        new = [(meal_id, INTERACTION_WEIGHTS.get(kind, 0.0)) for _, meal_id, kind in rows]
+        if rows:
+            profile.last_id = rows[-1][0]
+            profile.seen.update(meal_id for _, meal_id, kind in rows if kind != "view")
+        pending = profile.pending + new
+        if pending:
+            positions = self.index.get_indexer([meal_id for meal_id, _ in pending])
+            weights = np.array([weight for _, weight in pending], dtype=np.float32)
+            found = positions >= 0
+            profile.sums += weights[found] @ self.matrix[positions[found]]
+            profile.pending = [item for item, ok in zip(pending, found) if not ok]
+            profile.top.clear()
+        return profile
+
+    def rank(self, user_id, candidate_ids, key=None):
+        """
+        Order candidate meal ids for a user: their best TOP_N matches first, then the rest in the given order.
+
+        Parameters:
+        candidate_ids (array): Meal ids in their default order (e.g. a feed snapshot's ids)
+        key: Identifies the candidate set (e.g. the feed's category), to cache the top matches under; None skips
+            the cache (e.g. search results)
+
+        Returns:
+        Array of meal ids, or None if the user hasn't interacted with any meals yet
+        """
+        with self.lock:
+            profile = self._profile(user_id)
+            if not profile.sums.any():
+                return None
+            top = profile.top.get(key) if key is not None else None
+            if top is None:
+                candidate_ids = np.asarray(candidate_ids)
+                positions = self.index.get_indexer(candidate_ids)
+                usable = (positions >= 0) & ~np.isin(candidate_ids, list(profile.seen))
+                scores = self.matrix[positions[usable]] @ profile.vector()
+                n = min(TOP_N, len(scores))
+                best = np.argpartition(-scores, n - 1)[:n] if n else np.array([], dtype=int)
+                # Highest score first; ties keep the candidates' own order
+                best = best[np.lexsort((best, -scores[best]))]
+                top = candidate_ids[usable][best]
+                if key is not None:
+                    profile.top[key] = top
+        candidate_ids = np.asarray(candidate_ids)
+        return np.concatenate([top, candidate_ids[~np.isin(candidate_ids, top)]])
+
+
+_recommender = Recommender()
+
+
+def get_recommender(meals_df, version=None):
+    """The process-wide recommender, synced with the catalog frame."""
+    _recommender.sync(meals_df, version)
+    return _recommender
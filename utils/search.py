@@ -0,0 +1,243 @@
+# utils/search.py
+"""
+Prefix search for the Home feed, with per-session refinement: a prefix index
+over meal names, tags, descriptions and ingredients.
+
+Every word of a meal's name, tags and description, and of its parsed
+ingredient names (see utils/ingredients.py), goes into a trie with the meal
+ids under each word. A query matches the meals that have, for each of its
+words, a word starting with it: "chick ric" finds "Chicken Fried Rice". So a
+query is a walk down the trie rather than a substring scan over the catalog.
+
+The search box is a plain st.text_input, which sends its text on Enter or
+when it loses focus, not on every keystroke; each submitted query is one
+search. Each session keeps the state of its last search (prefix_search):
+  - the same query again (e.g. a rerun from changing the sort) reuses its
+    results,
+  - a query that extends the last one ("chi" -> "chicken", "chicken" ->
+    "chicken r") is refined from the last query's matches: only those meals'
+    words are checked against the new text,
+  - anything else is looked up in the trie.
+Queries shorter than MIN_QUERY_CHARS aren't run at all; one letter matches
+most of the catalog.
+
+When nothing matches, the words of the query that match no meal are swapped
+for the closest words in the index (difflib) as "did you mean" suggestions.
+
+The catalog is append-only, so the index is kept up to date by adding the
+meals above the last meal id indexed (and the ingredient rows added since the
+last refresh), like the ingredient index.
+"""
+import difflib
+import re
+import threading
+from collections import OrderedDict
+
+from utils.db import get_db_connection
+from utils.ingredients import init_ingredient_table, parse_ingredients, singular
+
+MIN_QUERY_CHARS = 2
+# Recent prefix lookups shared by all sessions (many people type the same first letters)
+MAX_CACHED_PREFIXES = 256
+# Refining more matches than this goes through the trie instead of checking each meal's words
+REFINE_SCAN_MAX = 500
+MAX_SUGGESTIONS = 3
+# How close a word has to be to count as a typo of a query word (difflib ratio)
+SUGGESTION_CUTOFF = 0.75
+INDEXED_COLUMNS = ["meal_name", "meal_tags", "meal_description"]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def query_words(text):
+    """The lowercase words of a query or of indexed text."""
+    return _WORD_RE.findall(str(text).lower()) if isinstance(text, str) else []
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = None  # meal ids of the word ending here
+
+
+class PrefixIndex:
+    """A trie of the words of meal names, tags, descriptions and ingredients, with the meal ids of each word."""
+
+    def __init__(self):
+        self.root = _Node()
+        self.words = {}  # meal id -> set of its words, to refine a set of matches
+        # High-water marks, kept apart: ingredient rows can name meals whose catalog row hasn't been indexed yet
+        self.max_meal_id = -1  # last catalog meal whose name and tags are indexed
+        self.last_rowid = 0  # last meal_ingredients row indexed
+        # Bumped whenever words are added: earlier results may be missing the new meals
+        self.version = 0
+        self.prefixes = OrderedDict()  # prefix -> frozenset of meal ids, for this version
+        self.vocabulary = None  # sorted list of all words, for suggestions; rebuilt after changes
+        self.lock = threading.Lock()
+
+    def add(self, meal_id, text):
+        """Index the words of some text of a meal. Caller holds the lock."""
+        meal_words = self.words.setdefault(meal_id, set())
+        added = False
+        for word in query_words(text):
+            for form in {word, singular(word)}:
+                if form in meal_words:
+                    continue
+                meal_words.add(form)
+                added = True
+                node = self.root
+                for char in form:
+                    node = node.children.setdefault(char, _Node())
+                if node.ids is None:
+                    node.ids = set()
+                node.ids.add(meal_id)
+        if added:
+            self.version += 1
+            self.prefixes.clear()
+            self.vocabulary = None
+
+    def add_meals(self, meals_df):
+        """Index the names, tags and descriptions of meals (and ingredients, if the frame has them); caller locks."""
+        columns = [column for column in INDEXED_COLUMNS if column in meals_df.columns]
+        for meal_id, values in zip(meals_df.index, meals_df[columns].itertuples(index=False)):
+            self.add(int(meal_id), " ".join(value for value in values if isinstance(value, str)))
+        if len(meals_df):
+            self.max_meal_id = max(self.max_meal_id, int(meals_df.index.max()))
+        if "ingredients" in meals_df.columns:
+            for meal_id, text in meals_df["ingredients"].items():
+                self.add(int(meal_id), " ".join(item["name"] for item in parse_ingredients(text)))
+
+    def refresh(self, meals_df, conn):
+        """Add catalog meals above the last one indexed, and ingredient rows stored since the last refresh."""
+        if len(meals_df) and meals_df.index.max() > self.max_meal_id:
+            self.add_meals(meals_df[meals_df.index > self.max_meal_id])
+        rows = conn.execute("SELECT rowid, meal_id, name FROM meal_ingredients WHERE rowid > ? ORDER BY rowid",
+                            (self.last_rowid,)).fetchall()
+        for rowid, meal_id, name in rows:
+            self.add(meal_id, name)
+            self.last_rowid = rowid
+
+    def prefix_ids(self, prefix):
+        """Meal ids with a word starting with prefix."""
+        with self.lock:
+            ids = self.prefixes.get(prefix)
+            if ids is not None:
+                self.prefixes.move_to_end(prefix)
+                return ids
+            node = self.root
+            for char in prefix:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            ids = set()
+            stack = [node] if node is not None else []
+            while stack:
+                node = stack.pop()
+                if node.ids:
+                    ids |= node.ids
+                stack.extend(node.children.values())
+            ids = frozenset(ids)
+            self.prefixes[prefix] = ids
+            while len(self.prefixes) > MAX_CACHED_PREFIXES:
+                self.prefixes.popitem(last=False)
+            return ids
+
+    def word_ids(self, word):
+        """Meal ids with a word starting with word (or with its singular: "eggs" finds the ingredient "egg")."""
+        ids = self.prefix_ids(word)
+        base = singular(word)
+        return ids if base == word else ids | self.prefix_ids(base)
+
+    def match(self, words):
+        """Meal ids with a word starting with each of the words."""
+        result = None
+        for word in words:
+            ids = self.word_ids(word)
+            result = set(ids) if result is None else result & ids
+            if not result:
+                return set()
+        return result or set()
+
+    def refine(self, meal_ids, words):
+        """The meals among meal_ids that still match after the query gained (or extended) the given words."""
+        if len(meal_ids) > REFINE_SCAN_MAX:
+            # Still many matches: the (cached) trie lookup of the new words is cheaper than checking them all
+            result = set(meal_ids)
+            for word in words:
+                result &= self.word_ids(word)
+            return result
+        forms = [(word, singular(word)) for word in words]
+        with self.lock:
+            return {meal_id for meal_id in meal_ids
+                    if all(any(meal_word.startswith(form) for meal_word in self.words.get(meal_id, ()))
+                           for form in forms)}
+
+    def suggest(self, words):
+        """Queries with each word that matches no meal replaced by the closest indexed words (best first)."""
+        with self.lock:
+            if self.vocabulary is None:
+                self.vocabulary = sorted(set().union(*self.words.values()))
+            vocabulary = self.vocabulary
+        fixes = {}
+        for word in words:
+            if not self.word_ids(word):
+                fixes[word] = difflib.get_close_matches(word, vocabulary, n=MAX_SUGGESTIONS, cutoff=SUGGESTION_CUTOFF)
+        if not fixes or not all(fixes.values()):
+            return []
+        suggestions = (" ".join(fixes[word][min(n, len(fixes[word]) - 1)] if word in fixes else word for word in words)
+                       for n in range(max(len(close) for close in fixes.values())))
+        return list(dict.fromkeys(suggestions))
+
+
+_index = PrefixIndex()
+
+
+def get_prefix_index(meals_df, conn=None):
+    """
+    Return the process-wide prefix index, brought up to date with the catalog and the ingredient table.
+
+    Parameters:
+    meals_df (DataFrame): The catalog (card columns are enough: ingredients come from the ingredient table)
+    """
+    own_conn = conn is None
+    conn = conn or get_db_connection()
+    init_ingredient_table(conn)
+    with _index.lock:
+        _index.refresh(meals_df, conn)
+    if own_conn:
+        conn.close()
+    return _index
+
+
+def prefix_search(index, query, previous=None):
+    """
+    Search meals by word prefixes, reusing the last search of the session where possible.
+
+    Parameters:
+    index (PrefixIndex): See get_prefix_index
+    query (str): The search box text
+    previous (dict): The state this returned for the session's last search, or None
+
+    Returns:
+    (set of meal ids, state to pass as previous next time); state["suggestions"] holds "did you mean"
+    queries when nothing matched
+    """
+    words = query_words(query)
+    if previous is not None and previous["version"] == index.version:
+        if words == previous["words"]:
+            return previous["ids"], previous
+        old = previous["words"]
+        # "chi" -> "chick", "chicken" -> "chicken ric": the last word was extended, or words were added
+        extends = bool(old) and len(words) >= len(old) and words[:len(old) - 1] == old[:-1] \
+            and words[len(old) - 1].startswith(old[-1])
+        if extends:
+            ids = index.refine(previous["ids"], words[len(old) - 1:])
+        else:
+            ids = index.match(words)
+    else:
+        ids = index.match(words)
+    state = {"words": words, "ids": ids, "version": index.version,
+             "suggestions": index.suggest(words) if not ids else []}
+    return ids, state
@@ -0,0 +1,209 @@
+# utils/session_budget.py
+"""
+Per-session memory budget for st.session_state.
+
+The app shell (utils/sidebar.py) calls resume_session() at the start of
+every page run and manage_session_state() at the end. They:
+  - cap histories (HISTORY_LIMITS, e.g. the chat messages),
+  - measure the session's state, and when it is over SESSION_BUDGET_BYTES
+    drop the keys the pages can rebuild (REBUILDABLE_KEYS), largest first,
+  - evict idle sessions: a session that hasn't run for IDLE_SECONDS is marked
+    idle, and its rebuildable keys are dropped at the start of its next run.
+Each session only ever trims its own state, from its own run: another
+session's state belongs to that session's script thread.
+
+Pages keep meal ids in session state rather than rows or feed cards, and load
+what they draw from the catalog, so most sessions stay small anyway.
+
+session_memory_report() sums the state by key across the sessions that
+aren't idle, from the sizes each measured at the end of its last run. With
+LEO_PROFILE on (see utils/profiling.py) it is shown in the sidebar and written
+to data/session_memory.json next to the render metrics.
+"""
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from utils.profiling import PROFILING_ENABLED
+
+SESSION_BUDGET_BYTES = int(float(os.environ.get("LEO_SESSION_BUDGET_MB", "2")) * 1024 * 1024)
+# Sessions that haven't run for this long are idle: out of the report, rebuildable state dropped when they're back
+IDLE_SECONDS = 15 * 60
+# Idle sessions are forgotten after this long (Streamlit has long dropped them by then)
+FORGET_SECONDS = 24 * 3600
+# Don't rewrite the report file more often than this (seconds)
+REPORT_INTERVAL = 60.0
+REPORT_FILE = os.environ.get("LEO_SESSION_REPORT_FILE", "data/session_memory.json")
+
+# key -> most items kept (newest last)
+HISTORY_LIMITS = {"messages": 50}
+# Keys a page recomputes (or the user redoes with one click) when they're missing
+REBUILDABLE_KEYS = ["meal_plans", "meal_image", "search_state"]
+
+_sessions = {}  # session id -> [bytes per key at the end of its last run, when it last ran, idle]
+_lock = threading.Lock()
+_last_write = 0.0
+
+
+def deep_sizeof(value, _seen=None, _depth=0):
+    """Approximate bytes held by a value, following containers (pandas and NumPy objects report their own)."""
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen or _depth > 20:
+        return 0
+    _seen.add(id(value))
+
+    # Every page runs this, so pandas and NumPy aren't imported for it: a value can only be one if they are loaded
+    pd, np = sys.modules.get("pandas"), sys.modules.get("numpy")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if pd is not None and isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if np is not None and isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, io.BytesIO):
+        # Includes uploaded files (st.file_uploader values)
+        return sys.getsizeof(value) + value.getbuffer().nbytes
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, _seen, _depth + 1) + deep_sizeof(v, _seen, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, _seen, _depth + 1) for item in value)
+    return size
+
+
+def state_sizes(state):
+    """Bytes per key of a session's state (a dict, e.g. st.session_state.to_dict())."""
+    return {str(key): deep_sizeof(value) for key, value in state.items()}
+
+
+def _trim(state, history_limits, drop_keys):
+    # state is this session's st.session_state
+    for key, limit in history_limits.items():
+        if key in state and len(state[key]) > limit:
+            state[key] = list(state[key])[-limit:]
+    for key in drop_keys:
+        if key in state:
+            del state[key]
+
+
+def resume_session():
+    """Start of a run: if this session was idle, drop its rebuildable state before the page uses it."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    now = time.time()
+    with _lock:
+        entry = _sessions.get(ctx.session_id)
+        # No entry: the session's first run, or it was idle long enough to be forgotten
+        idle = entry is None or entry[2] or now - entry[1] > IDLE_SECONDS
+        _sessions[ctx.session_id] = [entry[0] if entry else {}, now, False]
+    if idle:
+        _trim(st.session_state, {}, REBUILDABLE_KEYS)
+
+
+def manage_session_state():
+    """Cap this session's histories, keep its state within the budget and record its size for the report."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    state = st.session_state
+    _trim(state, HISTORY_LIMITS, [])
+    sizes = state_sizes(state.to_dict())
+    total = sum(sizes.values())
+    if total > SESSION_BUDGET_BYTES:
+        over = total - SESSION_BUDGET_BYTES
+        drop = []
+        for key in sorted((k for k in REBUILDABLE_KEYS if k in sizes), key=sizes.get, reverse=True):
+            if over <= 0:
+                break
+            drop.append(key)
+            over -= sizes[key]
+        _trim(state, {}, drop)
+        for key in drop:
+            del sizes[key]
+
+    now = time.time()
+    with _lock:
+        _sessions[ctx.session_id] = [sizes, now, False]
+    mark_idle_sessions(now)
+
+    if PROFILING_ENABLED:
+        _write_report()
+        render_session_report()
+
+
+def mark_idle_sessions(now=None):
+    """Mark the sessions that haven't run for IDLE_SECONDS idle, and forget them after FORGET_SECONDS."""
+    now = time.time() if now is None else now
+    with _lock:
+        for session_id, entry in list(_sessions.items()):
+            if now - entry[1] > FORGET_SECONDS:
+                del _sessions[session_id]
+            elif now - entry[1] > IDLE_SECONDS:
+                entry[2] = True
+
+
+def session_memory_report():
+    """
+    Memory by key across the sessions that aren't idle (as of the end of their last run).
+
+    Returns:
+    dict with "sessions" (count), "total_bytes", "keys" [{key, sessions, total_bytes, max_bytes}] (largest first)
+    and "largest_sessions" [{session, total_bytes}] (top 10)
+    """
+    mark_idle_sessions()
+    with _lock:
+        sessions = [(session_id, sizes) for session_id, (sizes, _, idle) in _sessions.items() if not idle]
+
+    by_key, totals = {}, []
+    for session_id, sizes in sessions:
+        totals.append({"session": session_id[:8], "total_bytes": sum(sizes.values())})
+        for key, size in sizes.items():
+            entry = by_key.setdefault(key, {"key": key, "sessions": 0, "total_bytes": 0, "max_bytes": 0})
+            entry["sessions"] += 1
+            entry["total_bytes"] += size
+            entry["max_bytes"] = max(entry["max_bytes"], size)
+
+    return {
+        "sessions": len(totals),
+        "total_bytes": sum(t["total_bytes"] for t in totals),
+        "keys": sorted(by_key.values(), key=lambda entry: entry["total_bytes"], reverse=True),
+        "largest_sessions": sorted(totals, key=lambda t: t["total_bytes"], reverse=True)[:10],
+    }
+
+
+def _write_report(path=REPORT_FILE):
+    global _last_write
+    now = time.monotonic()
+    if now - _last_write < REPORT_INTERVAL:
+        return
+    _last_write = now
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(session_memory_report(), f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def render_session_report():
+    """Show the memory-by-key report in a sidebar expander."""
+    import streamlit as st
+
+    report = session_memory_report()
+    with st.sidebar.expander("🧠 Session memory", expanded=False):
+        st.caption(f"{report['sessions']} sessions • {report['total_bytes'] / 1024:.1f} KB in session state • "
+                   f"budget {SESSION_BUDGET_BYTES / 1024 / 1024:.1f} MB per session")
+        st.dataframe(report["keys"], hide_index=True, use_container_width=True)
@@ -1,43 +1,138 @@
 # utils/sidebar.py
+"""
+The app shell: everything around the page content that is the same on every
+page, set up by Home.py (the entrypoint, `streamlit run Home.py`):
+  - page config and logo,
+  - the session's auth state (SESSION_DEFAULTS), filled in once per session,
+  - the navigation (st.navigation over PAGES) and the account links below it,
+  - the per-run page hooks (profiling, page views, the session state budget
+    and idle-session eviction).
+
+The pages in pages/ only draw their own content. The st.Page objects are
+built once per session and kept in session state; the page paths are
+resolved once per process.
+
+AppTest can't run st.navigation, so scripts that drive the pages headlessly
+(bench_startup, load_test) use page_test(): an AppTest of a small script that
+calls run_page(), which sets up the same shell around one page without
+st.navigation.
+"""
+import functools
+import os
+import types
+
 import streamlit as st
 
-def create_sidebar_navigation(active_page=None):
-    """
-    Creates consistent sidebar navigation across all pages
-    
-    Parameters:
-    active_page (str): The current active page to highlight (optional)
-    """
-    st.sidebar.title("Navigation")
-    
-    # Define all navigation items with their paths and labels
-    nav_items = [
-        {"path": "Home.py", "label": "🏠 Home", "icon": "🏠"},
-        {"path": "pages/About_Leo's_Kitchen.py", "label": "ℹ️ About Me"},
-        {"path": "pages/My_Recipe.py", "label": "📊 My Recipes"},
-        {"path": "pages/Leo_Chat_Bot.py", "label": "🤖 Chat Bot"},
-        {"path": "pages/Share_Your_Meal.py", "label": "📝 Share Your Meal"}
-    ]
-    
-    # Display main navigation items
-    for item in nav_items:
-        if "icon" in item:
-            st.sidebar.page_link(item["path"], label=item["label"], icon=item["icon"])
-        else:
-            st.sidebar.page_link(item["path"], label=item["label"])
-    
-    # Add authentication-related items
+from utils.profiling import start_page, finish_page
+from utils.events import track_page
+from utils.session_budget import manage_session_state, resume_session
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (script, title, icon); the title also names the page in the profiling metrics and event log.
+# The first page is the default one.
+PAGES = [
+    ("pages/Home.py", "Home", "🏠"),
+    ("pages/Meal_Feed.py", "Meal Feed", "🍽️"),
+    ("pages/Share_Your_Meal.py", "Share Your Meal", "📝"),
+    ("pages/Recipe_Detail.py", "Recipe Detail", "📖"),
+    ("pages/My_Profile.py", "My Profile", "👤"),
+    ("pages/Leo_Chat_Bot.py", "Chat Bot", "🤖"),
+    ("pages/About_Leo's_Kitchen.py", "About", "ℹ️"),
+    ("pages/Login.py", "Login", "🔑"),
+]
+# Absolute script path -> title
+_PAGE_TITLES = {os.path.join(ROOT, script): title for script, title, _ in PAGES}
+
+SESSION_DEFAULTS = {"authenticated": False, "username": "", "user_id": None}
+
+
+def init_session():
+    """Fill in the session's auth state the first time the session runs."""
+    if "session_ready" in st.session_state:
+        return
+    for key, value in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
+    st.session_state.session_ready = True
+
+
+def logout():
+    """Button callback: sign the session out."""
+    st.session_state.authenticated = False
+    st.session_state.username = ""
+    st.session_state.user_id = None
+
+
+def navigation_pages():
+    """This session's st.Page objects, by script path relative to the app (built on the session's first run)."""
+    pages = st.session_state.get("nav_pages")
+    if pages is None:
+        pages = {script: st.Page(os.path.join(ROOT, script), title=title, icon=icon, default=n == 0)
+                 for n, (script, title, icon) in enumerate(PAGES)}
+        st.session_state.nav_pages = pages
+    return pages
+
+
+def setup_chrome(title):
+    st.set_page_config(page_title=f"{title} - Leo's Kitchen", page_icon="images/logo.png", layout="wide")
+    st.logo(image="images/logo.png", size="large", link=None, icon_image=None)
+    init_session()
+
+
+def render_account_sidebar():
+    """Who is signed in (with a logout button), or a link to the login page."""
+    pages = navigation_pages()
     st.sidebar.divider()
-    
-    if 'authenticated' in st.session_state and st.session_state.authenticated:
+    if st.session_state.authenticated:
         st.sidebar.subheader(f"Welcome, {st.session_state.username}")
-        st.sidebar.page_link("pages/My_Profile.py", label="👤 My Profile")
-        if st.sidebar.button("Logout"):
-            st.session_state.authenticated = False
-            st.session_state.username = ""
-            st.session_state.user_id = None
-            st.rerun()
+        st.sidebar.page_link(pages["pages/My_Profile.py"], label="My Profile", icon="👤")
+        st.sidebar.button("Logout", key="sidebar_logout", on_click=logout)
     else:
-        st.sidebar.page_link("pages/Login.py", label="👤 Login/Register")
-    
-    return st.sidebar
\ No newline at end of file
+        st.sidebar.page_link(pages["pages/Login.py"], label="Login/Register", icon="👤")
+
+
+def _run_in_shell(title, run):
+    start_page(title)
+    resume_session()
+    track_page(title)
+    render_account_sidebar()
+    run()
+    manage_session_state()
+    finish_page()
+
+
+def run_app():
+    """Entrypoint: set up the shell and run the page the user is on."""
+    # st.navigation only picks the page; nothing is drawn before the page config
+    page = st.navigation(list(navigation_pages().values()))
+    setup_chrome(page.title)
+    _run_in_shell(page.title, page.run)
+
+
+@functools.lru_cache(maxsize=len(PAGES))
+def _page_code(path, mtime_ns):
+    with open(path, encoding="utf-8") as f:
+        return compile(f.read(), path, "exec")
+
+
+def run_page(script):
+    """Run one page inside the shell without st.navigation (see page_test)."""
+    path = os.path.join(ROOT, script)
+    title = _PAGE_TITLES[path]
+
+    def run():
+        # What st.Page.run does: the page's compiled code (cached), executed as module __page__
+        module = types.ModuleType("__page__")
+        module.__dict__["__file__"] = path
+        exec(_page_code(path, os.stat(path).st_mtime_ns), module.__dict__)
+
+    setup_chrome(title)
+    _run_in_shell(title, run)
+
+
+def page_test(script, default_timeout=60):
+    """An AppTest of one page (e.g. "pages/Meal_Feed.py") inside the shell."""
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_string(f"from utils.sidebar import run_page\nrun_page({script!r})\n",
+                               default_timeout=default_timeout)
@@ -0,0 +1,138 @@
+# utils/trending.py
+"""
+Trending meals: engagement scores that fade over time.
+
+Every view, like and save adds its weight (TRENDING_WEIGHTS) to the meal's
+score, and scores halve every half-life. Instead of decaying every score as
+time passes, an event at time t adds weight * 2 ** ((t - epoch) / half_life):
+all scores shrink by the same factor, so the stored values rank the meals
+exactly as the decayed ones would, and the real score is only worked out when
+it is shown (lazy decay). Adding an event is O(1) plus a heap update.
+
+Stored scores only grow, so the best TOP_CANDIDATES meals are tracked exactly
+with a min-heap: a meal enters when its score passes the smallest one kept.
+"Trending" and "Featured This Week" are top-K reads of that set.
+
+Scores are built from the meal_interactions table (utils/interactions.py) at
+startup, replaying the last few half-lives, and then take in only the rows
+added since the last refresh.
+"""
+import heapq
+import threading
+import time
+
+from utils.interactions import get_interactions
+
+TRENDING_WEIGHTS = {"view": 1.0, "like": 3.0, "save": 5.0}
+TOP_CANDIDATES = 256
+# Events older than this many half-lives are left out when scores are rebuilt (they'd count < 0.4%)
+REPLAY_HALF_LIVES = 8
+# Move the epoch forward before the stored values get near float overflow
+MAX_EXPONENT = 500
+
+
+class TrendingScores:
+    """Time-decayed engagement per meal, with the current top meals kept in a heap."""
+
+    def __init__(self, half_life_hours, top_candidates=TOP_CANDIDATES):
+        self.half_life = half_life_hours * 3600
+        self.top_candidates = top_candidates
+        self.epoch = time.time()
+        self.scores = {}  # meal id -> stored (epoch-scaled) score
+        self.top = {}  # meal id -> stored score, for the top_candidates best meals
+        self.heap = []  # (stored score, meal id) of self.top, with stale entries left behind
+
+    def add(self, meal_id, weight, at=None):
+        """Add an event of the given weight at a Unix time (default: now)."""
+        exponent = ((time.time() if at is None else at) - self.epoch) / self.half_life
+        if exponent > MAX_EXPONENT:
+            self._rebase(at)
+            exponent = ((time.time() if at is None else at) - self.epoch) / self.half_life
+        score = self.scores.get(meal_id, 0.0) + weight * 2.0 ** exponent
+        self.scores[meal_id] = score
+
+        if meal_id not in self.top and len(self.top) >= self.top_candidates:
+            # Drop stale heap entries to find the smallest score still in the top set
+            while self.heap[0][0] != self.top.get(self.heap[0][1]):
+                heapq.heappop(self.heap)
+            if score <= self.heap[0][0]:
+                return
+            _, evicted = heapq.heappop(self.heap)
+            del self.top[evicted]
+        self.top[meal_id] = score
+        heapq.heappush(self.heap, (score, meal_id))
+        if len(self.heap) > 4 * self.top_candidates:
+            self.heap = [(score, meal_id) for meal_id, score in self.top.items()]
+            heapq.heapify(self.heap)
+
+    def _rebase(self, at=None):
+        # Move the epoch to now, scaling every stored value down by the same factor
+        now = time.time() if at is None else at
+        factor = 2.0 ** (-(now - self.epoch) / self.half_life)
+        self.epoch = now
+        self.scores = {meal_id: score * factor for meal_id, score in self.scores.items()}
+        self.top = {meal_id: score * factor for meal_id, score in self.top.items()}
+        self.heap = [(score, meal_id) for meal_id, score in self.top.items()]
+        heapq.heapify(self.heap)
+
+    def score(self, meal_id, now=None):
+        """A meal's current (decayed) score."""
+        now = time.time() if now is None else now
+        return self.scores.get(meal_id, 0.0) * 2.0 ** (-(now - self.epoch) / self.half_life)
+
+    def top_k(self, k):
+        """The k highest-scoring meals (at most top_candidates), best first, as (meal_id, current score) pairs."""
+        factor = 2.0 ** (-(time.time() - self.epoch) / self.half_life)
+        ranked = heapq.nlargest(k, self.top.items(), key=lambda item: (item[1], -item[0]))
+        return [(meal_id, score * factor) for meal_id, score in ranked]
+
+
+class TrendingEngine:
+    """The trending and weekly-featured scores, kept up to date with the interactions table."""
+
+    def __init__(self, trending_half_life_hours=24, featured_half_life_hours=24 * 3.5):
+        self.trending = TrendingScores(trending_half_life_hours)
+        self.featured = TrendingScores(featured_half_life_hours)
+        self.last_id = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Take in interactions recorded since the last refresh (on the first one, the recent history)."""
+        with self.lock:
+            if self.last_id is None:
+                longest = max(self.trending.half_life, self.featured.half_life)
+                rows = get_interactions(0, since=time.time() - REPLAY_HALF_LIVES * longest)
+                self.last_id = 0
+            else:
+                rows = get_interactions(self.last_id)
+            for interaction_id, meal_id, kind, created_at in rows:
+                weight = TRENDING_WEIGHTS.get(kind)
+                if weight:
+                    self.trending.add(meal_id, weight, created_at)
+                    self.featured.add(meal_id, weight, created_at)
+                self.last_id = interaction_id
+
+    def trending_ids(self, k=TOP_CANDIDATES):
+        """Ids of the meals trending now (about the last day), best first."""
+        self.refresh()
+        with self.lock:
+            return [meal_id for meal_id, _ in self.trending.top_k(k)]
+
+    def featured_ids(self, k=TOP_CANDIDATES):
+        """Ids of the meals with the most engagement this week, best first."""
+        self.refresh()
+        with self.lock:
+            return [meal_id for meal_id, _ in self.featured.top_k(k)]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_trending_engine():
+    """The process-wide trending engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TrendingEngine()
+        return _engine